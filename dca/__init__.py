@@ -1,12 +1,36 @@
-from .advantage import (
-    advantage_dca_grpo,
-    advantage_dca_rloo,
-    advantage_vanilla_grpo,
-    length_score_z_sigmoid,
-    rewards_coupled_lp,
-    is_correct,
-    extract_answer,
-)
+"""
+DCA / DDCA advantages for RLVR and the data, evaluation and integration utilities around them.
+
+Attributes and submodules load lazily on first access (PEP 562), so `import dca` and
+string-only paths such as dca.data_utils (answer grading) do not import NumPy; short-lived
+reward workers only pay for what they use. `from dca import advantage_dca_grpo` still works
+and imports dca.advantage at that point.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .advantage import (
+        advantage_dca_grpo,
+        advantage_dca_rloo,
+        advantage_vanilla_grpo,
+        extract_answer,
+        is_correct,
+        length_score_z_sigmoid,
+        rewards_coupled_lp,
+    )
+
+# public name -> submodule defining it
+_LAZY_ATTRS = {
+    "advantage_dca_grpo": "advantage",
+    "advantage_dca_rloo": "advantage",
+    "advantage_vanilla_grpo": "advantage",
+    "length_score_z_sigmoid": "advantage",
+    "rewards_coupled_lp": "advantage",
+    "is_correct": "advantage",
+    "extract_answer": "advantage",
+}
 
 __all__ = [
     "advantage_dca_grpo",
@@ -17,3 +41,23 @@ __all__ = [
     "is_correct",
     "extract_answer",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module("." + module, __name__), name)
+    else:
+        # dca.<submodule> without importing it first
+        try:
+            value = importlib.import_module("." + name, __name__)
+        except ModuleNotFoundError as e:
+            if e.name != __name__ + "." + name:
+                raise
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name)) from None
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
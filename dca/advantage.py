@@ -8,7 +8,11 @@ DDCA (use_dynamic=True): scale length advantage by pass rate ρ = n/G (Difficult
 """
 
 import numpy as np
-from typing import List, Callable, Optional
+from typing import Any, Dict, List, Callable, Optional, Sequence, Tuple, Union
+
+# (mean, variance, weight) of a prompt's historical correct-response lengths; weight is the
+# number of pseudo-responses the history counts as (see dca.prompt_stats.LengthBaselineStore).
+LengthBaseline = Tuple[float, float, float]
 
 
 def is_correct(pred: str, gt: str, equiv_fn: Optional[Callable[[str, str], bool]] = None) -> bool:
@@ -47,19 +51,42 @@ def extract_answer(text: str) -> str:
     return text
 
 
-def length_score_z_sigmoid(lengths: np.ndarray, correct_mask: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+def blend_length_stats(correct_lengths: np.ndarray, baseline: Optional[LengthBaseline] = None) -> Tuple[float, float]:
+    """
+    (mean, std) of correct lengths, pooled with a historical baseline (mean, var, weight) that
+    counts as `weight` extra responses. Without a baseline: the in-group mean and std.
+    """
+    n = correct_lengths.size
+    mu_g = float(np.mean(correct_lengths)) if n else 0.0
+    var_g = float(np.var(correct_lengths)) if n else 0.0
+    if baseline is None or baseline[2] <= 0:
+        return mu_g, float(np.sqrt(var_g))
+    mu_h, var_h, w = (float(x) for x in baseline)
+    mu = (w * mu_h + n * mu_g) / (w + n)
+    var = (w * (var_h + (mu_h - mu) ** 2) + n * (var_g + (mu_g - mu) ** 2)) / (w + n)
+    return mu, float(np.sqrt(var))
+
+
+def length_score_z_sigmoid(
+    lengths: np.ndarray,
+    correct_mask: np.ndarray,
+    eps: float = 1e-8,
+    length_baseline: Optional[LengthBaseline] = None,
+) -> np.ndarray:
     """
     Conditional length score: Z-score within correct set, then sigmoid.
     Only defined for correct responses; others can be 0 or NaN (handled by caller).
 
     Eq. (12)-(13): z_i = (|o_i| - mu*_len) / (sigma*_len + eps),  s_i = sigmoid(z_i).
+    length_baseline: optional (mean, var, weight) of the prompt's past correct lengths; mu*_len
+    and sigma*_len are then pooled with it (blend_length_stats), which keeps z stable when only
+    one or two responses are correct.
     """
     correct_lengths = lengths[correct_mask]
     if correct_lengths.size == 0:
         return np.zeros_like(lengths, dtype=float)
 
-    mu_len = np.mean(correct_lengths)
-    sigma_len = np.std(correct_lengths)
+    mu_len, sigma_len = blend_length_stats(correct_lengths, length_baseline)
     if sigma_len < eps:
         sigma_len = eps
 
@@ -68,12 +95,17 @@ def length_score_z_sigmoid(lengths: np.ndarray, correct_mask: np.ndarray, eps: f
     return s
 
 
+def _baseline_weight(length_baseline: Optional[LengthBaseline]) -> float:
+    return max(float(length_baseline[2]), 0.0) if length_baseline is not None else 0.0
+
+
 def advantage_dca_grpo(
     correct_mask: np.ndarray,
     lengths: np.ndarray,
     beta: float,
     eps: float = 1e-8,
     use_dynamic: bool = True,
+    length_baseline: Optional[LengthBaseline] = None,
 ) -> np.ndarray:
     """
     DCA-GRPO (or DDCA-GRPO when use_dynamic=True): decoupled advantages for accuracy and length.
@@ -87,6 +119,9 @@ def advantage_dca_grpo(
     lengths: int array [G], token lengths.
     beta: length penalty coefficient.
     use_dynamic: if True (default), scale length advantage by ρ = n/G (DDCA, Eq.13).
+    length_baseline: optional (mean, var, weight) of the prompt's past correct lengths. The score
+      statistics are pooled with it, and s_bar counts `weight` pseudo-responses of score
+      sigmoid(0) = 0.5, so a lone correct response is compared against the prompt's history.
     """
     G = correct_mask.shape[0]
     # Accuracy reward: 1 if correct else 0
@@ -98,13 +133,14 @@ def advantage_dca_grpo(
     A_acc = (r_acc - mu_acc) / (sigma_acc + eps)
 
     # Length score only for correct responses
-    s = length_score_z_sigmoid(lengths, correct_mask, eps)
+    s = length_score_z_sigmoid(lengths, correct_mask, eps, length_baseline)
     Sc = np.where(correct_mask)[0]
     n = len(Sc)
     A_len = np.zeros(G, dtype=np.float64)
     if n > 0:
         s_correct = s[correct_mask]
-        s_bar = np.mean(s_correct)
+        w = _baseline_weight(length_baseline)
+        s_bar = (0.5 * w + np.sum(s_correct)) / (w + n)
         A_len[correct_mask] = -(s[correct_mask] - s_bar)
         if use_dynamic:
             # DDCA: scale by pass rate ρ = n/G (Difficulty-Aware Coefficient)
@@ -114,12 +150,95 @@ def advantage_dca_grpo(
     return A_acc + beta * A_len
 
 
+RHO_BINS = 10  # equal-width pass-rate bins of the diagnostics histogram
+
+
+def advantage_dca_grpo_batch(
+    correct_mask: np.ndarray,
+    lengths: np.ndarray,
+    beta: Union[float, np.ndarray],
+    eps: float = 1e-8,
+    use_dynamic: Union[bool, np.ndarray] = True,
+    length_baselines: Optional[Sequence[Optional[LengthBaseline]]] = None,
+    diagnostics: Optional[Dict[str, Any]] = None,
+) -> np.ndarray:
+    """
+    advantage_dca_grpo for B groups at once: correct_mask, lengths of shape (B, G) -> (B, G).
+
+    beta, use_dynamic: scalars, or per-group arrays of shape (B,) (e.g. one toy policy per row).
+    length_baselines: optional per-group (mean, var, weight) or None.
+    diagnostics: optional dict, filled with a summary of the batch from the intermediates of
+      the same pass (no recomputation): pass-rate mean / histogram, |A_acc| and beta*|A_len|
+      means, correct-set length std, and how many groups hit sigma_len < eps.
+    """
+    mask = np.asarray(correct_mask, dtype=bool)
+    L = np.asarray(lengths, dtype=np.float64)
+    B, G = mask.shape
+    r_acc = mask.astype(np.float64)
+    n = r_acc.sum(axis=1)
+    mu_acc = n / G
+    sigma_acc = np.sqrt(np.mean((r_acc - mu_acc[:, None]) ** 2, axis=1))
+    sigma_acc = np.maximum(sigma_acc, eps)
+    A_acc = (r_acc - mu_acc[:, None]) / (sigma_acc[:, None] + eps)
+
+    # correct-set length statistics, pooled with the baselines where given
+    n_safe = np.maximum(n, 1.0)
+    mu_g = (L * r_acc).sum(axis=1) / n_safe
+    var_g = (r_acc * (L - mu_g[:, None]) ** 2).sum(axis=1) / n_safe
+    if length_baselines is not None:
+        base = np.array([b if b is not None else (0.0, 0.0, 0.0) for b in length_baselines], dtype=np.float64).reshape(B, 3)
+        mu_h, var_h, w = base[:, 0], base[:, 1], np.maximum(base[:, 2], 0.0)
+        mu_len = (w * mu_h + n * mu_g) / np.maximum(w + n, eps)
+        var_len = (w * (var_h + (mu_h - mu_len) ** 2) + n * (var_g + (mu_g - mu_len) ** 2)) / np.maximum(w + n, eps)
+        mu_len = np.where(w > 0, mu_len, mu_g)
+        var_len = np.where(w > 0, var_len, var_g)
+    else:
+        w = np.zeros(B)
+        mu_len, var_len = mu_g, var_g
+    sigma_len = np.sqrt(var_len)
+    tiny = sigma_len < eps
+    sigma_len = np.where(tiny, eps, sigma_len)
+    z = (L - mu_len[:, None]) / (sigma_len[:, None] + eps)
+    s = 1.0 / (1.0 + np.exp(-np.clip(z, -20, 20)))
+
+    s_bar = (0.5 * w + (s * r_acc).sum(axis=1)) / np.maximum(w + n, eps)
+    A_len = np.where(mask, -(s - s_bar[:, None]), 0.0)
+    if np.ndim(use_dynamic):
+        A_len *= np.where(np.asarray(use_dynamic, dtype=bool), n / G, 1.0)[:, None]
+    elif use_dynamic:
+        A_len *= (n / G)[:, None]
+    if np.ndim(beta):
+        beta = np.asarray(beta, dtype=np.float64).reshape(B, 1)
+
+    if diagnostics is not None:
+        has_correct = n > 0
+        rho = n / G
+        multi = n >= 2
+        len_term = np.abs(beta * A_len)
+        acc_abs = float(np.abs(A_acc).mean())
+        diagnostics.update(
+            groups=B,
+            group_size=G,
+            rho_mean=float(rho.mean()),
+            rho_hist=np.bincount(np.minimum((rho * RHO_BINS).astype(np.int64), RHO_BINS - 1), minlength=RHO_BINS),
+            degenerate_frac=float(np.mean((n == 0) | (n == G))),
+            acc_abs_mean=acc_abs,
+            len_abs_mean=float(len_term.mean()),
+            len_to_acc=float(len_term.mean() / acc_abs) if acc_abs > 0 else float("nan"),
+            len_std_mean=float(np.sqrt(var_g[multi]).mean()) if multi.any() else float("nan"),
+            correct_len_mean=float(mu_g[has_correct].mean()) if has_correct.any() else float("nan"),
+            sigma_eps_fires=int(np.count_nonzero(tiny & has_correct)),
+        )
+    return A_acc + beta * A_len
+
+
 def advantage_dca_rloo(
     correct_mask: np.ndarray,
     lengths: np.ndarray,
     beta: float,
     eps: float = 1e-8,
     use_dynamic: bool = True,
+    length_baseline: Optional[LengthBaseline] = None,
 ) -> np.ndarray:
     """
     DCA-RLOO (or DDCA-RLOO when use_dynamic=True): leave-one-out baseline.
@@ -127,6 +246,8 @@ def advantage_dca_rloo(
     - Accuracy: A_acc_i = r_acc_i - mean(r_acc over j != i).
     - Length:   A_len_i = -(s_i - mean(s over j in Sc, j != i)) for i in Sc, else 0.
       If use_dynamic (DDCA): A_len_i *= (n/G) (Eq.13).
+    length_baseline: as in advantage_dca_grpo; the leave-one-out mean also counts the
+      baseline's pseudo-responses.
     """
     G = correct_mask.shape[0]
     r_acc = correct_mask.astype(np.float64)
@@ -135,18 +256,19 @@ def advantage_dca_rloo(
         others = np.array([j for j in range(G) if j != i])
         A_acc[i] = r_acc[i] - np.mean(r_acc[others])
 
-    s = length_score_z_sigmoid(lengths, correct_mask, eps)
+    s = length_score_z_sigmoid(lengths, correct_mask, eps, length_baseline)
     Sc = np.where(correct_mask)[0]
     n = len(Sc)
+    w = _baseline_weight(length_baseline)
     A_len = np.zeros(G, dtype=np.float64)
     for i in range(G):
         if not correct_mask[i]:
             continue
         others_in_Sc = [j for j in Sc if j != i]
-        if len(others_in_Sc) == 0:
+        if len(others_in_Sc) == 0 and w == 0:
             A_len[i] = 0.0
         else:
-            s_bar_i = np.mean(s[others_in_Sc])
+            s_bar_i = (0.5 * w + np.sum(s[others_in_Sc])) / (w + len(others_in_Sc))
             A_len[i] = -(s[i] - s_bar_i)
     if use_dynamic and n > 0:
         rho = n / G
@@ -164,6 +286,14 @@ def advantage_vanilla_grpo(rewards: np.ndarray, eps: float = 1e-8) -> np.ndarray
     return (rewards - mu) / (sigma + eps)
 
 
+def advantage_vanilla_grpo_batch(rewards: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+    """advantage_vanilla_grpo for B groups at once: rewards of shape (B, G) -> (B, G)."""
+    r = np.asarray(rewards, dtype=np.float64)
+    mu = r.mean(axis=1, keepdims=True)
+    sigma = np.maximum(r.std(axis=1, keepdims=True), eps)
+    return (r - mu) / (sigma + eps)
+
+
 def rewards_coupled_lp(
     correct_mask: np.ndarray,
     lengths: np.ndarray,
@@ -0,0 +1,123 @@
+"""
+Token cost accounting: generated-token totals, tail and projected generation savings.
+
+TokenUsage streams per-rollout lengths into the mergeable accumulators from dca.streaming
+(RunningStats for totals, QuantileSketch for p50/p90/p99), plus an exact count of rollouts
+near the max_tokens cap, so full production result dumps are processed in O(1) memory.
+cost_report compares a candidate against an optional baseline under a user-supplied
+throughput (tokens/sec) and cost model (per million tokens and/or per GPU-hour).
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .streaming import QuantileSketch, RunningStats
+
+TAIL_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class TokenUsage:
+    """
+    Streaming accumulator of generated tokens.
+
+    max_tokens : generation cap (e.g. training.max_tokens in configs/experiment.yaml).
+    cap_fraction : rollouts with length >= cap_fraction * max_tokens count as near the cap.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, cap_fraction: float = 0.95, sketch_alpha: float = 0.005):
+        self.max_tokens = max_tokens
+        self.cap_fraction = cap_fraction
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(sketch_alpha)
+        self.near_cap = 0
+        self.problems = 0
+
+    def update(self, lengths: Sequence[float]) -> "TokenUsage":
+        """Add the rollout lengths of one problem."""
+        x = np.asarray(lengths, dtype=np.float64).ravel()
+        self.problems += 1
+        self.stats.update(x)
+        self.sketch.update(x)
+        if self.max_tokens:
+            self.near_cap += int((x >= self.cap_fraction * self.max_tokens).sum())
+        return self
+
+    def merge(self, other: "TokenUsage") -> "TokenUsage":
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        self.near_cap += other.near_cap
+        self.problems += other.problems
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        rollouts = self.stats.count
+        out = {
+            "problems": self.problems,
+            "rollouts": rollouts,
+            "total_tokens": self.stats.total,
+            "avg_tokens": self.stats.mean,
+            "max": self.stats.max if rollouts else 0.0,
+        }
+        out.update(self.sketch.quantiles(TAIL_QUANTILES))
+        if self.max_tokens:
+            out["max_tokens"] = self.max_tokens
+            out["near_cap_frac"] = self.near_cap / rollouts if rollouts else 0.0
+        return out
+
+
+def _projection(
+    usage: Dict[str, Any],
+    tokens_per_sec: Optional[float],
+    cost_per_million_tokens: Optional[float],
+    cost_per_gpu_hour: Optional[float],
+) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    total = usage["total_tokens"]
+    if tokens_per_sec:
+        out["generation_hours"] = total / tokens_per_sec / 3600.0
+        out["rollouts_per_sec"] = tokens_per_sec / usage["avg_tokens"] if usage["avg_tokens"] > 0 else 0.0
+        if cost_per_gpu_hour:
+            out["cost_gpu_hours"] = out["generation_hours"] * cost_per_gpu_hour
+    if cost_per_million_tokens:
+        out["cost_tokens"] = total / 1e6 * cost_per_million_tokens
+    return out
+
+
+def cost_report(
+    candidate: TokenUsage,
+    baseline: Optional[TokenUsage] = None,
+    tokens_per_sec: Optional[float] = None,
+    cost_per_million_tokens: Optional[float] = None,
+    cost_per_gpu_hour: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Token cost report for a candidate run, with projected savings vs a baseline.
+
+    tokens_per_sec : generation throughput (per GPU if cost_per_gpu_hour is given).
+    Savings are per rollout (avg tokens) so runs with different problem counts compare fairly;
+    "savings_at_candidate_volume" prices the candidate's rollout count at the baseline average.
+    """
+    cand = candidate.summary()
+    report: Dict[str, Any] = {"candidate": cand}
+    report["candidate"]["projection"] = _projection(cand, tokens_per_sec, cost_per_million_tokens, cost_per_gpu_hour)
+    if baseline is None:
+        return report
+    base = baseline.summary()
+    base["projection"] = _projection(base, tokens_per_sec, cost_per_million_tokens, cost_per_gpu_hour)
+    report["baseline"] = base
+    if base["avg_tokens"] > 0:
+        token_saving = 1.0 - cand["avg_tokens"] / base["avg_tokens"]
+        equivalent = dict(cand)
+        equivalent["total_tokens"] = base["avg_tokens"] * cand["rollouts"]
+        equivalent["avg_tokens"] = base["avg_tokens"]
+        at_base = _projection(equivalent, tokens_per_sec, cost_per_million_tokens, cost_per_gpu_hour)
+        savings = {"token_reduction_frac": token_saving,
+                   "tokens_saved": equivalent["total_tokens"] - cand["total_tokens"]}
+        for key, value in at_base.items():
+            if key == "rollouts_per_sec":
+                savings["throughput_speedup"] = cand["projection"][key] / value if value > 0 else 0.0
+            else:
+                savings[key + "_saved"] = value - cand["projection"][key]
+        report["savings_at_candidate_volume"] = savings
+    return report
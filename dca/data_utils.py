@@ -3,10 +3,14 @@ Data loading and answer equivalence for GSM8K, MATH500, AMC23, AIME.
 Paper: mixed training set AIME + MATH ~1:2, 2500 samples. Eval on four benchmarks.
 """
 
-import json
 import re
-from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional
+
+from .io import iter_json_records, iter_jsonl, strip_compression_suffix
+from .profiling import timed
+
+# Prompt template shared by prepare_data.py (verl parquet) and dca.prefetch
+INSTRUCTION_SUFFIX = " Let's think step by step and output the final answer after \"####\"."
 
 
 def normalize_math_answer(s: str) -> str:
@@ -35,6 +39,7 @@ def normalize_math_answer(s: str) -> str:
     return s
 
 
+@timed("is_equivalent_math")
 def is_equivalent_math(pred: str, gt: str) -> bool:
     """Math answer equivalence (GSM8K, MATH, AMC, AIME style)."""
     p = normalize_math_answer(pred)
@@ -49,81 +54,116 @@ def is_equivalent_math(pred: str, gt: str) -> bool:
     return False
 
 
+def normalize_gsm8k_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """One raw GSM8K item -> {question, answer (after ####), dataset}."""
+    q = item.get("question", item.get("problem", ""))
+    a = item.get("answer", "")
+    if "####" in a:
+        a = a.split("####")[-1].strip()
+    return {"question": q, "answer": a, "dataset": "gsm8k"}
+
+
+def normalize_math_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """One raw MATH item -> {question, answer (\\boxed{} of solution), level, dataset}."""
+    problem = item.get("problem", item.get("question", ""))
+    solution = item.get("solution", "")
+    # Extract \boxed{...} from solution
+    answer = ""
+    if "\\boxed{" in solution:
+        start = solution.rfind("\\boxed{")
+        depth = 0
+        for i in range(start + 7, len(solution)):
+            if solution[i] == "{":
+                depth += 1
+            elif solution[i] == "}":
+                if depth == 0:
+                    answer = solution[start + 7 : i].strip()
+                    break
+                depth -= 1
+    level = item.get("level", 0)
+    return {"question": problem, "answer": answer, "level": level, "dataset": "math"}
+
+
+def normalize_generic_item(
+    item: Dict[str, Any], dataset: str, question_key: str = "question", answer_key: str = "answer"
+) -> Dict[str, Any]:
+    """One raw AMC23 / AIME / other item -> {question, answer, dataset}."""
+    return {
+        "question": item.get(question_key, item.get("problem", "")),
+        "answer": str(item.get(answer_key, "")).strip(),
+        "dataset": dataset,
+    }
+
+
+def dataset_kind(path: str, dataset: Optional[str] = None) -> str:
+    """"gsm8k" | "math" | "generic", from the dataset name or the file name (as load_dataset)."""
+    name = (dataset or strip_compression_suffix(path).stem).lower()
+    if "gsm8k" in name:
+        return "gsm8k"
+    if "math" in name:
+        return "math"
+    return "generic"
+
+
+def build_prompt(question: str) -> List[Dict[str, str]]:
+    """Chat prompt for one question: a single user turn with INSTRUCTION_SUFFIX."""
+    return [{"role": "user", "content": question.strip() + INSTRUCTION_SUFFIX}]
+
+
+def make_parquet_row(question: str, answer: str, data_source: str, ability: str, idx: int, split: str) -> dict:
+    """One row in verl parquet format."""
+    return {
+        "data_source": data_source,
+        "prompt": build_prompt(question),
+        "ability": ability,
+        "reward_model": {"style": "rule", "ground_truth": answer.strip()},
+        "extra_info": {"split": split, "index": idx},
+    }
+
+
 def load_gsm8k(path: str) -> List[Dict[str, Any]]:
-    """Load GSM8K (JSONL or JSON with 'question' and 'answer')."""
-    path = Path(path)
-    data = []
-    if path.suffix == ".jsonl":
-        with open(path) as f:
-            for line in f:
-                data.append(json.loads(line))
+    """Load GSM8K (JSONL or JSON with 'question' and 'answer'; optionally .gz / .zst)."""
+    if strip_compression_suffix(path).suffix == ".jsonl":
+        data = iter_jsonl(path)
     else:
-        with open(path) as f:
-            raw = json.load(f)
-        if isinstance(raw, list):
-            data = raw
-        else:
-            data = raw.get("data", raw.get("examples", []))
-    out = []
-    for item in data:
-        q = item.get("question", item.get("problem", ""))
-        a = item.get("answer", "")
-        if "####" in a:
-            a = a.split("####")[-1].strip()
-        out.append({"question": q, "answer": a, "dataset": "gsm8k"})
-    return out
+        data = iter_json_records(path, keys=("data", "examples"))
+    return [normalize_gsm8k_item(item) for item in data]
 
 
 def load_math(path: str) -> List[Dict[str, Any]]:
-    """Load MATH (level, problem, solution with final answer)."""
-    path = Path(path)
-    out = []
-    with open(path) as f:
-        raw = json.load(f)
-    for item in (raw if isinstance(raw, list) else raw.get("data", [])):
-        problem = item.get("problem", item.get("question", ""))
-        solution = item.get("solution", "")
-        # Extract \boxed{...} from solution
-        answer = ""
-        if "\\boxed{" in solution:
-            start = solution.rfind("\\boxed{")
-            depth = 0
-            for i in range(start + 7, len(solution)):
-                if solution[i] == "{":
-                    depth += 1
-                elif solution[i] == "}":
-                    if depth == 0:
-                        answer = solution[start + 7 : i].strip()
-                        break
-                    depth -= 1
-        level = item.get("level", 0)
-        out.append({"question": problem, "answer": answer, "level": level, "dataset": "math"})
-    return out
+    """Load MATH (level, problem, solution with final answer). Top-level arrays are parsed incrementally."""
+    return [normalize_math_item(item) for item in iter_json_records(path)]
 
 
 def load_jsonl_generic(path: str, question_key: str = "question", answer_key: str = "answer") -> List[Dict[str, Any]]:
     """Generic JSONL for AMC23, AIME, etc."""
-    path = Path(path)
-    out = []
-    with open(path) as f:
-        for line in f:
-            item = json.loads(line)
-            out.append({
-                "question": item.get(question_key, item.get("problem", "")),
-                "answer": str(item.get(answer_key, "")).strip(),
-                "dataset": path.stem,
-            })
-    return out
-
-
-def load_dataset(path: str, dataset: Optional[str] = None) -> List[Dict[str, Any]]:
+    name = strip_compression_suffix(path).stem
+    return [normalize_generic_item(item, name, question_key, answer_key) for item in iter_jsonl(path)]
+
+
+def load_dataset(path: str, dataset: Optional[str] = None, lazy: bool = False, cache: bool = False):
     """
     Auto-detect or use dataset name: gsm8k, math, math500, amc23, aime.
+    Compressed files (.gz / .zst) are read transparently.
+
+    lazy=True returns a dca.lazy_data.LazyDataset (len, O(1) indexing, slicing, sharding)
+    backed by a cached byte-offset index instead of a list.
+    cache=True returns a dca.record_cache.CachedRecords sequence: the normalized records are
+    parsed once and memory-mapped from a columnar cache file on later loads.
     """
-    path = Path(path)
-    name = (dataset or path.stem).lower()
-    if "gsm8k" in name:
-        return load_gsm8k(str(path))
-    if "math" in name:
-        return load_math(str(path))
-    return load_jsonl_generic(str(path))
+    if lazy:
+        from .lazy_data import open_dataset
+        return open_dataset(path, dataset)
+    kind = dataset_kind(path, dataset)
+    if cache:
+        from .record_cache import load_records
+        return load_records(path, lambda: _load_kind(str(path), kind), kind)
+    return _load_kind(str(path), kind)
+
+
+def _load_kind(path: str, kind: str) -> List[Dict[str, Any]]:
+    if kind == "gsm8k":
+        return load_gsm8k(path)
+    if kind == "math":
+        return load_math(path)
+    return load_jsonl_generic(path)
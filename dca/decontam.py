@@ -0,0 +1,247 @@
+"""
+Train-test decontamination with MinHash signatures and an LSH banding index.
+
+Questions are normalized (lowercase, alphanumeric word tokens) and shingled into word
+n-grams. Each question gets a MinHash signature of num_perm 32-bit values (multiply-shift
+hashing of crc32 shingle hashes, vectorized over blocks of shingles). Signatures are split
+into `bands` bands of rows = num_perm / bands values; two questions become a candidate pair
+when any band matches exactly, which for Jaccard similarity s happens with probability
+1 - (1 - s^rows)^bands (≈ 0.42 threshold for 32 x 4). Candidates are then verified with the
+exact shingle Jaccard, so reported overlaps have no MinHash false positives.
+
+Cost is linear in the number of shingles plus the candidate count, instead of
+|train| x |test| pairwise comparisons. Signatures can be cached per source file
+(cached_signatures), keyed by the file's content digest and the hashing parameters.
+"""
+
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .io import cache_path
+from .record_cache import file_digest
+
+# ASCII punctuation / symbols -> space; letters, digits and non-ASCII characters are kept
+_SEPARATORS = str.maketrans({chr(c): " " for c in range(128) if not chr(c).isalnum()})
+_EMPTY = np.uint32(0xFFFFFFFF)
+_BLOCK = 1 << 13  # shingles per vectorized block
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercased word tokens; ASCII punctuation, LaTeX markup symbols and whitespace separate them."""
+    return str(text).lower().translate(_SEPARATORS).split()
+
+
+class MinHasher:
+    """
+    MinHash over word n-gram shingles.
+
+    num_perm : signature length (hash functions).
+    ngram : words per shingle; shorter questions use all of their tokens as one shingle.
+    """
+
+    def __init__(self, num_perm: int = 128, ngram: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # multiply-shift hashing: ((a * x + b) mod 2^64) >> 32 with odd a
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._token_cache: Dict[str, int] = {}
+
+    @property
+    def params(self) -> str:
+        return "p{}n{}s{}".format(self.num_perm, self.ngram, self.seed)
+
+    def shingles(self, text: str) -> Set[str]:
+        tokens = normalize_tokens(text)
+        n = self.ngram
+        if len(tokens) < n:
+            return {" ".join(tokens)} if tokens else set()
+        return {" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)}
+
+    def _token_hashes(self, tokens: List[str]) -> List[int]:
+        known = self._token_cache
+        for t in set(tokens).difference(known):
+            known[t] = zlib.crc32(t.encode("utf-8"))
+        return list(map(known.__getitem__, tokens))
+
+    def shingle_hashes(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (hashes, doc_ids): 64-bit hashes of every word n-gram of every text (vectorized rolling
+        combination of crc32 token hashes), with the text index of each. Duplicates within a
+        text are kept; they do not change a MinHash.
+        """
+        tokens: List[str] = []
+        lengths: List[int] = []
+        for text in texts:
+            toks = normalize_tokens(text)
+            tokens.extend(toks)
+            lengths.append(len(toks))
+        n = self.ngram
+        lengths_arr = np.asarray(lengths, dtype=np.int64)
+        tok = np.asarray(self._token_hashes(tokens), dtype=np.uint64)
+        starts = np.cumsum(lengths_arr) - lengths_arr
+        # every window of n tokens inside one text; texts shorter than n: one window of all tokens
+        width = np.minimum(lengths_arr, n)
+        count = np.where(lengths_arr > 0, np.maximum(lengths_arr - n + 1, 1), 0)
+        first = np.repeat(starts, count) + (np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count))
+        win = np.repeat(width, count)
+        h = np.zeros(first.size, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for k in range(n):
+                inside = k < win
+                h[inside] = h[inside] * np.uint64(0x100000001B3) + tok[first[inside] + k] + np.uint64(k + 1)
+        return h, np.repeat(np.arange(len(lengths_arr)), count)
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        """(len(texts), num_perm) uint32 signatures; texts without tokens get all-0xFFFFFFFF rows."""
+        texts = list(texts)
+        sigs = np.full((len(texts), self.num_perm), _EMPTY, dtype=np.uint32)
+        if not texts:
+            return sigs
+        h, docs_all = self.shingle_hashes(texts)
+        if h.size == 0:
+            return sigs
+        a, b = self._a[:, None], self._b[:, None]
+        buf = np.empty((self.num_perm, _BLOCK), dtype=np.uint64)
+        for lo in range(0, h.size, _BLOCK):
+            block = h[lo : lo + _BLOCK]
+            docs = docs_all[lo : lo + _BLOCK]
+            vals = buf[:, : block.size]
+            with np.errstate(over="ignore"):
+                np.multiply(a, block[None, :], out=vals)
+                np.add(vals, b, out=vals)
+            np.right_shift(vals, np.uint64(32), out=vals)
+            seg = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+            mins = np.minimum.reduceat(vals, seg, axis=1).astype(np.uint32)
+            rows = docs[seg]
+            sigs[rows] = np.minimum(sigs[rows], mins.T)
+        return sigs
+
+
+def _band_keys(sigs: np.ndarray, bands: int) -> np.ndarray:
+    """(n, bands) uint64 keys: polynomial hash of each band's rows (exact-match proxy)."""
+    n, num_perm = sigs.shape
+    if num_perm % bands:
+        raise ValueError("num_perm must be divisible by bands")
+    rows = num_perm // bands
+    x = sigs.reshape(n, bands, rows).astype(np.uint64)
+    keys = np.zeros((n, bands), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for r in range(rows):
+            keys = keys * np.uint64(0x9E3779B97F4A7C15) + x[:, :, r] + np.uint64(r + 1)
+    return keys
+
+
+class LSHIndex:
+    """Banded LSH over a fixed set of signatures (e.g. the test questions)."""
+
+    def __init__(self, signatures: np.ndarray, bands: int = 32):
+        self.bands = bands
+        self.size = signatures.shape[0]
+        valid = np.flatnonzero(~(signatures == _EMPTY).all(axis=1))
+        keys = _band_keys(signatures[valid], bands)
+        self._sorted_keys = []
+        self._sorted_ids = []
+        for band in range(bands):
+            order = np.argsort(keys[:, band], kind="stable")
+            self._sorted_keys.append(keys[order, band])
+            self._sorted_ids.append(valid[order])
+
+    def query(self, signatures: np.ndarray) -> np.ndarray:
+        """Unique candidate pairs (query_row, index_row) sharing at least one band, shape (m, 2)."""
+        valid = np.flatnonzero(~(signatures == _EMPTY).all(axis=1))
+        keys = _band_keys(signatures[valid], self.bands)
+        pairs = []
+        for band in range(self.bands):
+            sk, ids = self._sorted_keys[band], self._sorted_ids[band]
+            left = np.searchsorted(sk, keys[:, band], side="left")
+            right = np.searchsorted(sk, keys[:, band], side="right")
+            counts = right - left
+            hit = np.flatnonzero(counts)
+            if hit.size == 0:
+                continue
+            q = np.repeat(valid[hit], counts[hit])
+            offsets = np.arange(counts[hit].sum()) - np.repeat(np.cumsum(counts[hit]) - counts[hit], counts[hit])
+            pairs.append(q.astype(np.int64) * self.size + ids[np.repeat(left[hit], counts[hit]) + offsets])
+        if not pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        flat = np.unique(np.concatenate(pairs))
+        return np.stack([flat // self.size, flat % self.size], axis=1)
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def find_overlaps(
+    train_texts: Sequence[str],
+    test_texts: Sequence[str],
+    threshold: float = 0.7,
+    hasher: Optional[MinHasher] = None,
+    bands: int = 32,
+    train_signatures: Optional[np.ndarray] = None,
+    test_signatures: Optional[np.ndarray] = None,
+    index: Optional[LSHIndex] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Train questions whose exact shingle Jaccard with some test question is >= threshold:
+    [{"train_index", "test_index", "jaccard"}], best match per train question, sorted by train_index.
+    Precomputed (e.g. cached) signatures and a prebuilt test index can be passed in.
+    """
+    hasher = hasher or MinHasher()
+    if index is None:
+        if test_signatures is None:
+            test_signatures = hasher.signatures(test_texts)
+        index = LSHIndex(test_signatures, bands)
+    if train_signatures is None:
+        train_signatures = hasher.signatures(train_texts)
+    candidates = index.query(train_signatures)
+    shingle_cache: Dict[Tuple[str, int], Set[str]] = {}
+
+    def shingles(kind: str, i: int, texts: Sequence[str]) -> Set[str]:
+        key = (kind, i)
+        if key not in shingle_cache:
+            shingle_cache[key] = hasher.shingles(texts[i])
+        return shingle_cache[key]
+
+    best: Dict[int, Dict[str, Any]] = {}
+    for i, j in candidates.tolist():
+        score = jaccard(shingles("train", i, train_texts), shingles("test", j, test_texts))
+        if score >= threshold and score > best.get(i, {}).get("jaccard", -1.0):
+            best[i] = {"train_index": i, "test_index": j, "jaccard": score}
+    return [best[i] for i in sorted(best)]
+
+
+def cached_signatures(
+    path: Union[str, Path], texts_fn: Callable[[], Sequence[str]], hasher: MinHasher, use_cache: bool = True
+) -> np.ndarray:
+    """
+    Signatures of the questions of a file, cached under dca.io.cache_dir() and keyed by the
+    file's content digest and the hasher parameters. texts_fn is only called on a miss.
+    """
+    if not use_cache:
+        return hasher.signatures(texts_fn())
+    digest = file_digest(path).hex()
+    cache_file = cache_path(path, ".minhash-{}.npz".format(hasher.params))
+    try:
+        with np.load(cache_file) as data:
+            if str(data["digest"]) == digest:
+                return data["signatures"]
+    except (OSError, KeyError, ValueError):
+        pass
+    sigs = hasher.signatures(texts_fn())
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_name(cache_file.name + ".tmp.npz")
+        np.savez(tmp, signatures=sigs, digest=np.array(digest))
+        tmp.replace(cache_file)
+    except OSError:
+        pass
+    return sigs
@@ -0,0 +1,210 @@
+"""
+Per-step advantage diagnostics in a fixed-size memory-mapped ring buffer.
+
+compute_advantage(..., diagnostics=summary) fills `summary` from the intermediates of the
+vectorized DCA-GRPO pass (dca.advantage.advantage_dca_grpo_batch); DiagnosticsRing.append
+writes it as one fixed-width float64 record into a file that another process can read while
+training runs:
+
+  ring = DiagnosticsRing("runs/exp1/diagnostics.ring", capacity=65536)
+  advantages = compute_advantage_for_verl(batch, adv_mode="dca", group_size=8, diagnostics=ring)
+
+  python -m dca.diagnostics runs/exp1/diagnostics.ring --follow     # tail from another shell
+
+File layout: a 4096-byte header (magic, record width, capacity, records written / started,
+field names as JSON) followed by capacity records. The writer bumps `started`, fills slot
+(written % capacity), then bumps `written`, so a reader that re-checks `started` after copying
+can discard slots that were overwritten while it was reading.
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .advantage import RHO_BINS
+
+MAGIC = b"DCADIAG1"
+HEADER_SIZE = 4096
+_HEADER = struct.Struct("<8sIIQQQ")  # magic, version, fields, capacity, written, started
+_WRITTEN_OFFSET = 24
+_STARTED_OFFSET = 32
+_NAMES_OFFSET = _HEADER.size
+
+SUMMARY_FIELDS = (
+    "groups",
+    "group_size",
+    "rho_mean",
+    "degenerate_frac",
+    "acc_abs_mean",
+    "len_abs_mean",
+    "len_to_acc",
+    "len_std_mean",
+    "correct_len_mean",
+    "sigma_eps_fires",
+)
+FIELDS = ("step", "time") + SUMMARY_FIELDS + tuple("rho_hist_{}".format(i) for i in range(RHO_BINS))
+
+
+def _read_header(buf: Any) -> Tuple[int, int, int, List[str]]:
+    magic, _, nfields, capacity, written, _ = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a diagnostics ring file")
+    size = struct.unpack_from("<I", buf, _NAMES_OFFSET)[0]
+    names = json.loads(bytes(buf[_NAMES_OFFSET + 4 : _NAMES_OFFSET + 4 + size]).decode("utf-8"))
+    return nfields, capacity, written, names
+
+
+class DiagnosticsRing:
+    """
+    Single-writer ring buffer of diagnostics records backed by a memory-mapped file.
+
+    An existing file with the same fields and capacity is appended to (training restarts keep
+    their history); otherwise it is recreated. Callable as ring(summary) = append(summary).
+    """
+
+    def __init__(self, path: Union[str, Path], capacity: int = 65536, fields: Sequence[str] = FIELDS):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.path = Path(path)
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        names = json.dumps(list(self.fields)).encode("utf-8")
+        if _NAMES_OFFSET + 4 + len(names) > HEADER_SIZE:
+            raise ValueError("too many diagnostics fields for the header")
+        size = HEADER_SIZE + capacity * len(self.fields) * 8
+        reuse = False
+        if self.path.exists() and self.path.stat().st_size == size:
+            with open(self.path, "rb") as f:
+                try:
+                    nfields, cap, _, old = _read_header(f.read(HEADER_SIZE))
+                    reuse = cap == capacity and old == list(self.fields)
+                except (ValueError, struct.error):
+                    reuse = False
+        if not reuse:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.truncate(size)
+                f.write(_HEADER.pack(MAGIC, 1, len(self.fields), capacity, 0, 0))
+                f.write(struct.pack("<I", len(names)) + names)
+        self._file = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._records = np.frombuffer(self._mm, dtype=np.float64, count=capacity * len(self.fields), offset=HEADER_SIZE)
+        self._records = self._records.reshape(capacity, len(self.fields))
+        self.written = _HEADER.unpack_from(self._mm, 0)[4]
+        struct.pack_into("<Q", self._mm, _STARTED_OFFSET, self.written)  # after an interrupted write
+        self._row = np.empty(len(self.fields), dtype=np.float64)
+
+    def append(self, summary: Dict[str, Any], step: Optional[int] = None) -> None:
+        """Write one record; missing fields are NaN, rho_hist (array) fills rho_hist_0.. ."""
+        if not summary:
+            return
+        row = self._row
+        row.fill(math.nan)
+        index = self._index
+        for key, value in summary.items():
+            if key == "rho_hist":
+                for i, v in enumerate(value):
+                    j = index.get("rho_hist_{}".format(i))
+                    if j is not None:
+                        row[j] = v
+            elif key in index:
+                row[index[key]] = value
+        if "step" in index:
+            row[index["step"]] = self.written if step is None else step
+        if "time" in index:
+            row[index["time"]] = time.time()
+        struct.pack_into("<Q", self._mm, _STARTED_OFFSET, self.written + 1)
+        self._records[self.written % self.capacity] = row
+        self.written += 1
+        struct.pack_into("<Q", self._mm, _WRITTEN_OFFSET, self.written)
+
+    __call__ = append
+
+    def flush(self) -> None:
+        self._mm.flush()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._records = None
+            self._mm.flush()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    def __enter__(self) -> "DiagnosticsRing":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_ring(path: Union[str, Path], since: int = 0) -> Tuple[np.ndarray, List[str], int]:
+    """
+    (records, field names, written): records appended at or after sequence number `since`
+    that are still in the ring, oldest first, as a (k, fields) float64 copy. Pass the returned
+    `written` as the next `since` to tail the file.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            nfields, capacity, written, names = _read_header(mm)
+            data = np.frombuffer(mm, dtype=np.float64, count=capacity * nfields, offset=HEADER_SIZE)
+            data = data.reshape(capacity, nfields)
+            first = max(since, written - capacity)
+            seq = np.arange(first, written)
+            records = data[seq % capacity].copy()
+            started = _HEADER.unpack_from(mm, 0)[5]
+            del data
+        finally:
+            mm.close()
+    # drop slots the writer started overwriting while we copied
+    valid = seq >= started - capacity
+    return records[valid], names, written
+
+
+def iter_records(path: Union[str, Path], since: int = 0) -> Iterator[Dict[str, float]]:
+    records, names, _ = read_ring(path, since)
+    for row in records:
+        yield dict(zip(names, row.tolist()))
+
+
+def follow(path: Union[str, Path], since: int = 0, interval: float = 1.0) -> Iterator[Dict[str, float]]:
+    """Yield records as the writer appends them (like tail -f)."""
+    while True:
+        records, names, since = read_ring(path, since)
+        for row in records:
+            yield dict(zip(names, row.tolist()))
+        time.sleep(interval)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Print advantage diagnostics from a ring buffer file.")
+    parser.add_argument("path")
+    parser.add_argument("--last", type=int, default=20, help="Records to print (0 = all in the ring)")
+    parser.add_argument("--follow", action="store_true", help="Keep printing new records")
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.path):
+        print("No such file: {}".format(args.path), file=sys.stderr)
+        return 1
+    _, _, written = read_ring(args.path, since=1 << 62)
+    since = max(written - args.last, 0) if args.last else 0
+    rows = follow(args.path, since, args.interval) if args.follow else iter_records(args.path, since)
+    for rec in rows:
+        print(json.dumps({k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in rec.items()}))
+        sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Shared file I/O with transparent compression for datasets and result files.
+
+open_text picks the codec from the file's magic bytes when reading (falling back to the
+extension) and from the extension when writing:
+  .gz          gzip (stdlib)
+  .zst, .zstd  zstandard (optional: pip install zstandard)
+  anything else: plain text
+Decompression streams through large buffered blocks (default 1 MiB), so big JSONL dumps
+are read without a manual decompress step and without loading the file at once.
+Only the standard library is imported at module load.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+PathLike = Union[str, Path]
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+
+def strip_compression_suffix(path: PathLike) -> Path:
+    """data/x.jsonl.gz -> data/x.jsonl (unchanged if not compressed by extension)."""
+    path = Path(path)
+    if path.suffix.lower() in COMPRESSION_SUFFIXES:
+        return path.with_suffix("")
+    return path
+
+
+def detect_codec(path: PathLike, mode: str = "r") -> Optional[str]:
+    """"gzip" | "zstd" | None. Reads sniff magic bytes; writes use the extension."""
+    path = Path(path)
+    if "r" in mode and path.is_file():
+        with open(path, "rb") as f:
+            head = f.read(4)
+        for magic, codec in _MAGIC:
+            if head.startswith(magic):
+                return codec
+        return None
+    return COMPRESSION_SUFFIXES.get(path.suffix.lower())
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd-compressed files need the optional 'zstandard' package: pip install zstandard") from e
+    return zstandard
+
+
+def open_binary(
+    path: PathLike,
+    mode: str = "rb",
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    level: Optional[int] = None,
+):
+    """Open a (possibly compressed) file as a buffered binary stream; mode "rb", "wb" or "ab"."""
+    path = Path(path)
+    codec = detect_codec(path, mode)
+    if codec is None:
+        return open(path, mode, buffering=buffer_size)
+    raw = open(path, mode)
+    if codec == "gzip":
+        stream = gzip.GzipFile(fileobj=raw, mode=mode, compresslevel=6 if level is None else level)
+        # GzipFile does not own fileobj; close it with the wrapper
+        stream.myfileobj = raw
+    else:
+        zstd = _zstandard()
+        if "r" in mode:
+            stream = zstd.ZstdDecompressor().stream_reader(raw, read_size=buffer_size, closefd=True)
+        else:
+            stream = zstd.ZstdCompressor(level=3 if level is None else level).stream_writer(
+                raw, write_size=buffer_size, closefd=True
+            )
+    if "r" in mode:
+        return io.BufferedReader(stream, buffer_size=buffer_size)
+    return io.BufferedWriter(stream, buffer_size=buffer_size)
+
+
+def open_text(
+    path: PathLike,
+    mode: str = "r",
+    encoding: str = "utf-8",
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    level: Optional[int] = None,
+    newline: Optional[str] = None,
+):
+    """Open a (possibly compressed) text file; mode "r", "w" or "a". newline as in open()."""
+    mode = mode.replace("t", "")
+    binary = open_binary(path, mode.replace("b", "") + "b", buffer_size=buffer_size, level=level)
+    return io.TextIOWrapper(binary, encoding=encoding, newline=newline)
+
+
+def iter_jsonl(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """Stream JSON objects from a (possibly compressed) JSONL file, skipping blank lines."""
+    with open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def write_jsonl(path: PathLike, rows: Iterable[Dict[str, Any]], ensure_ascii: bool = False) -> int:
+    """Write rows as JSONL (compressed if the extension says so); creates parent dirs. Returns row count."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with open_text(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=ensure_ascii) + "\n")
+            n += 1
+    return n
+
+
+def load_json(path: PathLike) -> Any:
+    """json.load of a (possibly compressed) JSON file."""
+    with open_text(path) as f:
+        return json.load(f)
+
+
+def iter_json_array(path: PathLike, chunk_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[Tuple[Any, int, int]]:
+    """
+    Incrementally parse a top-level JSON array, yielding (element, byte_start, byte_end).
+
+    Reads chunk_size characters at a time and decodes one element with JSONDecoder.raw_decode,
+    so a multi-GB array is never held in memory at once. Byte offsets are positions in the
+    (decompressed) UTF-8 stream; newlines are not translated, so CRLF files index correctly.
+    Raises ValueError if the document is not an array.
+    """
+    decoder = json.JSONDecoder()
+    with open_text(path, newline="") as f:
+        buf = f.read(chunk_size)
+        eof = not buf
+        pos = 0
+        byte_pos = 0
+
+        def advance(new_pos: int) -> None:
+            nonlocal pos, byte_pos
+            byte_pos += len(buf[pos:new_pos].encode("utf-8"))
+            pos = new_pos
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            more = f.read(chunk_size)
+            if not more:
+                eof = True
+                return False
+            buf = buf[pos:] + more
+            pos = 0
+            return True
+
+        def skip_ws() -> str:
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    advance(pos + 1)
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ""
+
+        if buf.startswith("\ufeff"):
+            advance(1)
+        if skip_ws() != "[":
+            raise ValueError("{} is not a JSON array".format(path))
+        advance(pos + 1)
+        first = True
+        while True:
+            ch = skip_ws()
+            if ch == "]":
+                return
+            if not first:
+                if ch != ",":
+                    raise ValueError("malformed JSON array in {} at byte {}".format(path, byte_pos))
+                advance(pos + 1)
+                skip_ws()
+            first = False
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if fill():
+                        continue
+                    raise
+                # A scalar ending exactly at the buffer edge may continue in the next chunk
+                if end == len(buf) and fill():
+                    continue
+                break
+            start = byte_pos
+            advance(end)
+            yield obj, start, byte_pos
+
+
+def iter_json_records(path: PathLike, keys: Sequence[str] = ("data",)) -> Iterator[Any]:
+    """
+    Records of a JSON document: streamed element by element for a top-level array, otherwise
+    json.load + the first of keys present (e.g. {"data": [...]}).
+    """
+    with open_text(path) as f:
+        head = f.read(4096).lstrip("\ufeff \t\r\n")
+    if head.startswith("["):
+        for obj, _, _ in iter_json_array(path):
+            yield obj
+        return
+    raw = load_json(path)
+    if isinstance(raw, list):
+        yield from raw
+        return
+    for key in keys:
+        if key in raw:
+            yield from raw[key]
+            return
+
+
+def cache_dir() -> Path:
+    """Directory for derived caches (indexes, parsed datasets): $DCA_CACHE_DIR or ~/.cache/dca."""
+    root = os.environ.get("DCA_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "dca")
+    return Path(root)
+
+
+def cache_path(source: PathLike, suffix: str) -> Path:
+    """Cache file for a source file, keyed by its absolute path: <cache_dir>/<name>-<hash><suffix>."""
+    source = Path(source).resolve()
+    digest = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:16]
+    return cache_dir() / "{}-{}{}".format(source.name, digest, suffix)
@@ -0,0 +1,236 @@
+"""
+Lazy dataset objects backed by a byte-offset index, for large prompt pools.
+
+open_dataset(path) returns a LazyDataset instead of a list of dicts. On first open it scans
+the file once and records the byte span of every record (one line of JSONL, or one element of
+a top-level JSON array, parsed incrementally). The index is cached next to other derived data
+(dca.io.cache_dir) and reused while the source size and mtime are unchanged, so later opens
+cost one small read. Records are then read on demand with a single positioned read:
+
+  ds = open_dataset("data/math500_test.json")
+  len(ds); ds[17]; ds[100:200]; ds.shard(rank, world_size)
+
+Slices and shards are views (a range over the parent index); nothing is materialized.
+Compressed sources (.gz / .zst) cannot be seeked, so their record bytes are kept in memory
+after the first scan; use uncompressed files for true O(1) random access.
+Only the standard library is used.
+"""
+
+import json
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .data_utils import (
+    dataset_kind,
+    normalize_generic_item,
+    normalize_gsm8k_item,
+    normalize_math_item,
+)
+from .io import cache_path, detect_codec, iter_json_array, iter_json_records, open_binary, strip_compression_suffix
+
+_INDEX_MAGIC = b"DCAIDX01"
+_INDEX_HEADER = struct.Struct("<8sQqQ")  # magic, size, mtime_ns, count
+
+
+class RecordIndex:
+    """Byte spans [start, end) of the records of one source file."""
+
+    def __init__(self, starts: array, ends: array, size: int, mtime_ns: int):
+        self.starts = starts
+        self.ends = ends
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, path: Path, keep_bytes: bool = False) -> Tuple["RecordIndex", Optional[List[bytes]]]:
+        """Scan path once. For JSONL each non-blank line is a record; otherwise a top-level JSON array."""
+        st = path.stat()
+        starts, ends = array("Q"), array("Q")
+        kept: Optional[List[bytes]] = [] if keep_bytes else None
+        if strip_compression_suffix(path).suffix == ".jsonl":
+            pos = 0
+            with open_binary(path) as f:
+                for line in f:
+                    stripped = line.strip()
+                    if stripped:
+                        starts.append(pos)
+                        ends.append(pos + len(line))
+                        if kept is not None:
+                            kept.append(stripped)
+                    pos += len(line)
+        elif _is_json_array(path):
+            for obj, start, end in iter_json_array(path):
+                starts.append(start)
+                ends.append(end)
+                if kept is not None:
+                    kept.append(json.dumps(obj).encode("utf-8"))
+        else:
+            # {"data": [...]}-style document: no per-record spans, keep records in memory
+            kept = [json.dumps(obj).encode("utf-8") for obj in iter_json_records(path, keys=("data", "examples"))]
+            starts.extend(range(len(kept)))
+            ends.extend(range(len(kept)))
+        return cls(starts, ends, st.st_size, st.st_mtime_ns), kept
+
+    def save(self, index_path: Path) -> None:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(index_path.name + ".tmp{}".format(os.getpid()))
+        with open(tmp, "wb") as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, self.size, self.mtime_ns, len(self.starts)))
+            self.starts.tofile(f)
+            self.ends.tofile(f)
+        os.replace(tmp, index_path)
+
+    @classmethod
+    def load(cls, index_path: Path, size: int, mtime_ns: int) -> Optional["RecordIndex"]:
+        """Cached index if it exists and matches the source size / mtime, else None."""
+        try:
+            with open(index_path, "rb") as f:
+                magic, c_size, c_mtime, count = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+                if magic != _INDEX_MAGIC or c_size != size or c_mtime != mtime_ns:
+                    return None
+                starts, ends = array("Q"), array("Q")
+                starts.fromfile(f, count)
+                ends.fromfile(f, count)
+        except (OSError, struct.error, EOFError):
+            return None
+        return cls(starts, ends, size, mtime_ns)
+
+
+def _is_json_array(path: Path) -> bool:
+    with open_binary(path) as f:
+        head = f.read(4096).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return head.startswith(b"[")
+
+
+def load_index(path: Union[str, Path], use_cache: bool = True) -> Tuple[RecordIndex, Optional[List[bytes]]]:
+    """
+    Record index for path, from the cache when valid. Sources without seekable record spans
+    (compressed, or a JSON object wrapping the records) also return the record bytes.
+    """
+    path = Path(path)
+    compressed = detect_codec(path) is not None
+    if compressed:
+        return RecordIndex.build(path, keep_bytes=True)
+    st = path.stat()
+    index_path = cache_path(path, ".idx")
+    if use_cache:
+        cached = RecordIndex.load(index_path, st.st_size, st.st_mtime_ns)
+        if cached is not None:
+            return cached, None
+    index, kept = RecordIndex.build(path)
+    if kept is not None:
+        return index, kept
+    if use_cache:
+        try:
+            index.save(index_path)
+        except OSError:
+            pass  # read-only cache dir: keep the in-memory index
+    return index, None
+
+
+def _normalizer(path: Path, dataset: Optional[str]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    kind = dataset_kind(str(path), dataset)
+    if kind == "gsm8k":
+        return normalize_gsm8k_item
+    if kind == "math":
+        return normalize_math_item
+    name = strip_compression_suffix(path).stem
+    return lambda item: normalize_generic_item(item, name)
+
+
+class _Source:
+    """Open file + index shared by a dataset and all of its views (fork-safe lazy fd)."""
+
+    def __init__(self, path: Path, index: RecordIndex, kept: Optional[List[bytes]]):
+        self.path = path
+        self.index = index
+        self.kept = kept
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+
+    def read(self, i: int) -> bytes:
+        if self.kept is not None:
+            return self.kept[i]
+        start, end = self.index.starts[i], self.index.ends[i]
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(str(self.path), os.O_RDONLY)
+            self._pid = os.getpid()
+        if hasattr(os, "pread"):
+            return os.pread(self._fd, end - start, start)
+        os.lseek(self._fd, start, os.SEEK_SET)
+        return os.read(self._fd, end - start)
+
+    def __del__(self):
+        if self._fd is not None and self._pid == os.getpid():
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+
+
+class LazyDataset:
+    """
+    Sequence of normalized records ({question, answer, dataset[, level]}) read on demand.
+
+    Supports len(), integer indexing (O(1): one positioned read + json.loads), slicing and
+    shard(rank, world_size); slices and shards are views sharing the same index and file.
+    """
+
+    def __init__(self, source: _Source, normalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 positions: Optional[range] = None):
+        self._source = source
+        self._normalize = normalize
+        self._positions = range(len(source.index)) if positions is None else positions
+
+    @property
+    def path(self) -> Path:
+        return self._source.path
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def raw(self, i: int) -> Dict[str, Any]:
+        """Un-normalized source record i."""
+        return json.loads(self._source.read(self._positions[i]))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return LazyDataset(self._source, self._normalize, self._positions[key])
+        return self._normalize(self.raw(key))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def shard(self, rank: int, world_size: int, contiguous: bool = False) -> "LazyDataset":
+        """
+        Records for one rank: strided (rank, rank + world_size, ...) by default, or a contiguous
+        block when contiguous=True. Shards of all ranks partition the dataset.
+        """
+        if not 0 <= rank < world_size:
+            raise ValueError("rank must be in [0, world_size)")
+        if not contiguous:
+            return LazyDataset(self._source, self._normalize, self._positions[rank::world_size])
+        n = len(self._positions)
+        lo = rank * n // world_size
+        hi = (rank + 1) * n // world_size
+        return LazyDataset(self._source, self._normalize, self._positions[lo:hi])
+
+    def __repr__(self) -> str:
+        return "LazyDataset({!s}, n={})".format(self._source.path, len(self))
+
+
+def open_dataset(path: Union[str, Path], dataset: Optional[str] = None, use_cache: bool = True) -> LazyDataset:
+    """
+    Lazy counterpart of dca.data_utils.load_dataset: same record normalization
+    (gsm8k / math / generic by dataset name or file name), without materializing the file.
+    """
+    path = Path(path)
+    index, kept = load_index(path, use_cache=use_cache)
+    return LazyDataset(_Source(path, index, kept), _normalizer(path, dataset))
@@ -0,0 +1,240 @@
+"""
+Length-bucketed generation batches from per-prompt response-length history.
+
+A generation batch pads every response to the longest one, so mixing prompts whose answers
+run to 200 tokens with ones that hit max_tokens wastes most of the KV cache. The lengths
+already passed to the advantage hooks predict the next ones well: LengthBucketedComposer
+keeps them per prompt (a dca.prompt_stats.LengthBaselineStore fed with all response
+lengths), puts candidate prompts into length buckets and emits batches drawn from one
+bucket, filled up to a padded-token budget:
+
+  composer = LengthBucketedComposer(sampler, token_budget=256_000, group_size=8)
+  for step in range(steps):
+      ids = composer.next_batch()                 # prompt ids of similar expected length
+      ... generate group_size responses per prompt, score ...
+      composer.observe(ids, response_lengths)     # per prompt: its responses' token counts
+  composer.report()                               # padding efficiency, predicted vs. realized
+
+The wrapped sampler decides which prompts are trained on; the composer only reorders them.
+Every drawn prompt is emitted, prompts that waited max_wait batches go first, so the
+long-run prompt distribution is the sampler's. A prompt id is in the pool at most once, so
+a batch never repeats a prompt: sample(n) samplers are asked for extra ids and the ones
+already waiting are skipped; a repeat from an iterator or next_index() sampler is held
+back until the waiting copy has been emitted.
+"""
+
+import bisect
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .prompt_stats import LengthBaselineStore
+
+DEFAULT_BOUNDARIES = (256, 512, 1024, 2048, 4096, 8192)
+
+
+class LengthBucketedComposer:
+    """
+    Wraps a prompt sampler and composes length-homogeneous generation batches.
+
+    sampler : a dca.sampler.MultiSourceSampler (ids are (source, index); records() resolves
+        them), anything with sample(n) -> prompt ids (e.g. dca.prompt_stats.DifficultyAwareSampler),
+        or an iterator of prompt ids.
+    token_budget : padded tokens per batch, prompts * group_size * longest expected response.
+    group_size : responses generated per prompt.
+    boundaries : upper length edges of the buckets (a last bucket runs to max_tokens).
+    max_tokens : generation limit; predictions are capped at it.
+    default_length : expected length of unseen prompts (default: running mean of observed
+        lengths, or 1024 before anything is observed).
+    quantile_z : expected length = mean + quantile_z * std of the prompt's history.
+    pool_size : candidate prompts kept drawn ahead of time (bigger = fuller buckets); default
+        1024, capped at the population of a sample(n) sampler (num_prompts or len()). Each
+        refill is one sample() call, so the sampler advances one step per batch.
+    max_wait : batches a candidate may wait before its bucket is served next.
+    store : length history; by default a fresh LengthBaselineStore(decay=0.8).
+    """
+
+    def __init__(
+        self,
+        sampler: Any,
+        token_budget: int,
+        group_size: int = 1,
+        boundaries: Sequence[int] = DEFAULT_BOUNDARIES,
+        max_tokens: int = 16384,
+        default_length: Optional[float] = None,
+        quantile_z: float = 1.0,
+        pool_size: Optional[int] = None,
+        max_wait: int = 8,
+        store: Optional[LengthBaselineStore] = None,
+    ):
+        self.sampler = sampler
+        self._population = self._sampler_population()
+        if pool_size is None:
+            pool_size = 1024
+        if self._population:
+            pool_size = min(pool_size, self._population)  # distinct ids only
+        if token_budget <= 0 or group_size <= 0 or pool_size <= 0:
+            raise ValueError("token_budget, group_size and pool_size must be positive")
+        self.token_budget = token_budget
+        self.group_size = group_size
+        self.boundaries = sorted(b for b in boundaries if b < max_tokens)
+        self.max_tokens = max_tokens
+        self.default_length = default_length
+        self.quantile_z = quantile_z
+        self.pool_size = pool_size
+        self.max_wait = max_wait
+        self.store = store if store is not None else LengthBaselineStore(decay=0.8)
+        self.batches = 0
+        # per bucket: FIFO of (prompt id, expected length, batch counter when drawn)
+        self._buckets: List[Deque[Tuple[Hashable, float, int]]] = [deque() for _ in range(len(self.boundaries) + 1)]
+        self._pending = 0
+        self._queued: Set[Hashable] = set()  # ids waiting in a bucket
+        self._deferred: List[Hashable] = []  # repeats of queued ids, drawn again later
+        self._iter: Optional[Iterator[Any]] = None
+        # running totals for report()
+        self._length_sum = 0.0
+        self._length_count = 0
+        self._predicted_used = 0.0
+        self._predicted_padded = 0.0
+        self._used = 0.0
+        self._padded = 0.0
+        self._prompts = 0
+
+    # -- drawing -------------------------------------------------------------------------
+
+    def _sampler_population(self) -> Optional[int]:
+        """Prompts a sample(n) sampler can return per call (None: unbounded / not a sample(n) sampler)."""
+        if hasattr(self.sampler, "next_index") or not hasattr(self.sampler, "sample"):
+            return None
+        n = getattr(self.sampler, "num_prompts", None)
+        if n is None and hasattr(self.sampler, "__len__"):
+            n = len(self.sampler)
+        return int(n) if n is not None else None
+
+    def _draw(self, n: int) -> List[Hashable]:
+        if hasattr(self.sampler, "next_index"):
+            return [self.sampler.next_index() for _ in range(n)]
+        if hasattr(self.sampler, "sample"):
+            # one call (one sampler step) with room to skip the ids already queued
+            k = n + len(self._queued)
+            if self._population is not None:
+                k = min(k, self._population)
+            ids = (x.item() if isinstance(x, np.generic) else x for x in self.sampler.sample(k))
+            return [pid for pid in ids if pid not in self._queued][:n]
+        if self._iter is None:
+            self._iter = iter(self.sampler)
+        out = []
+        for pid in self._iter:
+            out.append(pid)
+            if len(out) == n:
+                break
+        return out
+
+    def records(self, prompt_ids: Sequence[Hashable]) -> List[Any]:
+        """Records of (source, index) ids drawn from a MultiSourceSampler."""
+        return [self.sampler.sources[s][i] for s, i in prompt_ids]
+
+    def expected_length(self, prompt_id: Hashable) -> float:
+        base = self.store.baseline(prompt_id)
+        if base is None:
+            if self.default_length is not None:
+                guess = self.default_length
+            else:
+                guess = self._length_sum / self._length_count if self._length_count else 1024.0
+            return float(min(guess, self.max_tokens))
+        mean, var, _ = base
+        return float(min(mean + self.quantile_z * np.sqrt(var), self.max_tokens))
+
+    def bucket_of(self, length: float) -> int:
+        return bisect.bisect_left(self.boundaries, length)
+
+    def _refill(self) -> None:
+        want = self.pool_size - self._pending
+        if want <= 0:
+            return
+        ids, self._deferred = self._deferred[:want], self._deferred[want:]
+        if len(ids) < want:
+            ids += self._draw(want - len(ids))
+        for pid in ids:
+            if pid in self._queued:
+                self._deferred.append(pid)
+                continue
+            length = self.expected_length(pid)
+            self._buckets[self.bucket_of(length)].append((pid, length, self.batches))
+            self._queued.add(pid)
+            self._pending += 1
+
+    # -- composing -----------------------------------------------------------------------
+
+    def _choose_bucket(self) -> int:
+        heads = [(q[0][2], b) for b, q in enumerate(self._buckets) if q]
+        oldest_drawn, oldest_bucket = min(heads)
+        if self.batches - oldest_drawn >= self.max_wait:
+            return oldest_bucket
+        # otherwise the bucket holding the most padded tokens worth of work
+        return max(
+            (b for _, b in heads),
+            key=lambda b: len(self._buckets[b]) * max(length for _, length, _ in self._buckets[b]),
+        )
+
+    def next_batch(self) -> List[Hashable]:
+        """Prompt ids of one batch; empty only when the sampler is exhausted."""
+        self._refill()
+        if self._pending == 0:
+            return []
+        b = self._choose_bucket()
+        batch: List[Hashable] = []
+        lengths: List[float] = []
+        longest = 0.0
+        # the chosen bucket first, then shorter buckets: they fit under the same padded length
+        for q in [self._buckets[b]] + [self._buckets[k] for k in range(b - 1, -1, -1)]:
+            while q:
+                pid, length, _ = q[0]
+                top = max(longest, length)
+                if batch and (len(batch) + 1) * self.group_size * top > self.token_budget:
+                    break
+                q.popleft()
+                batch.append(pid)
+                lengths.append(length)
+                longest = top
+            if batch and (len(batch) + 1) * self.group_size * longest > self.token_budget:
+                break
+        self._pending -= len(batch)
+        self._queued.difference_update(batch)
+        self.batches += 1
+        self._prompts += len(batch)
+        self._predicted_used += self.group_size * sum(lengths)
+        self._predicted_padded += self.group_size * len(batch) * longest
+        return batch
+
+    def __iter__(self) -> Iterator[List[Hashable]]:
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                return
+            yield batch
+
+    def observe(self, prompt_ids: Sequence[Hashable], length_groups: Sequence[Sequence[float]]) -> None:
+        """Record a generated batch: per prompt, its responses' token counts (any number)."""
+        groups = [np.asarray(l, dtype=np.float64).ravel() for l in length_groups]
+        self.store.observe(prompt_ids, [np.ones(g.size, dtype=bool) for g in groups], groups)
+        flat = np.concatenate(groups) if groups else np.zeros(0)
+        if flat.size:
+            self._length_sum += float(flat.sum())
+            self._length_count += flat.size
+            self._used += float(flat.sum())
+            self._padded += flat.size * float(flat.max())
+
+    def report(self) -> Dict[str, float]:
+        """
+        padding_efficiency: real / padded tokens of observed batches (1.0 = no padding);
+        predicted_padding_efficiency: the same from the expected lengths used to compose them.
+        """
+        return {
+            "batches": self.batches,
+            "prompts_per_batch": self._prompts / self.batches if self.batches else 0.0,
+            "pending": self._pending,
+            "padding_efficiency": self._used / self._padded if self._padded else 0.0,
+            "predicted_padding_efficiency": self._predicted_used / self._predicted_padded if self._predicted_padded else 0.0,
+        }
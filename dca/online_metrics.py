@@ -0,0 +1,166 @@
+"""
+Online training-time metrics from rollout batches (no separate evaluation pass).
+
+RolloutMetrics is an optional observer for compute_advantage_for_verl / compute_advantage_for_slime.
+The hooks already see correctness and lengths for every training rollout; the observer folds each
+batch into rolling aggregates with vectorized O(1)-per-response updates:
+
+  - accuracy per data_source: current step, EMA across steps, cumulative
+  - response length percentiles via a mergeable QuantileSketch (all / correct responses)
+  - distribution of the group pass rate ρ = n/G (the DDCA coefficient)
+  - fraction of degenerate groups (all correct or all wrong: zero accuracy advantage)
+
+Usage:
+  obs = RolloutMetrics()
+  adv = compute_advantage_for_verl(batch, adv_mode="dca", group_size=G, observer=obs)
+  logger.log(obs.snapshot(step))
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from .streaming import QuantileSketch, RunningStats
+
+
+class RolloutMetrics:
+    """
+    Rolling per-step metrics over training rollouts.
+
+    Parameters
+    ----------
+    ema_decay : float
+        Decay for the per-data_source EMA accuracy (weight on the previous value).
+    rho_bins : int
+        Number of equal-width bins for the ρ histogram over [0, 1].
+    sketch_alpha : float
+        Relative accuracy of the length percentile sketches.
+    quantiles : sequence of float
+        Length quantiles reported by snapshot().
+    """
+
+    def __init__(
+        self,
+        ema_decay: float = 0.9,
+        rho_bins: int = 10,
+        sketch_alpha: float = 0.01,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+    ):
+        self.ema_decay = ema_decay
+        self.rho_bins = rho_bins
+        self.sketch_alpha = sketch_alpha
+        self.quantiles = tuple(quantiles)
+        self._ema: Dict[str, float] = {}
+        self._total: Dict[str, np.ndarray] = {}
+        self._total_groups = 0
+        self._total_degenerate = 0
+        self._reset_step()
+
+    def _reset_step(self) -> None:
+        self._step_counts: Dict[str, np.ndarray] = {}
+        self._len_all = QuantileSketch(self.sketch_alpha)
+        self._len_correct = QuantileSketch(self.sketch_alpha)
+        self._len_stats = RunningStats()
+        self._rho_hist = np.zeros(self.rho_bins, dtype=np.int64)
+        self._rho_stats = RunningStats()
+        self._groups = 0
+        self._degenerate = 0
+        self._all_correct = 0
+        self._all_wrong = 0
+
+    def observe(
+        self,
+        correct_mask: np.ndarray,
+        lengths: np.ndarray,
+        data_sources: Optional[Sequence[Any]] = None,
+    ) -> None:
+        """
+        Fold one batch into the current step.
+
+        correct_mask, lengths : shape (B, G) or (G,) (one group).
+        data_sources : optional labels per response (size B*G) or per group (size B).
+        """
+        correct = np.asarray(correct_mask, dtype=bool)
+        lengths = np.asarray(lengths, dtype=np.float64)
+        if correct.ndim == 1:
+            correct = correct.reshape(1, -1)
+            lengths = lengths.reshape(1, -1)
+        B, G = correct.shape
+
+        n_correct = correct.sum(axis=1)
+        rho = n_correct / float(G)
+        self._rho_stats.update(rho)
+        bins = np.minimum((rho * self.rho_bins).astype(np.int64), self.rho_bins - 1)
+        self._rho_hist += np.bincount(bins, minlength=self.rho_bins)
+        all_correct = int((n_correct == G).sum())
+        all_wrong = int((n_correct == 0).sum())
+        self._groups += B
+        self._all_correct += all_correct
+        self._all_wrong += all_wrong
+        self._degenerate += all_correct + all_wrong
+
+        self._len_all.update(lengths)
+        self._len_correct.update(lengths[correct])
+        self._len_stats.update(lengths)
+
+        if data_sources is None:
+            labels = np.zeros(B * G, dtype=np.int64)
+            names = ["all"]
+        else:
+            ds = np.asarray(data_sources).ravel()
+            if ds.size == B:
+                ds = np.repeat(ds, G)
+            names_arr, labels = np.unique(ds, return_inverse=True)
+            names = [str(x) for x in names_arr.tolist()]
+        hits = np.bincount(labels, weights=correct.ravel().astype(np.float64), minlength=len(names))
+        seen = np.bincount(labels, minlength=len(names)).astype(np.float64)
+        for j, name in enumerate(names):
+            acc = self._step_counts.setdefault(name, np.zeros(2))
+            acc[0] += hits[j]
+            acc[1] += seen[j]
+
+    def snapshot(self, step: Optional[int] = None, reset: bool = True) -> Dict[str, Any]:
+        """
+        Export the current step's metrics (and rolling/cumulative values) as a plain dict.
+        With reset=True (default) the per-step accumulators start fresh afterwards.
+        """
+        accuracy: Dict[str, Dict[str, float]] = {}
+        for name, (hits, seen) in self._step_counts.items():
+            step_acc = hits / seen if seen > 0 else 0.0
+            ema = self._ema.get(name)
+            ema = step_acc if ema is None else self.ema_decay * ema + (1.0 - self.ema_decay) * step_acc
+            total = self._total.get(name, np.zeros(2)) + (hits, seen)
+            accuracy[name] = {
+                "step": step_acc,
+                "ema": ema,
+                "cumulative": total[0] / total[1] if total[1] > 0 else 0.0,
+                "responses": int(seen),
+            }
+            if reset:
+                self._ema[name] = ema
+                self._total[name] = total
+        groups = max(self._groups, 1)
+        total_groups = self._total_groups + self._groups
+        total_degenerate = self._total_degenerate + self._degenerate
+        out = {
+            "step": step,
+            "accuracy": accuracy,
+            "length": dict(mean=self._len_stats.mean, max=self._len_stats.max if self._len_stats.count else 0.0,
+                           **self._len_all.quantiles(self.quantiles)),
+            "length_correct": self._len_correct.quantiles(self.quantiles),
+            "rho": {
+                "mean": self._rho_stats.mean,
+                "std": self._rho_stats.std,
+                "hist": self._rho_hist.tolist(),
+            },
+            "groups": self._groups,
+            "degenerate_frac": self._degenerate / groups,
+            "all_correct_frac": self._all_correct / groups,
+            "all_wrong_frac": self._all_wrong / groups,
+            "degenerate_frac_cumulative": total_degenerate / max(total_groups, 1),
+        }
+        if reset:
+            self._total_groups = total_groups
+            self._total_degenerate = total_degenerate
+            self._reset_step()
+        return out
@@ -0,0 +1,263 @@
+"""
+Hot-path timing instrumentation: named stage timers, counters and latency histograms.
+
+Stages are timed with the @timed decorator or the timer() context manager; counters with
+count(). Everything is off by default and costs one global flag check per call while off.
+Enable it in code (profiling.enable()) or with a script's --profile flag:
+
+  python scripts/evaluate.py --results out.jsonl --profile              # breakdown at exit
+  python scripts/evaluate.py --results out.jsonl --profile prof.json    # + JSON export
+  python scripts/evaluate.py --results out.jsonl --profile prof.prom    # + Prometheus text
+
+Latencies go into log2 buckets from 1 us to ~17 s (plus +Inf); quantiles are read off the
+buckets (within a factor of 2). The registry is process-wide and thread-safe; stdlib only,
+so the data loading path stays numpy-free.
+"""
+
+import atexit
+import functools
+import json
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** k for k in range(25))  # upper bounds in seconds; +Inf after
+
+_enabled = False
+_lock = threading.Lock()
+_started = time.perf_counter()
+
+
+class StageStats:
+    """Count, total, min / max and bucketed latencies of one stage."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        k = 0 if seconds <= BUCKET_BOUNDS[0] else min(math.ceil(math.log2(seconds / BUCKET_BOUNDS[0])), len(BUCKET_BOUNDS))
+        self.buckets[k] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max for the +Inf bucket)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for k, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKET_BOUNDS[k], self.max) if k < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "min_s": self.min if self.count else 0.0,
+            "max_s": self.max,
+            "p50_s": self.quantile(0.5),
+            "p90_s": self.quantile(0.9),
+            "p99_s": self.quantile(0.99),
+            "buckets": self.buckets[:],
+        }
+
+
+_stages: Dict[str, StageStats] = {}
+_counters: Dict[str, float] = {}
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Drop all recorded stages and counters; wall time restarts now."""
+    global _started
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _started = time.perf_counter()
+
+
+def record(name: str, seconds: float) -> None:
+    """Add one latency sample to stage `name` (even while disabled)."""
+    with _lock:
+        stats = _stages.get(name)
+        if stats is None:
+            stats = _stages[name] = StageStats()
+        stats.add(seconds)
+
+
+def count(name: str, n: float = 1) -> None:
+    """Increment counter `name` by n (no-op while disabled)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator timing every call of the function as stage `name`."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - t0)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+@contextmanager
+def _timing(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL = _NullContext()
+
+
+def timer(name: str) -> Any:
+    """Context manager timing its block as stage `name`."""
+    return _timing(name) if _enabled else _NULL
+
+
+# -- export ----------------------------------------------------------------------------
+
+
+def snapshot() -> Dict[str, Any]:
+    """JSON-ready {wall_s, stages: {name: stats}, counters}."""
+    with _lock:
+        return {
+            "wall_s": time.perf_counter() - _started,
+            "stages": {name: s.to_dict() for name, s in sorted(_stages.items())},
+            "counters": dict(sorted(_counters.items())),
+        }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(prefix: str = "dca") -> str:
+    """Prometheus text exposition: a <prefix>_stage_seconds histogram and <prefix>_events_total counters."""
+    snap = snapshot()
+    lines: List[str] = [
+        "# HELP {}_stage_seconds Latency of instrumented dca stages.".format(prefix),
+        "# TYPE {}_stage_seconds histogram".format(prefix),
+    ]
+    for name, s in snap["stages"].items():
+        stage = _label(name)
+        cumulative = 0
+        for bound, n in zip(BUCKET_BOUNDS + (math.inf,), s["buckets"]):
+            cumulative += n
+            le = "+Inf" if bound == math.inf else repr(bound)
+            lines.append('{}_stage_seconds_bucket{{stage="{}",le="{}"}} {}'.format(prefix, stage, le, cumulative))
+        lines.append('{}_stage_seconds_sum{{stage="{}"}} {!r}'.format(prefix, stage, s["total_s"]))
+        lines.append('{}_stage_seconds_count{{stage="{}"}} {}'.format(prefix, stage, s["count"]))
+    lines.append("# HELP {}_events_total Counters of instrumented dca events.".format(prefix))
+    lines.append("# TYPE {}_events_total counter".format(prefix))
+    for name, value in snap["counters"].items():
+        lines.append('{}_events_total{{name="{}"}} {}'.format(prefix, _label(name), value))
+    return "\n".join(lines) + "\n"
+
+
+def format_report(snap: Optional[Dict[str, Any]] = None) -> str:
+    """Human-readable breakdown, stages sorted by total time (share of wall time)."""
+    snap = snap or snapshot()
+    wall = snap["wall_s"] or 1e-12
+    rows = sorted(snap["stages"].items(), key=lambda kv: -kv[1]["total_s"])
+    out = ["dca profile: wall {:.3f}s".format(snap["wall_s"])]
+    if rows:
+        width = max(len("stage"), max(len(n) for n, _ in rows))
+        out.append("{:<{w}} {:>9} {:>10} {:>6} {:>10} {:>10} {:>10}".format(
+            "stage", "calls", "total s", "%wall", "mean us", "p50 us", "p99 us", w=width))
+        for name, s in rows:
+            out.append("{:<{w}} {:>9} {:>10.4f} {:>6.1f} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+                name, s["count"], s["total_s"], 100.0 * s["total_s"] / wall,
+                1e6 * s["mean_s"], 1e6 * s["p50_s"], 1e6 * s["p99_s"], w=width))
+    for name, value in snap["counters"].items():
+        out.append("counter {} = {:g}".format(name, value))
+    return "\n".join(out)
+
+
+def export(path: str) -> None:
+    """Write the snapshot to path: Prometheus text for .prom / .txt, JSON otherwise."""
+    text = to_prometheus() if path.endswith((".prom", ".txt")) else json.dumps(snapshot(), indent=2)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+# -- scripts ---------------------------------------------------------------------------
+
+
+def add_profile_argument(parser: Any) -> None:
+    """Add --profile [PATH] to an argparse parser (see setup_profiling)."""
+    parser.add_argument(
+        "--profile", nargs="?", const="-", default=None, metavar="PATH",
+        help="Time dca hot paths and print a breakdown at exit; PATH also exports it (.json or .prom)",
+    )
+
+
+def setup_profiling(profile: Optional[str], stream: Optional[TextIO] = None) -> None:
+    """For a parsed --profile value: enable profiling and report (and export) at exit."""
+    if profile is None:
+        return
+    reset()
+    enable()
+
+    def report() -> None:
+        print(format_report(), file=stream or sys.stderr)
+        if profile != "-":
+            export(profile)
+
+    atexit.register(report)
@@ -0,0 +1,502 @@
+"""
+Per-prompt statistics kept across training steps, and the rollout budgets derived from them.
+
+PassRateStore keeps a decayed Beta posterior of each prompt's pass rate ρ (the DDCA
+coefficient n/G) in a bounded LRU table. RolloutBudgetScheduler uses it to give each prompt
+a ragged number of rollouts instead of a fixed group_size:
+
+  1. initial_counts: a small first draw per prompt (`initial`), or only `min_rollouts` for
+     prompts the store is confident are solved or hopeless;
+  2. allocate_extra: after scoring the first draw, extra rollouts go greedily to the prompts
+     with the largest expected gain in accuracy-advantage signal.
+
+The signal of a group with c correct out of m is the total |A_acc| of its GRPO advantages,
+2 * sqrt(c * (m - c)): zero for all-correct / all-wrong groups. Gains are expectations under
+the beta-binomial predictive of the posterior, so a group that is already mixed, or a
+degenerate one whose posterior still has mass away from 0 / 1, gets more rollouts, and a
+confidently degenerate one gets none. The resulting per-prompt counts are passed to the
+advantage hooks as group_sizes (ragged groups).
+
+LengthBaselineStore keeps a decayed running mean / variance of each prompt's correct-response
+lengths. Passed to the advantage hooks (length_store=...), it is pooled with the in-group
+statistics of the DCA length score, so groups with one or two correct responses still get a
+stable length signal and a smaller G can be used.
+
+DifficultyAwareSampler works one level up, choosing which prompts (dataset indices) to put in
+a batch: prompts whose groups keep coming back all-correct or all-wrong are down-weighted or
+retired for a while and revisited on a backoff schedule.
+"""
+
+import heapq
+import json
+import math
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .sequential import beta_binomial_pmf
+
+
+class PassRateStore:
+    """
+    Decayed Beta(α, β) pass-rate posterior per prompt id, LRU-bounded.
+
+    prior : (α0, β0) for unseen prompts.
+    decay : before each update the previous evidence (α - α0, β - β0) is multiplied by decay,
+        so the estimate follows the policy as it improves (1.0 = no forgetting).
+    capacity : maximum number of prompts kept; least recently updated ones are evicted.
+    """
+
+    def __init__(self, prior: Tuple[float, float] = (1.0, 1.0), decay: float = 0.8, capacity: int = 1_000_000):
+        self.prior = (float(prior[0]), float(prior[1]))
+        self.decay = decay
+        self.capacity = capacity
+        # prompt id -> (decayed hits, decayed misses, consecutive degenerate groups)
+        self._counts: "OrderedDict[Hashable, Tuple[float, float, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, prompt_id: Hashable) -> bool:
+        return prompt_id in self._counts
+
+    def update(self, prompt_id: Hashable, n_correct: int, n_total: int) -> None:
+        """Fold one group's result (n_correct of n_total rollouts) into the prompt's posterior."""
+        hits, misses, streak = self._counts.pop(prompt_id, (0.0, 0.0, 0))
+        hits = self.decay * hits + n_correct
+        misses = self.decay * misses + (n_total - n_correct)
+        streak = streak + 1 if n_correct in (0, n_total) else 0
+        self._counts[prompt_id] = (hits, misses, streak)
+        if len(self._counts) > self.capacity:
+            self._counts.popitem(last=False)
+
+    def posterior(self, prompt_id: Hashable) -> Tuple[float, float]:
+        hits, misses, _ = self._counts.get(prompt_id, (0.0, 0.0, 0))
+        return self.prior[0] + hits, self.prior[1] + misses
+
+    def degenerate_streak(self, prompt_id: Hashable) -> int:
+        """Consecutive all-correct / all-wrong groups of the prompt (0 if unseen)."""
+        return self._counts.get(prompt_id, (0.0, 0.0, 0))[2]
+
+    def mean(self, prompt_id: Hashable) -> float:
+        a, b = self.posterior(prompt_id)
+        return a / (a + b)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "prior": list(self.prior),
+            "decay": self.decay,
+            "capacity": self.capacity,
+            "counts": [[k, h, m, streak] for k, (h, m, streak) in self._counts.items()],
+        }
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, Any]) -> "PassRateStore":
+        store = cls(tuple(state["prior"]), state["decay"], state["capacity"])
+        for k, h, m, *streak in state["counts"]:
+            store._counts[k if not isinstance(k, list) else tuple(k)] = (h, m, streak[0] if streak else 0)
+        return store
+
+
+class LengthBaselineStore:
+    """
+    Decayed mean / variance of correct-response lengths per prompt id, LRU-bounded.
+
+    decay : previous evidence weight is multiplied by decay before each group is folded in.
+    max_weight : cap on the pseudo-response count the history contributes to a length score
+        (the in-group responses always count fully).
+    capacity : maximum number of prompts kept; least recently updated ones are evicted.
+    path, snapshot_every : if set, observe() writes a JSON snapshot to path every
+        snapshot_every calls (load it back with LengthBaselineStore.load).
+    """
+
+    def __init__(
+        self,
+        decay: float = 0.9,
+        max_weight: float = 8.0,
+        capacity: int = 1_000_000,
+        path: Optional[Union[str, Path]] = None,
+        snapshot_every: int = 0,
+    ):
+        self.decay = decay
+        self.max_weight = max_weight
+        self.capacity = capacity
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.steps = 0
+        # prompt id -> (decayed count, mean, variance)
+        self._stats: "OrderedDict[Hashable, Tuple[float, float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def __contains__(self, prompt_id: Hashable) -> bool:
+        return prompt_id in self._stats
+
+    def update(self, prompt_id: Hashable, correct_lengths: Sequence[float]) -> None:
+        """Fold one group's correct-response lengths into the prompt's statistics."""
+        x = np.asarray(correct_lengths, dtype=np.float64).ravel()
+        if x.size == 0:
+            return
+        count, mean, var = self._stats.pop(prompt_id, (0.0, 0.0, 0.0))
+        w_old = self.decay * count
+        w_new = w_old + x.size
+        mu_g = float(x.mean())
+        new_mean = (w_old * mean + x.size * mu_g) / w_new
+        new_var = (w_old * (var + (mean - new_mean) ** 2) + x.size * (float(x.var()) + (mu_g - new_mean) ** 2)) / w_new
+        self._stats[prompt_id] = (w_new, new_mean, new_var)
+        if len(self._stats) > self.capacity:
+            self._stats.popitem(last=False)
+
+    def baseline(self, prompt_id: Hashable) -> Optional[Tuple[float, float, float]]:
+        """(mean, var, weight) for dca.advantage.length_score_z_sigmoid, or None if unseen."""
+        if prompt_id not in self._stats:
+            return None
+        count, mean, var = self._stats[prompt_id]
+        return mean, var, min(count, self.max_weight)
+
+    def baselines(self, prompt_ids: Sequence[Hashable]) -> List[Optional[Tuple[float, float, float]]]:
+        return [self.baseline(p) for p in prompt_ids]
+
+    def observe(
+        self,
+        prompt_ids: Sequence[Hashable],
+        correct_groups: Sequence[Sequence[bool]],
+        length_groups: Sequence[Sequence[float]],
+    ) -> None:
+        """Update every prompt of a step with its group's correct lengths; snapshot if due."""
+        for pid, c, l in zip(prompt_ids, correct_groups, length_groups):
+            self.update(pid, np.asarray(l, dtype=np.float64)[np.asarray(c, dtype=bool)])
+        self.steps += 1
+        if self.path is not None and self.snapshot_every and self.steps % self.snapshot_every == 0:
+            self.save(self.path)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "decay": self.decay,
+            "max_weight": self.max_weight,
+            "capacity": self.capacity,
+            "steps": self.steps,
+            "stats": [[k, c, m, v] for k, (c, m, v) in self._stats.items()],
+        }
+
+    @classmethod
+    def from_state_dict(cls, state: Dict[str, Any]) -> "LengthBaselineStore":
+        store = cls(state["decay"], state["max_weight"], state["capacity"])
+        store.steps = state.get("steps", 0)
+        for k, c, m, v in state["stats"]:
+            store._stats[k if not isinstance(k, list) else tuple(k)] = (c, m, v)
+        return store
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write a JSON snapshot atomically (temp file + rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(
+        cls, path: Union[str, Path], snapshot_every: int = 0, missing_ok: bool = True
+    ) -> "LengthBaselineStore":
+        """Store from a snapshot; a fresh store if the file does not exist and missing_ok."""
+        path = Path(path)
+        if not path.exists() and missing_ok:
+            store = cls()
+        else:
+            with open(path, encoding="utf-8") as f:
+                store = cls.from_state_dict(json.load(f))
+        store.path, store.snapshot_every = path, snapshot_every
+        return store
+
+
+def group_signal(n_correct: int, n_total: int) -> float:
+    """Total |A_acc| of a GRPO group: 2 * sqrt(c * (m - c)); 0 for degenerate groups."""
+    return 2.0 * math.sqrt(n_correct * (n_total - n_correct))
+
+
+def degenerate_probability(a: float, b: float, group_size: int) -> float:
+    """P(a group of group_size is all correct or all wrong) under a Beta(a, b) pass rate."""
+    log_b = math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
+
+    def log_beta(x: float, y: float) -> float:
+        return math.lgamma(x) + math.lgamma(y) - math.lgamma(x + y)
+
+    return math.exp(log_beta(a + group_size, b) - log_b) + math.exp(log_beta(a, b + group_size) - log_b)
+
+
+def expected_signal(n_correct: int, n_total: int, extra: int, a: float, b: float) -> float:
+    """E[group_signal] after `extra` more rollouts, under the Beta(a, b) posterior given c of m."""
+    if extra <= 0:
+        return group_signal(n_correct, n_total)
+    pmf = beta_binomial_pmf(extra, a + n_correct, b + n_total - n_correct)
+    m = n_total + extra
+    return sum(p * group_signal(n_correct + j, m) for j, p in enumerate(pmf))
+
+
+class RolloutBudgetScheduler:
+    """
+    Ragged per-prompt rollout counts from observed pass rates.
+
+    group_size : the fixed G being replaced; the default total budget is len(prompts) * G.
+    initial : rollouts per prompt in the first draw.
+    min_rollouts : first draw for prompts predicted degenerate (0 skips them).
+    max_rollouts : cap per prompt (first draw + extra).
+    skip_signal : predicted signal per rollout of the first draw below which a prompt only
+        gets min_rollouts (needs a confident posterior: unseen prompts always get `initial`).
+    min_gain : stop adding rollouts when the best expected signal gain per rollout falls below.
+    """
+
+    def __init__(
+        self,
+        store: Optional[PassRateStore] = None,
+        group_size: int = 8,
+        initial: int = 4,
+        min_rollouts: int = 2,
+        max_rollouts: int = 16,
+        skip_signal: float = 0.15,
+        min_gain: float = 0.1,
+    ):
+        self.store = store if store is not None else PassRateStore()
+        self.group_size = group_size
+        self.initial = initial
+        self.min_rollouts = min_rollouts
+        self.max_rollouts = max_rollouts
+        self.skip_signal = skip_signal
+        self.min_gain = min_gain
+        self.tokens = 0.0
+        self.rollouts = 0
+        self.signal = 0.0
+        self.groups = 0
+        self.useful_groups = 0
+
+    def initial_counts(self, prompt_ids: Sequence[Hashable]) -> List[int]:
+        """First-draw rollouts per prompt."""
+        counts = []
+        for pid in prompt_ids:
+            if pid not in self.store:
+                counts.append(self.initial)
+                continue
+            a, b = self.store.posterior(pid)
+            per_rollout = expected_signal(0, 0, self.initial, a, b) / self.initial
+            counts.append(self.initial if per_rollout >= self.skip_signal else self.min_rollouts)
+        return counts
+
+    def allocate_extra(
+        self,
+        prompt_ids: Sequence[Hashable],
+        n_correct: Sequence[int],
+        n_drawn: Sequence[int],
+        budget: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Extra rollouts per prompt after the first draw (n_correct of n_drawn each), greedily by
+        expected signal gain, within `budget` extra rollouts (default: fill the fixed-G total).
+        """
+        if budget is None:
+            budget = len(prompt_ids) * self.group_size - int(sum(n_drawn))
+        extra = [0] * len(prompt_ids)
+        posts = [self.store.posterior(pid) for pid in prompt_ids]
+        current = [group_signal(int(c), int(m)) for c, m in zip(n_correct, n_drawn)]
+
+        def gain(i: int) -> float:
+            a, b = posts[i]
+            c, m = int(n_correct[i]), int(n_drawn[i])
+            return expected_signal(c, m, extra[i] + 1, a, b) - current[i]
+
+        heap = [(-gain(i), i) for i in range(len(prompt_ids)) if n_drawn[i] > 0 and n_drawn[i] < self.max_rollouts]
+        heapq.heapify(heap)
+        while heap and budget > 0:
+            neg, i = heapq.heappop(heap)
+            if -neg < self.min_gain:
+                break
+            extra[i] += 1
+            budget -= 1
+            a, b = posts[i]
+            current[i] = expected_signal(int(n_correct[i]), int(n_drawn[i]), extra[i], a, b)
+            if n_drawn[i] + extra[i] < self.max_rollouts:
+                heapq.heappush(heap, (-gain(i), i))
+        return extra
+
+    def observe(
+        self,
+        prompt_ids: Sequence[Hashable],
+        correct_groups: Sequence[Sequence[bool]],
+        length_groups: Optional[Sequence[Sequence[float]]] = None,
+    ) -> None:
+        """Update the store with each prompt's full (first + extra) group and the token/signal counters."""
+        for i, (pid, group) in enumerate(zip(prompt_ids, correct_groups)):
+            correct = np.asarray(group, dtype=bool)
+            c, m = int(correct.sum()), int(correct.size)
+            if m == 0:
+                continue
+            self.store.update(pid, c, m)
+            sig = group_signal(c, m)
+            self.signal += sig
+            self.groups += 1
+            self.useful_groups += int(sig > 0)
+            self.rollouts += m
+            if length_groups is not None:
+                self.tokens += float(np.sum(length_groups[i]))
+
+    def report(self) -> Dict[str, float]:
+        """Rollouts / tokens spent per unit of advantage signal and per non-degenerate group."""
+        return {
+            "groups": self.groups,
+            "useful_groups": self.useful_groups,
+            "rollouts": self.rollouts,
+            "tokens": self.tokens,
+            "signal": self.signal,
+            "rollouts_per_signal": self.rollouts / self.signal if self.signal > 0 else float("inf"),
+            "tokens_per_signal": self.tokens / self.signal if self.signal > 0 else float("inf"),
+            "tokens_per_useful_group": self.tokens / self.useful_groups if self.useful_groups else float("inf"),
+        }
+
+
+class DifficultyAwareSampler:
+    """
+    Prompt sampler over dataset indices 0..num_prompts-1 that avoids zero-signal groups.
+
+    Each prompt's sampling weight is its posterior probability of a mixed (non-degenerate)
+    group of group_size, floored at min_weight; unseen prompts have weight 1. A prompt whose
+    last `retire_after` groups were all degenerate is retired for revisit_after steps, doubled
+    on every re-retirement up to max_backoff times, then comes back at full weight as a probe.
+    Batches are drawn without replacement (Efraimidis-Spirakis keys, O(num_prompts)).
+
+    report() gives the share of generated tokens spent on zero-signal groups over the first
+    and the most recent `window` steps, plus the share a uniform sampler would spend on the
+    prompts seen so far.
+    """
+
+    def __init__(
+        self,
+        num_prompts: int,
+        store: Optional[PassRateStore] = None,
+        group_size: int = 8,
+        retire_after: int = 3,
+        revisit_after: int = 50,
+        max_backoff: int = 4,
+        min_weight: float = 0.05,
+        window: int = 10,
+        seed: int = 0,
+    ):
+        self.num_prompts = num_prompts
+        self.store = store if store is not None else PassRateStore()
+        self.group_size = group_size
+        self.retire_after = retire_after
+        self.revisit_after = revisit_after
+        self.max_backoff = max_backoff
+        self.min_weight = min_weight
+        self.window = window
+        self.step = 0
+        self.weights = np.ones(num_prompts, dtype=np.float64)
+        self.retired_until = np.zeros(num_prompts, dtype=np.int64)
+        self.times_retired = np.zeros(num_prompts, dtype=np.int64)
+        self.groups_seen = np.zeros(num_prompts, dtype=np.int64)
+        self.degenerate_seen = np.zeros(num_prompts, dtype=np.int64)
+        self._rng = np.random.default_rng(seed)
+        self._history: List[Tuple[float, float]] = []  # per step: (zero-signal tokens, all tokens)
+
+    def sample(self, batch_size: int) -> np.ndarray:
+        """Indices for the next batch (sorted by draw order, without replacement); advances the step."""
+        if not 0 < batch_size <= self.num_prompts:
+            raise ValueError("batch_size must be in [1, {}] (num_prompts), got {}".format(self.num_prompts, batch_size))
+        active = self.retired_until <= self.step
+        w = np.where(active, self.weights, 0.0)
+        if np.count_nonzero(w) < batch_size:
+            # not enough active prompts: bring back the ones closest to their revisit step
+            order = np.argsort(np.where(active, -1, self.retired_until), kind="stable")
+            w[order[:batch_size]] = np.maximum(self.weights[order[:batch_size]], self.min_weight)
+        u = self._rng.random(self.num_prompts)
+        with np.errstate(divide="ignore"):
+            keys = np.where(w > 0, np.log(u) / w, -np.inf)
+        top = np.argpartition(-keys, batch_size - 1)[:batch_size]
+        self.step += 1
+        return top[np.argsort(-keys[top])]
+
+    def observe(
+        self,
+        indices: Sequence[int],
+        n_correct: Sequence[int],
+        n_total: Sequence[int],
+        tokens: Optional[Sequence[float]] = None,
+    ) -> None:
+        """
+        Record one batch: n_correct of n_total rollouts per prompt, tokens generated per prompt
+        (defaults to n_total, i.e. compute measured in rollouts).
+        """
+        zero_tokens = all_tokens = 0.0
+        for k, idx in enumerate(indices):
+            c, m = int(n_correct[k]), int(n_total[k])
+            if m == 0:
+                continue
+            t = float(tokens[k]) if tokens is not None else float(m)
+            all_tokens += t
+            self.groups_seen[idx] += 1
+            if c in (0, m):
+                zero_tokens += t
+                self.degenerate_seen[idx] += 1
+            self.store.update(int(idx), c, m)
+            a, b = self.store.posterior(int(idx))
+            self.weights[idx] = max(self.min_weight, 1.0 - degenerate_probability(a, b, self.group_size))
+            if self.store.degenerate_streak(int(idx)) >= self.retire_after:
+                backoff = min(int(self.times_retired[idx]), self.max_backoff)
+                self.retired_until[idx] = self.step + self.revisit_after * (2 ** backoff)
+                self.times_retired[idx] += 1
+                self.weights[idx] = 1.0  # probe at full weight when it comes back
+        self._history.append((zero_tokens, all_tokens))
+
+    def uniform_zero_signal_share(self) -> float:
+        """
+        Zero-signal share a uniform sampler would have (equal-size groups): the mean over the
+        prompts seen so far of each prompt's observed degenerate-group fraction.
+        """
+        seen = self.groups_seen > 0
+        if not seen.any():
+            return 0.0
+        return float(np.mean(self.degenerate_seen[seen] / self.groups_seen[seen]))
+
+    def report(self) -> Dict[str, float]:
+        def share(rows: List[Tuple[float, float]]) -> float:
+            total = sum(t for _, t in rows)
+            return sum(z for z, _ in rows) / total if total > 0 else 0.0
+
+        return {
+            "steps": len(self._history),
+            "zero_signal_share": share(self._history),
+            "zero_signal_share_first": share(self._history[: self.window]),
+            "zero_signal_share_recent": share(self._history[-self.window :]),
+            "zero_signal_share_uniform_estimate": self.uniform_zero_signal_share(),
+            "retired": int((self.retired_until > self.step).sum()),
+        }
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step,
+            "weights": self.weights.tolist(),
+            "retired_until": self.retired_until.tolist(),
+            "times_retired": self.times_retired.tolist(),
+            "groups_seen": self.groups_seen.tolist(),
+            "degenerate_seen": self.degenerate_seen.tolist(),
+            "rng": self._rng.bit_generator.state,
+            "history": [list(h) for h in self._history],
+            "store": self.store.state_dict(),
+        }
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        if len(state["weights"]) != self.num_prompts:
+            raise ValueError("checkpoint has {} prompts, sampler has {}".format(len(state["weights"]), self.num_prompts))
+        self.step = int(state["step"])
+        self.weights = np.asarray(state["weights"], dtype=np.float64)
+        self.retired_until = np.asarray(state["retired_until"], dtype=np.int64)
+        self.times_retired = np.asarray(state["times_retired"], dtype=np.int64)
+        self.groups_seen = np.asarray(state["groups_seen"], dtype=np.int64)
+        self.degenerate_seen = np.asarray(state["degenerate_seen"], dtype=np.int64)
+        self._rng.bit_generator.state = state["rng"]
+        self._history = [tuple(h) for h in state["history"]]
+        self.store = PassRateStore.from_state_dict(state["store"])
@@ -0,0 +1,185 @@
+"""
+Binary cache of parsed (normalized) dataset records, memory-mapped on warm loads.
+
+load_dataset(path, cache=True) stores the normalized records once in a columnar file under
+dca.io.cache_dir() and maps it on later runs instead of re-parsing JSON and re-extracting
+answers. Layout (native byte order, every section 8-byte aligned):
+
+  header   magic, source size, source mtime_ns, record count, source content digest
+  columns  question, answer, dataset, level: uint64 offsets[n + 1] followed by a UTF-8 blob
+           (level is JSON-encoded so "Level 3" and 3 round-trip; empty when absent)
+  numeric  level_num: int32[n], the integer in level or -1
+
+A cache entry is keyed by the source path (and normalization kind); it is valid when the
+source size and mtime match, or, if only the mtime changed, when the content digest matches
+(the header is then refreshed in place). Only the standard library is used.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from .io import cache_path
+
+_MAGIC = b"DCAREC01"
+_HEADER = struct.Struct("<8sQqQ16s")  # magic, size, mtime_ns, count, digest
+_STRING_COLUMNS = ("question", "answer", "dataset", "level")
+_ALIGN = 8
+
+
+def file_digest(path: Union[str, Path], chunk_size: int = 1 << 20) -> bytes:
+    """128-bit BLAKE2b digest of a file's bytes."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.digest()
+
+
+def level_number(level: Any) -> int:
+    """3 for 3 / "3" / "Level 3"; -1 when there is no integer level."""
+    if isinstance(level, bool):
+        return -1
+    if isinstance(level, int):
+        return level
+    m = re.search(r"-?\d+", str(level)) if level is not None else None
+    return int(m.group(0)) if m else -1
+
+
+def _pad(n: int) -> int:
+    return -n % _ALIGN
+
+
+def write_records(
+    cache_file: Path, records: Iterable[Dict[str, Any]], size: int, mtime_ns: int, digest: bytes
+) -> int:
+    """Write records to cache_file atomically. Returns the record count."""
+    blobs = {col: bytearray() for col in _STRING_COLUMNS}
+    offsets = {col: array("Q", [0]) for col in _STRING_COLUMNS}
+    level_num = array("i")
+    for r in records:
+        for col in _STRING_COLUMNS:
+            if col == "level":
+                value = json.dumps(r["level"], ensure_ascii=False) if "level" in r else ""
+            else:
+                value = r.get(col, "")
+            blobs[col] += str(value).encode("utf-8")
+            offsets[col].append(len(blobs[col]))
+        level_num.append(level_number(r.get("level")))
+    n = len(level_num)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_name(cache_file.name + ".tmp{}".format(os.getpid()))
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, size, mtime_ns, n, digest))
+        f.write(b"\0" * _pad(_HEADER.size))
+        for col in _STRING_COLUMNS:
+            offsets[col].tofile(f)
+            f.write(blobs[col])
+            f.write(b"\0" * _pad(len(blobs[col])))
+        level_num.tofile(f)
+    os.replace(tmp, cache_file)
+    return n
+
+
+class CachedRecords(Sequence):
+    """
+    Read-only sequence of normalized records over a mapped cache file.
+
+    Records are decoded on access; level_num exposes the numeric column without decoding.
+    """
+
+    def __init__(self, cache_file: Path):
+        with open(cache_file, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self.mtime_ns, self._n, self.digest = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError("{} is not a record cache".format(cache_file))
+        self.path = cache_file
+        view = memoryview(self._mm)
+        pos = _HEADER.size + _pad(_HEADER.size)
+        self._offsets = {}
+        self._blobs = {}
+        for col in _STRING_COLUMNS:
+            offs = view[pos : pos + 8 * (self._n + 1)].cast("Q")
+            pos += 8 * (self._n + 1)
+            self._offsets[col] = offs
+            self._blobs[col] = view[pos : pos + offs[self._n]]
+            pos += offs[self._n] + _pad(offs[self._n])
+        self.level_num = view[pos : pos + 4 * self._n].cast("i")
+
+    def _string(self, col: str, i: int) -> str:
+        offs = self._offsets[col]
+        return str(self._blobs[col][offs[i] : offs[i + 1]], "utf-8")
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("record index out of range")
+        record = {"question": self._string("question", i), "answer": self._string("answer", i)}
+        level = self._string("level", i)
+        if level:
+            record["level"] = json.loads(level)
+        record["dataset"] = self._string("dataset", i)
+        return record
+
+    def __repr__(self) -> str:
+        return "CachedRecords({!s}, n={})".format(self.path, self._n)
+
+
+def _refresh_header(cache: CachedRecords, mtime_ns: int) -> None:
+    with open(cache.path, "r+b") as f:
+        f.write(_HEADER.pack(_MAGIC, cache.size, mtime_ns, len(cache), cache.digest))
+    cache.mtime_ns = mtime_ns
+
+
+def _open_cache(cache_file: Path) -> Optional[CachedRecords]:
+    try:
+        return CachedRecords(cache_file)
+    except (OSError, ValueError, struct.error, TypeError):
+        return None
+
+
+def load_records(
+    path: Union[str, Path], build: Callable[[], Iterable[Dict[str, Any]]], kind: str = "records"
+) -> Union[CachedRecords, List[Dict[str, Any]]]:
+    """
+    Cached normalized records of path; build() parses the source when the cache is missing
+    or stale. kind separates caches of the same file under different normalizations.
+    Falls back to the built list when the cache directory is not writable.
+    """
+    path = Path(path)
+    st = path.stat()
+    cache_file = cache_path(path, ".{}.rec".format(kind))
+    digest = None
+    cached = _open_cache(cache_file)
+    if cached is not None and cached.size == st.st_size:
+        if cached.mtime_ns == st.st_mtime_ns:
+            return cached
+        digest = file_digest(path)
+        if digest == cached.digest:
+            try:
+                _refresh_header(cached, st.st_mtime_ns)
+            except OSError:
+                pass
+            return cached
+    records = list(build())
+    if digest is None:
+        digest = file_digest(path)
+    try:
+        write_records(cache_file, records, st.st_size, st.st_mtime_ns, digest)
+    except OSError:
+        return records
+    return _open_cache(cache_file) or records
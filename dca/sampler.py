@@ -0,0 +1,226 @@
+"""
+Weighted multi-source prompt sampler with O(1) draws and checkpointable state.
+
+MultiSourceSampler mixes several prompt pools (lists, LazyDataset, CachedRecords, ...) by
+weight, e.g. the paper's AIME : MATH ~ 1 : 2 training mix:
+
+  sampler = MultiSourceSampler([aime, math], weights=[1, 2], seed=0)
+  batch = sampler.sample(64)
+  state = sampler.state_dict()        # JSON-serializable: step, per-source cursor and epoch
+  ...
+  sampler.load_state_dict(state)      # resumed run continues with the identical stream
+
+- Source choice: Vose alias table, O(1) per draw after O(S) setup.
+- Within a source: every record is visited once per epoch in a shuffled order; the order is a
+  keyed Feistel permutation of [0, n) evaluated per position, so no permutation array is ever
+  materialized for huge pools, and each epoch uses a fresh key.
+- Randomness is counter-based (splitmix64 of seed, stream and counter), so the whole state is
+  a few integers and draws do not depend on how the stream was split into batches.
+Only the standard library is used.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+_MASK64 = (1 << 64) - 1
+_FEISTEL_ROUNDS = 4
+_STREAM_SOURCE = 0x5EED0001
+_STREAM_PERM = 0x5EED0002
+
+
+def splitmix64(x: int) -> int:
+    """splitmix64 finalizer: a bijective 64-bit mix."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def counter_random(seed: int, stream: int, counter: int) -> int:
+    """Uniform 64-bit value for (seed, stream, counter); stateless."""
+    return splitmix64(splitmix64(splitmix64(seed & _MASK64) ^ stream) ^ (counter & _MASK64))
+
+
+def _uniform(bits: int) -> float:
+    """64 random bits -> float in [0, 1)."""
+    return (bits >> 11) * (1.0 / (1 << 53))
+
+
+class AliasTable:
+    """Vose alias method: draw index i with probability weights[i] / sum(weights) in O(1)."""
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("weights must be non-negative with a positive sum")
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, u: float) -> int:
+        """Index for one uniform u in [0, 1) (column from the integer part, coin from the rest)."""
+        x = u * len(self.prob)
+        col = min(int(x), len(self.prob) - 1)
+        return col if x - col < self.prob[col] else self.alias[col]
+
+
+class FeistelPermutation:
+    """
+    Keyed pseudo-random permutation of [0, n), evaluated per index in O(1) expected time:
+    a balanced Feistel network on the smallest even-width power-of-two domain >= n, with
+    cycle walking for values >= n (expected < 4 steps).
+    """
+
+    def __init__(self, n: int, key: int):
+        if n <= 0:
+            raise ValueError("n must be positive")
+        self.n = n
+        self.key = key & _MASK64
+        bits = max(2, (n - 1).bit_length())
+        self._half = (bits + 1) // 2
+        self._mask = (1 << self._half) - 1
+
+    def _round(self, x: int) -> int:
+        left, right = x >> self._half, x & self._mask
+        for r in range(_FEISTEL_ROUNDS):
+            left, right = right, left ^ (splitmix64(self.key ^ (r << 56) ^ right) & self._mask)
+        return (left << self._half) | right
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.n:
+            raise IndexError("permutation index out of range")
+        x = self._round(i)
+        while x >= self.n:
+            x = self._round(x)
+        return x
+
+
+class MultiSourceSampler:
+    """
+    Weighted, epoch-aware sampler over several prompt sources.
+
+    sources : sequences of records (len + integer indexing).
+    weights : relative source probabilities (default uniform).
+    shuffle : per-epoch Feistel shuffle within each source (False = sequential order).
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Sequence[Any]],
+        weights: Optional[Sequence[float]] = None,
+        seed: int = 0,
+        shuffle: bool = True,
+        names: Optional[Sequence[str]] = None,
+    ):
+        if not sources:
+            raise ValueError("at least one source is required")
+        if any(len(s) == 0 for s in sources):
+            raise ValueError("sources must be non-empty")
+        self.sources = list(sources)
+        self.weights = [1.0] * len(sources) if weights is None else [float(w) for w in weights]
+        if len(self.weights) != len(self.sources):
+            raise ValueError("weights must match sources")
+        self.names = list(names) if names is not None else [str(i) for i in range(len(sources))]
+        self.seed = int(seed)
+        self.shuffle = shuffle
+        self._table = AliasTable(self.weights)
+        self.step = 0
+        self.cursors = [0] * len(sources)
+        self.epochs = [0] * len(sources)
+        self._perms: Dict[int, FeistelPermutation] = {}
+
+    def _permutation(self, s: int) -> FeistelPermutation:
+        perm = self._perms.get(s)
+        if perm is None or perm.key != self._perm_key(s):
+            perm = FeistelPermutation(len(self.sources[s]), self._perm_key(s))
+            self._perms[s] = perm
+        return perm
+
+    def _perm_key(self, s: int) -> int:
+        return counter_random(self.seed, _STREAM_PERM + s, self.epochs[s])
+
+    def next_index(self) -> Tuple[int, int]:
+        """(source index, record index) of the next draw; advances the state."""
+        s = self._table.draw(_uniform(counter_random(self.seed, _STREAM_SOURCE, self.step)))
+        pos = self.cursors[s]
+        i = self._permutation(s)[pos] if self.shuffle else pos
+        self.step += 1
+        self.cursors[s] = pos + 1
+        if self.cursors[s] == len(self.sources[s]):
+            self.cursors[s] = 0
+            self.epochs[s] += 1
+        return s, i
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        s, i = self.next_index()
+        return self.sources[s][i]
+
+    def sample(self, n: int) -> List[Any]:
+        """Next n records."""
+        return [next(self) for _ in range(n)]
+
+    def state_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state; sizes and weights are stored to catch mismatched resumes."""
+        return {
+            "seed": self.seed,
+            "shuffle": self.shuffle,
+            "step": self.step,
+            "cursors": list(self.cursors),
+            "epochs": list(self.epochs),
+            "sizes": [len(s) for s in self.sources],
+            "weights": list(self.weights),
+            "names": list(self.names),
+        }
+
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        sizes = [len(s) for s in self.sources]
+        if list(state["sizes"]) != sizes:
+            raise ValueError("source sizes {} do not match checkpoint {}".format(sizes, state["sizes"]))
+        if [float(w) for w in state["weights"]] != self.weights:
+            raise ValueError("source weights {} do not match checkpoint {}".format(self.weights, state["weights"]))
+        self.seed = int(state["seed"])
+        self.shuffle = bool(state["shuffle"])
+        self.step = int(state["step"])
+        self.cursors = [int(c) for c in state["cursors"]]
+        self.epochs = [int(e) for e in state["epochs"]]
+        self._perms.clear()
+
+
+def sampler_from_config(config: Any, seed: int = 0, lazy: bool = True, shuffle: bool = True) -> MultiSourceSampler:
+    """
+    Sampler over training.dataset of an experiment config (dict or YAML path), e.g.
+      training: {dataset: [{path: data/aime.jsonl, weight: 1}, {path: data/math.json, weight: 2}]}
+    Sources are opened with dca.data_utils.load_dataset (lazy by default).
+    """
+    from .data_utils import load_dataset
+
+    if not isinstance(config, dict):
+        import yaml
+        with open(config) as f:
+            config = yaml.safe_load(f)
+    entries = config["training"]["dataset"]
+    if isinstance(entries, dict):
+        entries = [entries]
+    sources = [load_dataset(e["path"], e.get("name"), lazy=lazy) for e in entries]
+    weights = [float(e.get("weight", 1.0)) for e in entries]
+    names = [e.get("name", str(e["path"])) for e in entries]
+    return MultiSourceSampler(sources, weights, seed=seed, shuffle=shuffle, names=names)
@@ -0,0 +1,200 @@
+"""
+Sequential early stopping of per-problem rollouts for pass@k evaluation.
+
+Rollouts for each problem are requested in small batches. After each batch with m samples
+and c correct, the remaining r = n_max - m outcomes are predicted with the Beta-Binomial
+posterior predictive (Jeffreys prior Beta(1/2, 1/2) on the pass rate). Sampling stops when
+
+  P( |est(n_max, c + X) - est(m, c)| > tol )  <=  delta,   X ~ BetaBinom(r, c + a, m - c + b)
+
+for every tracked estimator est in {pass@1, pass@k} (pass@k via dca.metrics.pass_at_k).
+E.g. with n_max=16, tol=0.125, delta=0.05: 8/8 correct gives exceed-probability ~0.037, so the
+problem stops at 8 rollouts; 4/8 correct keeps sampling.
+
+Error introduced vs the fixed-n estimator (per problem, values in [0, 1]):
+  E|est_seq - est_fixed| <= tol * (1 - q) + q,   q = predictive exceed-probability at stop (<= delta).
+"""
+
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .metrics import pass_at_k
+from .profiling import count
+
+
+def _log_beta(a: float, b: float) -> float:
+    return math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
+
+
+def beta_binomial_pmf(r: int, a: float, b: float) -> List[float]:
+    """P(X = x) for x = 0..r, X ~ BetaBinomial(r, a, b)."""
+    out = []
+    for x in range(r + 1):
+        log_c = math.lgamma(r + 1) - math.lgamma(x + 1) - math.lgamma(r - x + 1)
+        out.append(math.exp(log_c + _log_beta(x + a, r - x + b) - _log_beta(a, b)))
+    return out
+
+
+def exceed_probability(
+    m: int,
+    c: int,
+    n_max: int,
+    ks: Sequence[int] = (1,),
+    tol: float = 0.1,
+    prior: Tuple[float, float] = (0.5, 0.5),
+) -> float:
+    """
+    Predictive probability that finishing to n_max rollouts moves any pass@k (k in ks)
+    estimate by more than tol. Returns 1.0 while m < max(ks) (pass@k undefined yet).
+    """
+    r = n_max - m
+    if r <= 0:
+        return 0.0
+    if m < max(ks):
+        return 1.0
+    pmf = beta_binomial_pmf(r, c + prior[0], m - c + prior[1])
+    current = [pass_at_k(m, c, k) for k in ks]
+    mass = 0.0
+    for x, p in enumerate(pmf):
+        if any(abs(pass_at_k(n_max, c + x, k) - cur) > tol for k, cur in zip(ks, current)):
+            mass += p
+    return min(1.0, mass)
+
+
+def run_sequential(
+    problems: Iterable[Dict[str, Any]],
+    generate_fn: Callable[[Dict[str, Any], int], Tuple[List[str], List[int]]],
+    n_max: int = 16,
+    batch_size: int = 4,
+    min_samples: Optional[int] = None,
+    k: int = 1,
+    tol: float = 0.1,
+    delta: float = 0.1,
+    equiv_fn: Optional[Callable[[str, str], bool]] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Evaluation driver: request rollouts per problem in batches until the stopping rule fires.
+
+    Parameters
+    ----------
+    problems : iterable of dict
+        Each needs "ground_truth" or "answer"; other keys are passed through to the output rows.
+    generate_fn : callable
+        generate_fn(problem, n) -> (predictions, lengths) for up to n new rollouts. Returning
+        none ends that problem with what it has (row "exhausted": True, not counted as saved
+        or early-stopped); a problem with no rollouts at all raises ValueError.
+    n_max : int
+        Fixed-n budget (e.g. 16 for AMC23/AIME25 in configs/experiment.yaml).
+    batch_size : int
+        Rollouts requested per round.
+    min_samples : int, optional
+        Never stop before this many rollouts (default: max(batch_size, k)).
+    k, tol, delta
+        Track pass@1 and pass@k; stop when P(any moves > tol) <= delta.
+
+    Returns
+    -------
+    rows : list of dict
+        Result rows (problem fields + predictions, lengths, num_correct, num_samples, exceed_prob,
+        exhausted), in the format scripts/evaluate.py reads.
+    report : dict
+        Estimates, generation savings and bias/variance bounds vs the fixed-n estimator.
+    """
+    if equiv_fn is None:
+        from .data_utils import is_equivalent_math
+        equiv_fn = is_equivalent_math
+    ks = (1, k) if k > 1 else (1,)
+    min_samples = max(batch_size, k) if min_samples is None else max(min_samples, k)
+
+    rows: List[Dict[str, Any]] = []
+    for problem in problems:
+        gt = problem.get("ground_truth", problem.get("answer", ""))
+        preds: List[str] = []
+        lengths: List[int] = []
+        c = 0
+        q = 1.0
+        exhausted = False
+        while len(preds) < n_max:
+            n = min(batch_size, n_max - len(preds))
+            new_preds, new_lengths = generate_fn(problem, n)
+            if not new_preds:
+                exhausted = True  # generator ran dry: keep what this problem got
+                break
+            preds.extend(new_preds)
+            lengths.extend(int(x) for x in new_lengths)
+            c += sum(1 for p in new_preds if equiv_fn(p, gt))
+            count("sequential.rollouts", len(new_preds))
+            if len(preds) < min_samples:
+                continue
+            q = exceed_probability(len(preds), c, n_max, ks, tol)
+            if q <= delta:
+                break
+        if not preds:
+            raise ValueError("generate_fn returned no rollouts for problem {!r}".format(problem))
+        count("sequential.problems")
+        if exhausted:
+            count("sequential.exhausted")
+        if len(preds) >= n_max or exhausted:
+            q = 0.0  # a fixed-n run would have seen exactly these rollouts
+        row = dict(problem)
+        row.update({
+            "ground_truth": gt,
+            "predictions": preds,
+            "lengths": lengths,
+            "num_correct": c,
+            "num_samples": len(preds),
+            "exceed_prob": q,
+            "exhausted": exhausted,
+        })
+        rows.append(row)
+    return rows, sequential_report(rows, n_max=n_max, k=k, tol=tol)
+
+
+def sequential_report(rows: Sequence[Dict[str, Any]], n_max: int, k: int = 1, tol: float = 0.1) -> Dict[str, Any]:
+    """
+    Summarize a sequential run: pass@1 / pass@k estimates, rollouts and tokens saved, and
+    bounds on the deviation from the fixed-n estimator.
+
+    bias_bound: mean over problems of tol * (1 - q_i) + q_i (bound on E|seq - fixed| per metric).
+    Rows whose generator ran dry ("exhausted") had fewer than n_max rollouts to give: their
+        fixed-n budget is what they got, so they add nothing to the savings or early_stopped
+        and are counted in exhausted / rollouts_missing instead.
+    pass@1_var_*: variance of the mean pass@1 estimate at m_i vs n_max samples, using the
+        Jeffreys posterior mean for p_i so all-correct / all-wrong problems are not reported as 0.
+    """
+    P = len(rows)
+    if P == 0:
+        return {"num_problems": 0}
+    used = sum(r["num_samples"] for r in rows)
+    budget = [r["num_samples"] if r.get("exhausted") else n_max for r in rows]
+    fixed = sum(budget)
+    tokens_used = sum(sum(r["lengths"]) for r in rows)
+    # Skipped rollouts are priced at the problem's own observed mean length
+    tokens_saved = sum(
+        (b - r["num_samples"]) * (sum(r["lengths"]) / max(len(r["lengths"]), 1)) for r, b in zip(rows, budget)
+    )
+    p1 = [r["num_correct"] / r["num_samples"] for r in rows]
+    pk = [pass_at_k(r["num_samples"], r["num_correct"], min(k, r["num_samples"])) for r in rows]
+    var_seq = 0.0
+    var_fixed = 0.0
+    for r, b in zip(rows, budget):
+        p_tilde = (r["num_correct"] + 0.5) / (r["num_samples"] + 1.0)
+        var_seq += p_tilde * (1 - p_tilde) / r["num_samples"]
+        var_fixed += p_tilde * (1 - p_tilde) / b
+    return {
+        "num_problems": P,
+        "pass@1": sum(p1) / P,
+        "pass@{}".format(k): sum(pk) / P,
+        "rollouts_used": used,
+        "rollouts_fixed": fixed,
+        "rollouts_saved_frac": 1.0 - used / fixed,
+        "tokens_used": tokens_used,
+        "tokens_saved_est": tokens_saved,
+        "tokens_saved_frac_est": tokens_saved / (tokens_used + tokens_saved) if tokens_used + tokens_saved > 0 else 0.0,
+        "bias_bound": sum(tol * (1 - r["exceed_prob"]) + r["exceed_prob"] for r in rows) / P,
+        "pass@1_var_sequential": var_seq / P ** 2,
+        "pass@1_var_fixed": var_fixed / P ** 2,
+        "early_stopped": sum(1 for r, b in zip(rows, budget) if r["num_samples"] < b),
+        "exhausted": sum(1 for r in rows if r.get("exhausted")),
+        "rollouts_missing": sum(n_max - r["num_samples"] for r in rows if r.get("exhausted")),
+    }
@@ -3,16 +3,41 @@ Slime integration: unified advantage / reward interface for Slime to call after
 
 This package does not depend on or import slime; Slime installs this package and calls it from Slime code.
 Advantage and reward logic are shared with dca.verl_integration (framework-agnostic); only the batch interface follows Slime conventions.
+Names load lazily on first access (PEP 562), so importing this package does not import
+dca.verl_integration or NumPy until an advantage / reward function is used.
 """
 
-from dca.verl_integration import compute_advantage, reward_for_verl
-from .slime_hook import compute_advantage_for_slime
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
-# Slime reward is the same as VERL: 0/1 or (1-gamma*length) depending on mode.
-reward_for_slime = reward_for_verl
+if TYPE_CHECKING:
+    from dca.verl_integration import compute_advantage
+    from dca.verl_integration import reward_for_verl as reward_for_slime
+    from .slime_hook import compute_advantage_for_slime
+
+# public name -> (module, attribute)
+_LAZY_ATTRS = {
+    "compute_advantage": ("dca.verl_integration", "compute_advantage"),
+    "compute_advantage_for_slime": (__name__ + ".slime_hook", "compute_advantage_for_slime"),
+    # Slime reward is the same as VERL: 0/1 or (1-gamma*length) depending on mode.
+    "reward_for_slime": ("dca.verl_integration", "reward_for_verl"),
+}
 
 __all__ = [
     "compute_advantage",
     "compute_advantage_for_slime",
     "reward_for_slime",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    module, attr = _LAZY_ATTRS[name]
+    value = getattr(importlib.import_module(module), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -7,11 +7,13 @@ Batch keys are configurable; Slime Sample uses response_length (per item); the b
 """
 
 import numpy as np
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
-from dca.verl_integration.advantage_estimators import compute_advantage
+from dca.profiling import timed
+from dca.verl_integration.advantage_estimators import compute_batch_advantage
 
 
+@timed("slime_hook")
 def compute_advantage_for_slime(
     batch: Dict[str, Any],
     *,
@@ -24,7 +26,16 @@ def compute_advantage_for_slime(
     length_key: str = "response_lengths",
     correct_key: Optional[str] = None,
     group_size: Optional[int] = None,
-) -> np.ndarray:
+    group_sizes: Optional[Sequence[int]] = None,
+    observer: Optional[Any] = None,
+    data_source_key: str = "data_source",
+    compact: bool = False,
+    compact_tol: float = 1e-6,
+    length_store: Optional[Any] = None,
+    prompt_key: str = "index",
+    whitener: Optional[Any] = None,
+    diagnostics: Optional[Any] = None,
+) -> Union[np.ndarray, Tuple[np.ndarray, Dict[str, Any]]]:
     """
     Compute advantages from a Slime-style batch dict.
 
@@ -41,37 +52,54 @@ def compute_advantage_for_slime(
         Passed to compute_advantage. use_dynamic=True (DDCA) scales length advantage by ρ=n/G.
     group_size : int, optional
         G (responses per prompt). If None, treat N as one group.
+    group_sizes : sequence of int, optional
+        Ragged groups for a flat batch: group_sizes[b] responses for prompt b (e.g. per-prompt
+        budgets from dca.prompt_stats.RolloutBudgetScheduler). Overrides group_size; returns (N,).
+    observer : optional
+        Metrics observer (e.g. dca.online_metrics.RolloutMetrics). Called as
+        observer.observe(correct_mask, lengths, data_sources) with grouped arrays;
+        data_sources is batch[data_source_key] if present (per response or per group).
+    compact : bool
+        If True, also return advantage_keep_mask(...) for the batch: keep_mask / keep_indices
+        of responses with |advantage| > compact_tol, keep_groups, and tokens_saved, so the
+        trainer can drop zero-signal responses before building micro-batches. Responses with
+        zero advantage contribute no policy gradient (KL / entropy terms aside).
+    length_store : optional
+        Per-prompt length history (e.g. dca.prompt_stats.LengthBaselineStore), keyed by
+        batch[prompt_key] (per response or per group). DCA length scores are pooled with
+        length_store.baselines(ids); afterwards length_store.observe(ids, correct, lengths).
+    whitener : optional
+        Global-batch whitening stage (e.g. dca.verl_integration.GlobalWhitener), called as
+        whitener(advantages, lengths) after the per-group computation; each rank passes its
+        shard and only (count, mean, M2) is exchanged. compact masks use the unwhitened values.
+    diagnostics : dict or callable, optional
+        Per-batch summary of the DCA-GRPO pass: a dict is filled in place; a callable (e.g.
+        dca.diagnostics.DiagnosticsRing) is called with it. Supported only for adv_mode="dca"
+        with use_rloo=False and fixed groups (group_size, or (B, G) arrays); ragged
+        group_sizes, "dca_rloo", "vanilla" and "grpo_lp" raise ValueError.
 
     Returns
     -------
     advantages : np.ndarray, shape (N,) or (B, G)
+    (advantages, info) if compact=True; info["keep_indices"] index the flat (row-major) batch.
     """
-    rewards = np.asarray(batch[reward_key], dtype=np.float64)
-    lengths = np.asarray(batch[length_key], dtype=np.float64)
-    if correct_key and correct_key in batch:
-        correct_mask = np.asarray(batch[correct_key], dtype=bool)
-    else:
-        correct_mask = None
-
-    flat = rewards.ndim == 1
-    if flat and group_size is not None:
-        B = rewards.size // group_size
-        rewards = rewards.reshape(B, group_size)
-        lengths = lengths.reshape(B, group_size)
-        if correct_mask is not None:
-            correct_mask = correct_mask.reshape(B, group_size)
-
-    adv = compute_advantage(
-        rewards,
-        lengths,
-        correct_mask=correct_mask,
-        mode=adv_mode,
+    return compute_batch_advantage(
+        batch[reward_key],
+        batch[length_key],
+        batch[correct_key] if correct_key and correct_key in batch else None,
+        adv_mode=adv_mode,
         beta=beta,
         gamma=gamma,
         use_rloo=use_rloo,
         use_dynamic=use_dynamic,
+        group_size=group_size,
+        group_sizes=group_sizes,
+        observer=observer,
+        data_sources=batch[data_source_key] if data_source_key in batch else None,
+        compact=compact,
+        compact_tol=compact_tol,
+        length_store=length_store,
+        prompt_ids=batch[prompt_key] if length_store is not None else None,
+        whitener=whitener,
+        diagnostics=diagnostics,
     )
-
-    if flat and group_size is not None:
-        adv = adv.ravel()
-    return adv
@@ -0,0 +1,168 @@
+"""
+Streaming, mergeable accumulators shared by online metrics and evaluation reports.
+
+- RunningStats: count / mean / M2 (Welford, Chan et al. parallel merge).
+- QuantileSketch: log-bucketed relative-error quantile sketch (DDSketch-style).
+  Values x > 0 go to bucket ceil(log(x) / log(gamma)), gamma = (1 + alpha) / (1 - alpha),
+  so any reported quantile is within relative error alpha. Sketches with the same alpha
+  merge by adding bucket counts, so per-rank / per-step sketches can be combined.
+
+Both accept a scalar or an array per update and cost O(1) amortized per value.
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+
+class RunningStats:
+    """Count, mean and sum of squared deviations (M2) with O(1) mergeable state."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 minimum: float = math.inf, maximum: float = -math.inf):
+        self.count = int(count)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+        self.min = float(minimum)
+        self.max = float(maximum)
+
+    def update(self, values: Any) -> "RunningStats":
+        """Add a scalar or array of values (one Chan merge per call)."""
+        x = np.asarray(values, dtype=np.float64).ravel()
+        if x.size == 0:
+            return self
+        batch = RunningStats(x.size, float(x.mean()), float(((x - x.mean()) ** 2).sum()), float(x.min()), float(x.max()))
+        return self.merge(batch)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """In-place Chan et al. merge of another accumulator; returns self."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Population variance (ddof=0, matching np.std in dca.advantage)."""
+        return self.m2 / self.count if self.count > 0 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def total(self) -> float:
+        return self.mean * self.count
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, float]) -> "RunningStats":
+        return cls(d["count"], d["mean"], d["m2"], d.get("min", math.inf), d.get("max", -math.inf))
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative accuracy alpha (log-spaced buckets)."""
+
+    def __init__(self, alpha: float = 0.01):
+        if not 0.0 < alpha < 1.0:
+            raise ValueError("alpha must be in (0, 1)")
+        self.alpha = alpha
+        self._log_gamma = math.log((1.0 + alpha) / (1.0 - alpha))
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values: Any) -> "QuantileSketch":
+        """Add a scalar or array of non-negative values."""
+        x = np.asarray(values, dtype=np.float64).ravel()
+        if x.size == 0:
+            return self
+        pos = x[x > 0]
+        self.zero_count += int(x.size - pos.size)
+        self.count += int(x.size)
+        if pos.size:
+            idx = np.ceil(np.log(pos) / self._log_gamma).astype(np.int64)
+            keys, counts = np.unique(idx, return_counts=True)
+            buckets = self.buckets
+            for key, cnt in zip(keys.tolist(), counts.tolist()):
+                buckets[key] = buckets.get(key, 0) + cnt
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """In-place merge (requires the same alpha); returns self."""
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different alpha")
+        for key, cnt in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + cnt
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0 <= q <= 1); 0.0 for an empty sketch."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Bucket midpoint in log space: 2 * gamma^i / (gamma + 1)
+                gamma = math.exp(self._log_gamma)
+                return 2.0 * gamma ** key / (gamma + 1.0)
+        return 2.0 * math.exp(self._log_gamma * max(self.buckets)) / (math.exp(self._log_gamma) + 1.0)
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[str, float]:
+        """{"p50": ..., "p90": ...} for the given quantiles."""
+        return {"p{:g}".format(q * 100): self.quantile(q) for q in qs}
+
+    def count_at_least(self, threshold: float) -> int:
+        """Approximate number of values >= threshold (bucket granularity)."""
+        if threshold <= 0:
+            return self.count
+        t = int(math.ceil(math.log(threshold) / self._log_gamma))
+        return sum(cnt for key, cnt in self.buckets.items() if key >= t)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "QuantileSketch":
+        sk = cls(d["alpha"])
+        sk.zero_count = int(d["zero_count"])
+        sk.count = int(d["count"])
+        sk.buckets = {int(k): int(v) for k, v in d["buckets"].items()}
+        return sk
+
+
+def merge_all(items: Iterable[Any], empty: Optional[Any] = None) -> Any:
+    """Merge a sequence of RunningStats or QuantileSketch into a new accumulator."""
+    out = empty
+    for item in items:
+        if out is None:
+            out = type(item).from_dict(item.to_dict())
+        else:
+            out.merge(item)
+    return out
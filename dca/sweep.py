@@ -0,0 +1,279 @@
+"""
+Resumable parallel hyperparameter sweeps with an on-disk per-trial cache.
+
+A sweep spec (JSON / YAML dict) names a trial function and the configs to run:
+
+  trial: toy                      # built-in toy_trial, or "package.module:function"
+  fixed: {n_steps: 100, seeds: 64}
+  grid:                           # cartesian product
+    mode: [dca, grpo_lp]
+    beta: [0.05, 0.2, 1.0]
+    gamma: [0.0001, 0.001]
+  random:                         # and / or n random draws
+    n: 20
+    seed: 0
+    params:
+      beta: {log_uniform: [0.01, 2.0]}
+      use_dynamic: {choice: [true, false]}
+
+Each config is keyed by a hash of (trial, normalized config); the result of a finished trial
+is written atomically to <out>/trials/<key>.json. run_sweep skips keys already on disk, so an
+interrupted sweep resumes where it stopped, and runs the rest on a process pool. Trials are
+normalized before hashing (toy_trial drops parameters its mode ignores), so a grid over beta
+does not rerun the same grpo_lp trial once per beta.
+
+summarize() lists accuracy and length per config and marks the accuracy / length Pareto front.
+"""
+
+import hashlib
+import importlib
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+Config = Dict[str, Any]
+
+TOY_DEFAULTS: Config = {
+    "mode": "dca",
+    "beta": 0.2,
+    "gamma": 1e-3,
+    "use_dynamic": True,
+    "use_rloo": False,
+    "group_size": 4,
+    "lr": 2.0,
+    "n_steps": 100,
+    "seeds": 32,
+    "seed": 0,
+    "tail": 20,
+}
+# parameters each compute_advantage mode actually reads
+_MODE_PARAMS = {
+    "vanilla": (),
+    "grpo_lp": ("gamma",),
+    "dca": ("beta", "use_dynamic", "use_rloo"),
+    "dca_rloo": ("beta", "use_dynamic"),
+}
+
+
+def normalize_toy_config(config: Config) -> Config:
+    """TOY_DEFAULTS filled in, minus the advantage parameters the config's mode ignores."""
+    out = dict(TOY_DEFAULTS, **config)
+    if out["mode"] not in _MODE_PARAMS:
+        raise ValueError("mode must be one of {}, got {!r}".format(tuple(_MODE_PARAMS), out["mode"]))
+    for key in ("beta", "gamma", "use_dynamic", "use_rloo"):
+        if key not in _MODE_PARAMS[out["mode"]]:
+            del out[key]
+    return out
+
+
+def toy_trial(config: Config) -> Dict[str, Any]:
+    """
+    `seeds` toy policies (dca.toy_sim) trained with compute_advantage(mode, beta, gamma, ...).
+
+    Returns seed mean / std of the final λ, and accuracy / mean length over the last `tail` steps.
+    """
+    from .toy_sim import simulate_population
+    from .verl_integration import compute_advantage
+
+    c = dict(TOY_DEFAULTS, **config)
+    kwargs = {k: c[k] for k in ("beta", "gamma", "use_dynamic", "use_rloo")}
+
+    def advantage_fn(correct: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        if c["mode"] == "grpo_lp":
+            rewards = np.where(correct, 1.0 - c["gamma"] * lengths, 0.0)
+        else:
+            rewards = correct.astype(np.float64)
+        return compute_advantage(rewards, lengths, correct, mode=c["mode"], **kwargs)
+
+    out = simulate_population(c["n_steps"], c["group_size"], lr=c["lr"], population=c["seeds"], seed=c["seed"],
+                              advantage_fn=advantage_fn)
+    lam = out["lam"][-1]
+    acc = out["acc"][-c["tail"]:].mean(axis=0)
+    length = out["length"][-c["tail"]:].mean(axis=0)
+    return {
+        "lam_mean": float(lam.mean()), "lam_std": float(lam.std()),
+        "acc_mean": float(acc.mean()), "acc_std": float(acc.std()),
+        "length_mean": float(length.mean()), "length_std": float(length.std()),
+    }
+
+
+TRIALS: Dict[str, Tuple[Callable[[Config], Dict[str, Any]], Callable[[Config], Config]]] = {
+    "toy": (toy_trial, normalize_toy_config),
+}
+
+
+def resolve_trial(name: str) -> Tuple[Callable[[Config], Dict[str, Any]], Callable[[Config], Config]]:
+    """(trial_fn, normalize_fn) for a built-in name or "package.module:function" (no normalization)."""
+    if name in TRIALS:
+        return TRIALS[name]
+    module, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError("Unknown trial {!r}: use one of {} or 'package.module:function'".format(name, sorted(TRIALS)))
+    return getattr(importlib.import_module(module), attr), dict
+
+
+# -- configs ---------------------------------------------------------------------------
+
+
+def _draw(rng: np.random.Generator, dist: Dict[str, Any]) -> Any:
+    (kind, args), = dist.items()
+    if kind == "choice":
+        return args[int(rng.integers(len(args)))]
+    if kind == "uniform":
+        return float(rng.uniform(args[0], args[1]))
+    if kind == "log_uniform":
+        return float(math.exp(rng.uniform(math.log(args[0]), math.log(args[1]))))
+    if kind == "int_uniform":
+        return int(rng.integers(args[0], args[1] + 1))
+    raise ValueError("Unknown distribution {!r} (choice, uniform, log_uniform, int_uniform)".format(kind))
+
+
+def expand_spec(spec: Dict[str, Any]) -> List[Config]:
+    """Configs of a spec: fixed params merged into every grid point and random draw."""
+    fixed = spec.get("fixed", {})
+    configs: List[Config] = []
+    grid = spec.get("grid")
+    if grid:
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            configs.append(dict(fixed, **dict(zip(keys, values))))
+    rand = spec.get("random")
+    if rand:
+        rng = np.random.default_rng(rand.get("seed", 0))
+        for _ in range(int(rand["n"])):
+            configs.append(dict(fixed, **{k: _draw(rng, d) for k, d in sorted(rand["params"].items())}))
+    if not grid and not rand:
+        configs.append(dict(fixed))
+    return configs
+
+
+def config_key(trial: str, config: Config) -> str:
+    """Stable hash of (trial, config): 16 hex chars of sha1 over canonical JSON."""
+    blob = json.dumps({"trial": trial, "config": config}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+# -- cache -----------------------------------------------------------------------------
+
+
+class TrialCache:
+    """One JSON file per finished trial under <root>/trials, written atomically."""
+
+    def __init__(self, root: Union[str, Path]):
+        self.dir = Path(root) / "trials"
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        return self.dir / (key + ".json")
+
+    def __contains__(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.path(key)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, key: str, record: Dict[str, Any]) -> None:
+        path = self.path(key)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, sort_keys=True)
+        os.replace(tmp, path)
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        for path in sorted(self.dir.glob("*.json")):
+            with open(path, encoding="utf-8") as f:
+                yield json.load(f)
+
+
+# -- running ---------------------------------------------------------------------------
+
+
+def _run_one(trial: str, config: Config) -> Tuple[Dict[str, Any], float]:
+    fn, _ = resolve_trial(trial)
+    t0 = time.perf_counter()
+    result = fn(config)
+    return result, time.perf_counter() - t0
+
+
+def run_sweep(
+    spec: Dict[str, Any],
+    out_dir: Union[str, Path],
+    workers: int = 0,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run every config of spec not yet cached under out_dir; returns {records, ran, cached, failed}.
+
+    workers: process pool size (0 = os.cpu_count(), 1 = run in this process). Each finished
+    trial is cached as soon as it completes; a failed trial is reported and not cached, so
+    rerunning the sweep retries it.
+    """
+    trial = spec.get("trial", "toy")
+    _, normalize = resolve_trial(trial)
+    cache = TrialCache(out_dir)
+    todo: Dict[str, Config] = {}
+    keys: List[str] = []
+    for config in expand_spec(spec):
+        config = normalize(config)
+        key = config_key(trial, config)
+        if key not in keys:
+            keys.append(key)
+            if key not in cache:
+                todo[key] = config
+    say = progress or (lambda msg: None)
+    say("{} configs: {} cached, {} to run".format(len(keys), len(keys) - len(todo), len(todo)))
+
+    failed: Dict[str, str] = {}
+
+    done = [0]
+
+    def finish(key: str, result: Dict[str, Any], seconds: float) -> None:
+        cache.put(key, {"key": key, "trial": trial, "config": todo[key], "result": result, "seconds": seconds})
+        done[0] += 1
+        say("[{}/{}] {} {} ({:.2f}s)".format(done[0], len(todo), key, todo[key], seconds))
+
+    if workers == 1 or len(todo) <= 1:
+        for key, config in todo.items():
+            try:
+                finish(key, *_run_one(trial, config))
+            except Exception as e:  # noqa: BLE001 - one bad config must not stop the sweep
+                failed[key] = repr(e)
+                say("FAILED {} {}: {!r}".format(key, config, e))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or None) as pool:
+            futures = {pool.submit(_run_one, trial, config): key for key, config in todo.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    finish(key, *future.result())
+                except Exception as e:  # noqa: BLE001
+                    failed[key] = repr(e)
+                    say("FAILED {} {}: {!r}".format(key, todo[key], e))
+    records = [r for r in (cache.get(k) for k in keys) if r is not None]
+    return {"records": records, "ran": len(todo) - len(failed), "cached": len(keys) - len(todo), "failed": failed}
+
+
+def summarize(records: List[Dict[str, Any]], acc_key: str = "acc_mean", length_key: str = "length_mean") -> List[Dict[str, Any]]:
+    """
+    One row per record (config + result), sorted by accuracy then length, with "pareto": True
+    where no other config has accuracy >= and length <= with one of them strictly better.
+    """
+    rows = [dict(r["config"], **r["result"], key=r["key"]) for r in records]
+    for row in rows:
+        acc, length = row[acc_key], row[length_key]
+        row["pareto"] = not any(
+            o[acc_key] >= acc and o[length_key] <= length and (o[acc_key] > acc or o[length_key] < length)
+            for o in rows
+        )
+    return sorted(rows, key=lambda r: (-r[acc_key], r[length_key]))
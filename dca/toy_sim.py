@@ -0,0 +1,142 @@
+"""
+Population-vectorized toy RL simulator for exploring beta / gamma / G / use_dynamic.
+
+The toy world of scripts/cpu_mini_validate.py: a policy with one parameter λ samples response
+lengths from Poisson(λ); a response is correct with probability p_correct_given_length(L),
+which peaks near L_OPT. λ follows REINFORCE on the group advantages.
+
+simulate_population advances P independent policies at once: each step samples a (P, G)
+matrix of rollouts, computes advantages for all groups in one batched pass
+(advantage_dca_grpo_batch, or coupled-LP rewards with vanilla GRPO normalization) and
+updates the λ vector. beta, gamma, lr and use_dynamic may differ per policy, so a grid of
+configs x seeds runs as one population; sweep() builds that population for a grid and
+summarizes it per config.
+"""
+
+import itertools
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .advantage import advantage_dca_grpo_batch, advantage_vanilla_grpo_batch
+
+# --- Toy world: optimal length band (too short => incomplete, wrong) ---
+L_OPT = 80.0
+SCALE = 600.0
+BASE_CORRECT = 0.2
+
+LAM_INIT = 120.0
+LAM_MIN, LAM_MAX = 5.0, 2000.0
+
+METHODS = ("dca", "lp")
+
+ArrayLike = Union[float, bool, Sequence[float], np.ndarray]
+
+
+def p_correct_given_length(L: np.ndarray) -> np.ndarray:
+    """P(correct | length). Peak near L_OPT; too short => low acc, too long => wasteful."""
+    L = np.asarray(L, dtype=float)
+    return BASE_CORRECT + 0.75 * np.exp(-((L - L_OPT) ** 2) / SCALE)
+
+
+def simulate_population(
+    n_steps: int,
+    group_size: int,
+    method: str = "dca",
+    beta: ArrayLike = 0.2,
+    gamma: ArrayLike = 0.001,
+    lr: ArrayLike = 2.0,
+    use_dynamic: ArrayLike = True,
+    population: int = 1,
+    seed: int = 0,
+    lam_init: float = LAM_INIT,
+    advantage_fn: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Run P toy policies for n_steps with one group of group_size rollouts per policy per step.
+
+    method: "dca" (advantage_dca_grpo_batch with beta, use_dynamic) or "lp" (coupled length
+      penalty with gamma, vanilla GRPO advantages).
+    beta, gamma, lr, use_dynamic: scalars or arrays of shape (P,); P is the broadcast size of
+      these and `population`.
+    advantage_fn: optional (correct (P, G), lengths (P, G)) -> advantages (P, G), used instead
+      of `method` (e.g. compute_advantage in any mode; see dca.sweep.toy_trial).
+    Returns {"lam": (n_steps + 1, P), "acc": (n_steps, P), "length": (n_steps, P)}: λ before /
+    after each step, and each step's group accuracy and mean length.
+    """
+    if method not in METHODS:
+        raise ValueError("method must be one of {}, got {!r}".format(METHODS, method))
+    P = int(np.broadcast(np.empty(population), *(np.asarray(v) for v in (beta, gamma, lr, use_dynamic))).size)
+    beta = np.broadcast_to(np.asarray(beta, dtype=np.float64), (P,))
+    gamma = np.broadcast_to(np.asarray(gamma, dtype=np.float64), (P,))
+    lr = np.broadcast_to(np.asarray(lr, dtype=np.float64), (P,))
+    use_dynamic = np.broadcast_to(np.asarray(use_dynamic, dtype=bool), (P,))
+
+    rng = np.random.default_rng(seed)
+    lam = np.full(P, float(lam_init))
+    lam_hist = np.empty((n_steps + 1, P))
+    acc_hist = np.empty((n_steps, P))
+    len_hist = np.empty((n_steps, P))
+    lam_hist[0] = lam
+    for t in range(n_steps):
+        lengths = np.clip(rng.poisson(lam[:, None], (P, group_size)).astype(np.float64), 1.0, 1e4)
+        correct = rng.random((P, group_size)) < p_correct_given_length(lengths)
+        if advantage_fn is not None:
+            adv = advantage_fn(correct, lengths)
+        elif method == "dca":
+            adv = advantage_dca_grpo_batch(correct, lengths, beta, use_dynamic=use_dynamic)
+        else:
+            # rewards_coupled_lp per row: 1 - gamma*|o| if correct else 0
+            adv = advantage_vanilla_grpo_batch(np.where(correct, 1.0 - gamma[:, None] * lengths, 0.0))
+        # REINFORCE on Poisson(λ): score = L/λ - 1
+        grad = np.mean(adv * (lengths / (lam[:, None] + 1e-8) - 1.0), axis=1)
+        lam = np.clip(lam + lr * grad, LAM_MIN, LAM_MAX)
+        lam_hist[t + 1] = lam
+        acc_hist[t] = correct.mean(axis=1)
+        len_hist[t] = lengths.mean(axis=1)
+    return {"lam": lam_hist, "acc": acc_hist, "length": len_hist}
+
+
+def sweep(
+    betas: Sequence[float] = (0.2,),
+    gammas: Sequence[float] = (0.001,),
+    group_sizes: Sequence[int] = (4,),
+    use_dynamic: Sequence[bool] = (True,),
+    methods: Sequence[str] = METHODS,
+    seeds: int = 32,
+    n_steps: int = 100,
+    lr: float = 2.0,
+    tail: int = 20,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Every config of the grid with `seeds` independent policies each; one population per G.
+
+    DCA configs are beta x use_dynamic, LP configs are gamma. Returns one row per config with
+    the seed mean / std of the final λ, and the mean accuracy and length over the last `tail`
+    steps.
+    """
+    rows: List[Dict[str, Any]] = []
+    for G in group_sizes:
+        for method in methods:
+            if method == "dca":
+                configs = [{"beta": b, "use_dynamic": d} for b, d in itertools.product(betas, use_dynamic)]
+            elif method == "lp":
+                configs = [{"gamma": g} for g in gammas]
+            else:
+                raise ValueError("method must be one of {}, got {!r}".format(METHODS, method))
+            per = {key: np.repeat([c.get(key, default) for c in configs], seeds)
+                   for key, default in (("beta", 0.0), ("gamma", 0.0), ("use_dynamic", False))}
+            out = simulate_population(n_steps, G, method, per["beta"], per["gamma"], lr, per["use_dynamic"],
+                                      seed=seed + G)
+            lam = out["lam"][-1].reshape(len(configs), seeds)
+            acc = out["acc"][-tail:].mean(axis=0).reshape(len(configs), seeds)
+            length = out["length"][-tail:].mean(axis=0).reshape(len(configs), seeds)
+            for i, config in enumerate(configs):
+                rows.append(dict(
+                    config, method=method, group_size=G, seeds=seeds,
+                    lam_mean=float(lam[i].mean()), lam_std=float(lam[i].std()),
+                    acc_mean=float(acc[i].mean()), acc_std=float(acc[i].std()),
+                    length_mean=float(length[i].mean()),
+                ))
+    return rows
@@ -0,0 +1,222 @@
+"""
+Stratified subsample evaluation for fast checkpoint triage.
+
+Full evaluation on GSM8K / MATH500 / AMC23 / AIME25 with 4-16 rollouts per problem is
+expensive; intermediate checkpoints usually only need a rough reading. Triage picks a
+stratified subsample of problems (strata = dataset x MATH level) with a fixed seed,
+evaluates only those, and reports estimated full-set values with confidence bounds.
+
+Estimator (stratified random sampling, proportional allocation):
+  mean  = sum_h W_h * ybar_h,                       W_h = N_h / N
+  var   = sum_h W_h^2 * (1 - n_h/N_h) * s_h^2 / n_h
+  n_req = n0 / (1 + n0/N),  n0 = z^2 * sum_h W_h * S_h^2 / d^2   (target half-width d)
+"""
+
+import math
+import random
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .metrics import pass_at_k_multi, compute_avg_tokens
+
+
+def stratum_key(item: Dict[str, Any]) -> str:
+    """Stratum of a problem or result row: "<dataset>|<level>" (level empty if absent)."""
+    if "stratum" in item:
+        return str(item["stratum"])
+    dataset = item.get("dataset", item.get("data_source", "unknown"))
+    level = item.get("level", "")
+    return "{}|{}".format(dataset, level)
+
+
+def z_value(confidence: float) -> float:
+    """Two-sided standard normal quantile for a confidence level (e.g. 0.95 -> 1.96)."""
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence must be in (0, 1)")
+    target = 0.5 + confidence / 2.0
+    lo, hi = 0.0, 10.0
+    for _ in range(80):
+        mid = (lo + hi) / 2.0
+        if 0.5 * (1.0 + math.erf(mid / math.sqrt(2.0))) < target:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2.0
+
+
+def stratified_sample(
+    items: Sequence[Dict[str, Any]],
+    fraction: Optional[float] = None,
+    n: Optional[int] = None,
+    seed: int = 0,
+    min_per_stratum: int = 2,
+    key_fn: Callable[[Dict[str, Any]], str] = stratum_key,
+) -> Tuple[List[int], Dict[str, Dict[str, int]]]:
+    """
+    Pick a stratified subsample with proportional allocation.
+
+    Exactly one of fraction / n must be given. Each stratum gets at least
+    min(min_per_stratum, N_h) problems so its variance can be estimated.
+
+    Returns
+    -------
+    indices : list of int
+        Selected positions into items, sorted.
+    strata : dict
+        stratum -> {"population": N_h, "sampled": n_h}; pass to evaluate_triage.
+    """
+    if (fraction is None) == (n is None):
+        raise ValueError("pass exactly one of fraction or n")
+    groups: Dict[str, List[int]] = {}
+    for i, item in enumerate(items):
+        groups.setdefault(key_fn(item), []).append(i)
+    total = len(items)
+    if n is None:
+        n = int(math.ceil(fraction * total))
+    n = max(0, min(n, total))
+
+    rng = random.Random(seed)
+    indices: List[int] = []
+    strata: Dict[str, Dict[str, int]] = {}
+    for key in sorted(groups):
+        members = groups[key]
+        n_h = int(round(n * len(members) / total)) if total else 0
+        n_h = min(len(members), max(n_h, min_per_stratum))
+        chosen = rng.sample(members, n_h)
+        indices.extend(chosen)
+        strata[key] = {"population": len(members), "sampled": n_h}
+    indices.sort()
+    return indices, strata
+
+
+def _mean_var(values: Sequence[float]) -> Tuple[float, float]:
+    """Sample mean and unbiased sample variance (0 for fewer than 2 values)."""
+    m = len(values)
+    if m == 0:
+        return 0.0, 0.0
+    mean = sum(values) / m
+    if m < 2:
+        return mean, 0.0
+    return mean, sum((v - mean) ** 2 for v in values) / (m - 1)
+
+
+def stratified_estimate(
+    values_by_stratum: Dict[str, Sequence[float]],
+    populations: Dict[str, int],
+    confidence: float = 0.95,
+    means_by_stratum: Optional[Dict[str, float]] = None,
+    bounds: Optional[Tuple[float, float]] = None,
+) -> Dict[str, float]:
+    """
+    Stratified estimate of a full-set mean with a normal-approximation confidence interval.
+
+    values_by_stratum: per-problem values observed in each stratum.
+    populations: N_h (full-set size) of every stratum, including strata with no samples.
+    means_by_stratum: optional per-stratum point estimates (e.g. from dca.metrics);
+        default is the plain mean of values_by_stratum[h].
+    bounds: optional (lo, hi) to clip the interval to (e.g. (0, 1) for pass rates).
+
+    Strata with one observation borrow the pooled sample variance. Strata in populations
+    with no observations are reported as uncovered and excluded from the weights.
+    """
+    N = sum(populations[h] for h in values_by_stratum if h in populations)
+    pooled = [v for vals in values_by_stratum.values() for v in vals]
+    _, pooled_var = _mean_var(pooled)
+    mean = 0.0
+    var = 0.0
+    for h, vals in values_by_stratum.items():
+        N_h = populations.get(h, 0)
+        n_h = len(vals)
+        if N_h == 0 or n_h == 0:
+            continue
+        W_h = N_h / N
+        ybar, s2 = _mean_var(vals)
+        if means_by_stratum is not None and h in means_by_stratum:
+            ybar = means_by_stratum[h]
+        if n_h < 2 and N_h > 1:
+            s2 = pooled_var
+        mean += W_h * ybar
+        var += W_h ** 2 * (1.0 - n_h / N_h) * s2 / n_h
+    se = math.sqrt(max(var, 0.0))
+    half = z_value(confidence) * se
+    lo, hi = mean - half, mean + half
+    if bounds is not None:
+        lo, hi = max(bounds[0], lo), min(bounds[1], hi)
+    uncovered = sum(N_h for h, N_h in populations.items() if not values_by_stratum.get(h))
+    return {"estimate": mean, "stderr": se, "lower": lo, "upper": hi, "uncovered_problems": uncovered}
+
+
+def required_sample_size(
+    values_by_stratum: Dict[str, Sequence[float]],
+    populations: Dict[str, int],
+    half_width: float,
+    confidence: float = 0.95,
+) -> int:
+    """
+    Problems needed (proportional allocation, with finite-population correction) for the
+    confidence interval half-width to reach half_width, using observed stratum variances.
+    """
+    if half_width <= 0:
+        raise ValueError("half_width must be positive")
+    N = sum(populations.values())
+    if N == 0:
+        return 0
+    pooled = [v for vals in values_by_stratum.values() for v in vals]
+    _, pooled_var = _mean_var(pooled)
+    weighted_var = 0.0
+    for h, N_h in populations.items():
+        vals = values_by_stratum.get(h, ())
+        s2 = _mean_var(vals)[1] if len(vals) >= 2 else pooled_var
+        weighted_var += (N_h / N) * s2
+    n0 = z_value(confidence) ** 2 * weighted_var / half_width ** 2
+    return int(math.ceil(n0 / (1.0 + n0 / N)))
+
+
+def evaluate_triage(
+    scored: Iterable[Dict[str, Any]],
+    strata: Dict[str, Dict[str, int]],
+    k: int = 1,
+    confidence: float = 0.95,
+    target_half_width: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Estimate full-set pass@1, pass@k and avg_tokens from scored subsample rows.
+
+    scored: rows with "stratum", "first_correct" (bool), "num_correct", "num_samples",
+        "lengths" (list), as produced by scripts/evaluate.py:score_item.
+    strata: stratum -> {"population": N_h, ...} from stratified_sample.
+    Per-problem values come from dca.metrics (pass_at_k_multi, compute_avg_tokens);
+    avg_tokens per stratum is the per-rollout mean, as in the full evaluator.
+    """
+    rows_by_stratum: Dict[str, List[Dict[str, Any]]] = {}
+    for row in scored:
+        rows_by_stratum.setdefault(row["stratum"], []).append(row)
+    populations = {h: int(info["population"]) for h, info in strata.items()}
+
+    acc_vals: Dict[str, List[float]] = {}
+    pk_vals: Dict[str, List[float]] = {}
+    tok_vals: Dict[str, List[float]] = {}
+    tok_means: Dict[str, float] = {}
+    for h, rows in rows_by_stratum.items():
+        acc_vals[h] = [1.0 if r["first_correct"] else 0.0 for r in rows]
+        pk_vals[h] = [
+            float(pass_at_k_multi(r["num_samples"], [r["num_correct"]], min(k, r["num_samples"]))) for r in rows
+        ]
+        tok_vals[h] = [compute_avg_tokens(r["lengths"]) for r in rows]
+        # Same per-rollout average as the full evaluator, restricted to this stratum
+        tok_means[h] = compute_avg_tokens([x for r in rows for x in r["lengths"]])
+
+    report: Dict[str, Any] = {
+        "pass@1": stratified_estimate(acc_vals, populations, confidence, bounds=(0.0, 1.0)),
+        "pass@{}".format(k): stratified_estimate(pk_vals, populations, confidence, bounds=(0.0, 1.0)),
+        "avg_tokens": stratified_estimate(tok_vals, populations, confidence, tok_means),
+        "num_sampled": sum(len(r) for r in rows_by_stratum.values()),
+        "num_population": sum(populations.values()),
+        "confidence": confidence,
+    }
+    if target_half_width is not None:
+        report["required_problems"] = {
+            "pass@1": required_sample_size(acc_vals, populations, target_half_width, confidence),
+            "pass@{}".format(k): required_sample_size(pk_vals, populations, target_half_width, confidence),
+            "target_half_width": target_half_width,
+        }
+    return report
@@ -10,22 +10,83 @@ Patch VERL at the place where advantages are computed:
   advantages = compute_advantage(rewards, lengths, correct_mask=correct, mode=config.adv_mode, beta=config.beta)
 """
 
-from .advantage_estimators import (
-    compute_advantage,
-    infer_correct_mask,
-)
-from .reward_shapers import (
-    reward_vanilla,
-    reward_coupled_lp,
-    reward_for_verl,
-)
-from .verl_hook import compute_advantage_for_verl
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .advantage_estimators import (
+        advantage_keep_mask,
+        compute_advantage,
+        compute_advantage_ragged,
+        compute_batch_advantage,
+        infer_correct_mask,
+    )
+    from .reward_shapers import (
+        reward_vanilla,
+        reward_coupled_lp,
+        reward_for_verl,
+    )
+    from .token_expand import cu_seqlens, expand_packed, expand_padded, packed_to_padded
+    from .verl_hook import compute_advantage_for_verl
+    from .whitening import GlobalWhitener, merge_stats, shard_stats, whiten_
+
+# public name -> submodule defining it (loaded on first access, PEP 562)
+_LAZY_ATTRS = {
+    "advantage_keep_mask": "advantage_estimators",
+    "compute_advantage": "advantage_estimators",
+    "compute_advantage_ragged": "advantage_estimators",
+    "compute_batch_advantage": "advantage_estimators",
+    "infer_correct_mask": "advantage_estimators",
+    "reward_vanilla": "reward_shapers",
+    "reward_coupled_lp": "reward_shapers",
+    "reward_for_verl": "reward_shapers",
+    "cu_seqlens": "token_expand",
+    "expand_packed": "token_expand",
+    "expand_padded": "token_expand",
+    "packed_to_padded": "token_expand",
+    "compute_advantage_for_verl": "verl_hook",
+    "GlobalWhitener": "whitening",
+    "merge_stats": "whitening",
+    "shard_stats": "whitening",
+    "whiten_": "whitening",
+}
 
 __all__ = [
+    "GlobalWhitener",
+    "advantage_keep_mask",
     "compute_advantage",
     "compute_advantage_for_verl",
+    "compute_advantage_ragged",
+    "compute_batch_advantage",
+    "cu_seqlens",
+    "expand_packed",
+    "expand_padded",
     "infer_correct_mask",
+    "merge_stats",
+    "packed_to_padded",
     "reward_vanilla",
     "reward_coupled_lp",
     "reward_for_verl",
+    "shard_stats",
+    "whiten_",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module("." + module, __name__), name)
+    else:
+        # dca.verl_integration.<submodule> without importing it first
+        try:
+            value = importlib.import_module("." + name, __name__)
+        except ModuleNotFoundError as e:
+            if e.name != __name__ + "." + name:
+                raise
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name)) from None
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -8,12 +8,13 @@ DDCA (use_dynamic=True, default): scale length advantage by pass rate ρ = n/G.
 """
 
 import numpy as np
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 # Relative import for when used inside repo; optional for when copied into verl
 try:
     from ..advantage import (
         advantage_dca_grpo,
+        advantage_dca_grpo_batch,
         advantage_dca_rloo,
         advantage_vanilla_grpo,
         rewards_coupled_lp,
@@ -21,10 +22,15 @@ try:
 except ImportError:
     from dca.advantage import (
         advantage_dca_grpo,
+        advantage_dca_grpo_batch,
         advantage_dca_rloo,
         advantage_vanilla_grpo,
         rewards_coupled_lp,
     )
+try:
+    from ..profiling import count, timed
+except ImportError:
+    from dca.profiling import count, timed
 
 
 AdvMode = str  # "vanilla" | "grpo_lp" | "dca" | "dca_rloo"
@@ -35,6 +41,7 @@ def infer_correct_mask(rewards: np.ndarray, threshold: float = 0.5) -> np.ndarra
     return (np.asarray(rewards, dtype=float) > threshold).astype(bool)
 
 
+@timed("compute_advantage")
 def compute_advantage(
     rewards: np.ndarray,
     lengths: np.ndarray,
@@ -46,6 +53,8 @@ def compute_advantage(
     use_rloo: bool = False,
     use_dynamic: bool = True,
     eps: float = 1e-8,
+    length_baselines: Optional[Any] = None,
+    diagnostics: Optional[Dict[str, Any]] = None,
 ) -> np.ndarray:
     """
     Single entry point for advantage computation, compatible with VERL's per-group batch.
@@ -75,6 +84,13 @@ def compute_advantage(
         If True (default), scale length advantage by ρ = n/G (DDCA). Set False for original DCA.
     eps : float
         Small constant for std.
+    length_baselines : optional
+        Historical (mean, var, weight) of correct lengths for DCA modes (see
+        dca.prompt_stats.LengthBaselineStore): one tuple for a (G,) group, or a sequence of B
+        tuples / None for (B, G).
+    diagnostics : dict, optional
+        For mode "dca" (GRPO form), filled with a per-batch summary computed in the same
+        vectorized pass (see dca.advantage.advantage_dca_grpo_batch); other modes leave it empty.
 
     Returns
     -------
@@ -86,23 +102,291 @@ def compute_advantage(
         correct_mask = infer_correct_mask(rewards)
     else:
         correct_mask = np.asarray(correct_mask, dtype=bool)
+    count("advantage.groups", 1 if rewards.ndim == 1 else rewards.shape[0])
+    count("advantage.responses", rewards.size)
+
+    if mode == "dca" and not use_rloo:
+        # all groups in one vectorized pass
+        grouped = rewards.reshape(1, -1) if rewards.ndim == 1 else rewards
+        adv = advantage_dca_grpo_batch(
+            _per_group(correct_mask, grouped.shape),
+            _per_group(lengths, grouped.shape),
+            beta,
+            eps=eps,
+            use_dynamic=use_dynamic,
+            length_baselines=[length_baselines] if rewards.ndim == 1 else length_baselines,
+            diagnostics=diagnostics,
+        )
+        return adv.reshape(rewards.shape)
 
     if rewards.ndim == 1:
-        return _compute_advantage_1d(rewards, lengths, correct_mask, mode, beta=beta, gamma=gamma, use_rloo=use_rloo, use_dynamic=use_dynamic, eps=eps)
+        return _compute_advantage_1d(
+            rewards, lengths, correct_mask, mode, beta=beta, gamma=gamma, use_rloo=use_rloo, use_dynamic=use_dynamic, eps=eps,
+            length_baseline=length_baselines,
+        )
     # Batch of groups (B, G)
     B, G = rewards.shape
     if correct_mask.ndim == 1 and correct_mask.size == B * G:
         correct_mask = correct_mask.reshape(B, G)
     if lengths.ndim == 1 and lengths.size == B * G:
         lengths = lengths.reshape(B, G)
+    if length_baselines is None:
+        length_baselines = [None] * B
     out = np.zeros_like(rewards)
     for b in range(B):
         out[b] = _compute_advantage_1d(
-            rewards[b], lengths[b], correct_mask[b], mode, beta=beta, gamma=gamma, use_rloo=use_rloo, use_dynamic=use_dynamic, eps=eps
+            rewards[b], lengths[b], correct_mask[b], mode, beta=beta, gamma=gamma, use_rloo=use_rloo, use_dynamic=use_dynamic, eps=eps,
+            length_baseline=length_baselines[b],
         )
     return out
 
 
+def _per_group(values: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    values as (B, G), with the per-group semantics of _compute_advantage_1d: a flat B*G array
+    is reshaped, entries past G in each group (longer masks / lengths) are ignored.
+    """
+    if values.shape == shape:
+        return values
+    if values.size == shape[0] * shape[1]:
+        return values.reshape(shape)
+    return values.reshape(shape[0], -1)[:, : shape[1]]
+
+
+def split_groups(values: np.ndarray, group_sizes: Sequence[int]) -> List[np.ndarray]:
+    """Split a flat per-response array (N = sum(group_sizes)) into ragged groups."""
+    values = np.asarray(values).ravel()
+    if int(np.sum(group_sizes)) != values.size:
+        raise ValueError("group_sizes sum to {}, but there are {} responses".format(int(np.sum(group_sizes)), values.size))
+    return np.split(values, np.cumsum(group_sizes)[:-1])
+
+
+def group_prompt_ids(prompt_ids: Any, group_sizes: Sequence[int]) -> List[Any]:
+    """One prompt id per group, from ids given per group or per response (first of each group)."""
+    ids = list(np.asarray(prompt_ids, dtype=object).ravel())
+    if len(ids) == len(group_sizes):
+        return ids
+    starts = np.cumsum(group_sizes) - np.asarray(group_sizes)
+    if len(ids) != int(np.sum(group_sizes)):
+        raise ValueError("expected {} or {} prompt ids, got {}".format(len(group_sizes), int(np.sum(group_sizes)), len(ids)))
+    return [ids[i] for i in starts]
+
+
+@timed("compute_advantage_ragged")
+def compute_advantage_ragged(
+    rewards: np.ndarray,
+    lengths: np.ndarray,
+    group_sizes: Sequence[int],
+    correct_mask: Optional[np.ndarray] = None,
+    mode: AdvMode = "vanilla",
+    *,
+    beta: float = 0.2,
+    gamma: float = 1e-3,
+    use_rloo: bool = False,
+    use_dynamic: bool = True,
+    eps: float = 1e-8,
+    length_baselines: Optional[Sequence[Any]] = None,
+) -> np.ndarray:
+    """
+    compute_advantage for ragged groups: flat (N,) arrays with group_sizes[b] responses for
+    prompt b (e.g. per-prompt budgets from dca.prompt_stats.RolloutBudgetScheduler).
+    Each group is normalized on its own, so ρ = n/G uses that group's own G. Returns (N,).
+    length_baselines: optional per-group (mean, var, weight) or None, as in compute_advantage.
+    """
+    rewards = np.asarray(rewards, dtype=np.float64).ravel()
+    lengths = np.asarray(lengths, dtype=np.float64).ravel()
+    if correct_mask is None:
+        correct_mask = infer_correct_mask(rewards)
+    if length_baselines is None:
+        length_baselines = [None] * len(group_sizes)
+    count("advantage.groups", len(group_sizes))
+    count("advantage.responses", rewards.size)
+    groups = zip(split_groups(rewards, group_sizes), split_groups(lengths, group_sizes),
+                 split_groups(np.asarray(correct_mask, dtype=bool), group_sizes), length_baselines)
+    out = [
+        _compute_advantage_1d(
+            r, l, c, mode, beta=beta, gamma=gamma, use_rloo=use_rloo, use_dynamic=use_dynamic, eps=eps, length_baseline=lb
+        )
+        if r.size else r
+        for r, l, c, lb in groups
+    ]
+    return np.concatenate(out) if out else rewards
+
+
+def advantage_keep_mask(
+    advantages: np.ndarray,
+    lengths: np.ndarray,
+    group_sizes: Optional[Sequence[int]] = None,
+    tol: float = 1e-6,
+) -> Dict[str, Any]:
+    """
+    Which responses / groups carry policy-gradient signal (|advantage| > tol).
+
+    advantages, lengths : (B, G), flat (N,) with ragged group_sizes, or (G,) for one group.
+    Returns flat (row-major) arrays and token accounting:
+      keep_mask        bool (N,) responses with |A| > tol
+      keep_indices     flat indices of kept responses (compact the batch with x[keep_indices])
+      keep_groups      indices of groups with at least one kept response
+      tokens_total / tokens_kept / tokens_saved, responses_dropped, groups_dropped
+    """
+    adv = np.asarray(advantages, dtype=np.float64)
+    lens = np.asarray(lengths, dtype=np.float64).ravel()
+    if group_sizes is None:
+        group_sizes = [adv.shape[1]] * adv.shape[0] if adv.ndim == 2 else [adv.size]
+    keep = np.abs(adv.ravel()) > tol
+    group_of = np.repeat(np.arange(len(group_sizes)), group_sizes)
+    kept_per_group = np.bincount(group_of, weights=keep.astype(np.float64), minlength=len(group_sizes))
+    keep_groups = np.flatnonzero(kept_per_group > 0)
+    tokens_total = float(lens.sum())
+    tokens_kept = float(lens[keep].sum())
+    return {
+        "keep_mask": keep,
+        "keep_indices": np.flatnonzero(keep),
+        "keep_groups": keep_groups,
+        "tokens_total": tokens_total,
+        "tokens_kept": tokens_kept,
+        "tokens_saved": tokens_total - tokens_kept,
+        "responses_dropped": int(keep.size - keep.sum()),
+        "groups_dropped": int(len(group_sizes) - keep_groups.size),
+    }
+
+
+def _count_compaction(info: Dict[str, Any]) -> None:
+    count("hook.responses_dropped", info["responses_dropped"])
+    count("hook.tokens_saved", info["tokens_saved"])
+
+
+def compute_batch_advantage(
+    rewards: np.ndarray,
+    lengths: np.ndarray,
+    correct_mask: Optional[np.ndarray] = None,
+    *,
+    adv_mode: AdvMode = "vanilla",
+    beta: float = 0.2,
+    gamma: float = 1e-3,
+    use_rloo: bool = False,
+    use_dynamic: bool = True,
+    group_size: Optional[int] = None,
+    group_sizes: Optional[Sequence[int]] = None,
+    observer: Optional[Any] = None,
+    data_sources: Optional[Any] = None,
+    compact: bool = False,
+    compact_tol: float = 1e-6,
+    length_store: Optional[Any] = None,
+    prompt_ids: Optional[Any] = None,
+    whitener: Optional[Any] = None,
+    diagnostics: Optional[Any] = None,
+) -> Union[np.ndarray, Tuple[np.ndarray, Dict[str, Any]]]:
+    """
+    Framework-independent body of the verl / slime hooks, after they have read their batch keys.
+
+    rewards, lengths, correct_mask: (N,) flat or (B, G) arrays (correct_mask None = inferred).
+    data_sources: per response or per group, passed to observer.observe.
+    prompt_ids: per response or per group, keys of length_store (required with length_store).
+    See dca.verl_integration.compute_advantage_for_verl for the remaining parameters.
+    diagnostics is only filled by the DCA-GRPO pass (adv_mode="dca", use_rloo=False, no
+    group_sizes); with any other setting it raises ValueError instead of being left empty.
+    """
+    if diagnostics is not None and (adv_mode != "dca" or use_rloo or group_sizes is not None):
+        raise ValueError(
+            "diagnostics requires adv_mode='dca' with use_rloo=False and fixed groups (group_size), "
+            "got adv_mode={!r}, use_rloo={}, group_sizes={}".format(
+                adv_mode, use_rloo, "ragged" if group_sizes is not None else None)
+        )
+    rewards = np.asarray(rewards, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.float64)
+    if correct_mask is not None:
+        correct_mask = np.asarray(correct_mask, dtype=bool)
+    count("hook.batches")
+
+    if group_sizes is not None:
+        if observer is not None:
+            observed_mask = correct_mask if correct_mask is not None else infer_correct_mask(rewards)
+            sources = np.asarray(data_sources).ravel() if data_sources is not None else None
+            if sources is not None and sources.size == len(group_sizes):
+                sources = np.repeat(sources, group_sizes)
+            groups = zip(split_groups(observed_mask, group_sizes), split_groups(lengths, group_sizes),
+                         split_groups(sources, group_sizes) if sources is not None else [None] * len(group_sizes))
+            for c, l, ds in groups:
+                if c.size:
+                    observer.observe(c, l, ds)
+        baselines = None
+        if length_store is not None:
+            prompt_ids = group_prompt_ids(prompt_ids, group_sizes)
+            baselines = length_store.baselines(prompt_ids)
+        adv = compute_advantage_ragged(
+            rewards,
+            lengths,
+            group_sizes,
+            correct_mask=correct_mask,
+            mode=adv_mode,
+            beta=beta,
+            gamma=gamma,
+            use_rloo=use_rloo,
+            use_dynamic=use_dynamic,
+            length_baselines=baselines,
+        )
+        if length_store is not None:
+            stored_mask = correct_mask if correct_mask is not None else infer_correct_mask(rewards)
+            length_store.observe(prompt_ids, split_groups(stored_mask, group_sizes), split_groups(lengths, group_sizes))
+        info = advantage_keep_mask(adv, lengths, group_sizes, tol=compact_tol) if compact else None
+        if compact:
+            _count_compaction(info)
+        if whitener is not None:
+            adv = whitener(adv, lengths)
+        if compact:
+            return adv, info
+        return adv
+
+    flat = rewards.ndim == 1
+    if flat and group_size is not None:
+        B = rewards.size // group_size
+        rewards = rewards.reshape(B, group_size)
+        lengths = lengths.reshape(B, group_size)
+        if correct_mask is not None:
+            correct_mask = correct_mask.reshape(B, group_size)
+
+    if observer is not None:
+        observed_mask = correct_mask if correct_mask is not None else infer_correct_mask(rewards)
+        observer.observe(observed_mask, lengths, data_sources)
+
+    baselines = None
+    if length_store is not None:
+        grouped = rewards.ndim == 2
+        prompt_ids = group_prompt_ids(prompt_ids, [rewards.shape[1]] * rewards.shape[0] if grouped else [rewards.size])
+        baselines = length_store.baselines(prompt_ids) if grouped else length_store.baseline(prompt_ids[0])
+
+    summary = diagnostics if isinstance(diagnostics, dict) else ({} if diagnostics is not None else None)
+    adv = compute_advantage(
+        rewards,
+        lengths,
+        correct_mask=correct_mask,
+        mode=adv_mode,
+        beta=beta,
+        gamma=gamma,
+        use_rloo=use_rloo,
+        use_dynamic=use_dynamic,
+        length_baselines=baselines,
+        diagnostics=summary,
+    )
+    if summary is not None and summary is not diagnostics:
+        diagnostics(summary)
+    if length_store is not None:
+        stored_mask = correct_mask if correct_mask is not None else infer_correct_mask(rewards)
+        length_store.observe(prompt_ids, stored_mask.reshape(len(prompt_ids), -1), lengths.reshape(len(prompt_ids), -1))
+
+    if compact:
+        info = advantage_keep_mask(adv, lengths, tol=compact_tol)
+        _count_compaction(info)
+    if whitener is not None:
+        adv = whitener(adv, lengths)
+    if flat and group_size is not None:
+        adv = adv.ravel()
+    if compact:
+        return adv, info
+    return adv
+
+
 def _compute_advantage_1d(
     rewards: np.ndarray,
     lengths: np.ndarray,
@@ -114,6 +398,7 @@ def _compute_advantage_1d(
     use_rloo: bool,
     use_dynamic: bool,
     eps: float,
+    length_baseline: Optional[Any] = None,
 ) -> np.ndarray:
     G = rewards.shape[0]
     correct_mask = np.asarray(correct_mask, dtype=bool).reshape(-1)[:G]
@@ -133,7 +418,9 @@ def _compute_advantage_1d(
 
     if mode in ("dca", "dca_rloo"):
         if use_rloo or mode == "dca_rloo":
-            return advantage_dca_rloo(correct_mask, lengths, beta=beta, eps=eps, use_dynamic=use_dynamic)
-        return advantage_dca_grpo(correct_mask, lengths, beta=beta, eps=eps, use_dynamic=use_dynamic)
+            return advantage_dca_rloo(
+                correct_mask, lengths, beta=beta, eps=eps, use_dynamic=use_dynamic, length_baseline=length_baseline
+            )
+        return advantage_dca_grpo(correct_mask, lengths, beta=beta, eps=eps, use_dynamic=use_dynamic, length_baseline=length_baseline)
 
     raise ValueError("mode must be one of: vanilla, grpo_lp, dca, dca_rloo")
@@ -10,6 +10,11 @@ Use this in your VERL reward function so that:
 import numpy as np
 from typing import Optional
 
+try:
+    from ..profiling import count, timed
+except ImportError:
+    from dca.profiling import count, timed
+
 
 def reward_vanilla(correct: np.ndarray) -> np.ndarray:
     """Binary reward for vanilla GRPO: 1 if correct else 0."""
@@ -27,6 +32,7 @@ def reward_coupled_lp(
     return np.where(correct, 1.0 - gamma * lengths, 0.0)
 
 
+@timed("reward_for_verl")
 def reward_for_verl(
     correct: np.ndarray,
     lengths: np.ndarray,
@@ -39,6 +45,7 @@ def reward_for_verl(
     mode: "vanilla" or "dca" -> return 0/1 (length handled in advantage).
           "grpo_lp"         -> return (1 - gamma*length) if correct else 0.
     """
+    count("reward.responses", np.size(correct))
     if mode in ("vanilla", "dca", "dca_rloo"):
         return reward_vanilla(correct)
     if mode == "grpo_lp":
@@ -0,0 +1,87 @@
+"""
+Token-level expansion of per-response advantages.
+
+verl and slime apply one advantage to every token of a response. Broadcasting into a padded
+(N, max_len) tensor costs N * max_len elements, mostly padding when max_len is 16k and most
+responses are short. The packed layout stores only real tokens, the varlen / flash-attention
+convention:
+
+  packed, cu = expand_packed(advantages, response_lengths)
+  packed[cu[i]:cu[i + 1]]     # the tokens of response i; packed.size == sum(lengths)
+
+expand_padded is the fallback for trainers that need the (N, max_len) layout.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def _as_lengths(lengths: np.ndarray) -> np.ndarray:
+    lengths = np.asarray(lengths)
+    out = lengths.astype(np.int64).ravel()
+    if out.size and (out.min() < 0 or not np.array_equal(out, lengths.ravel())):
+        raise ValueError("lengths must be non-negative integers")
+    return out
+
+
+def cu_seqlens(lengths: np.ndarray) -> np.ndarray:
+    """(N + 1,) int64 offsets: response i occupies [cu[i], cu[i + 1]) of the packed array."""
+    lengths = _as_lengths(lengths)
+    cu = np.zeros(lengths.size + 1, dtype=np.int64)
+    np.cumsum(lengths, out=cu[1:])
+    return cu
+
+
+def expand_packed(
+    advantages: np.ndarray, lengths: np.ndarray, dtype: np.dtype = np.float32
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (packed, cu_seqlens): each response's advantage repeated over its tokens in one 1-D array
+    of exactly sum(lengths) elements. advantages and lengths are per response, flat or (B, G)
+    (row-major order).
+    """
+    adv = np.asarray(advantages).ravel()
+    lengths = _as_lengths(lengths)
+    if adv.size != lengths.size:
+        raise ValueError("got {} advantages for {} lengths".format(adv.size, lengths.size))
+    return np.repeat(adv.astype(dtype, copy=False), lengths), cu_seqlens(lengths)
+
+
+def expand_padded(
+    advantages: np.ndarray,
+    lengths: np.ndarray,
+    max_len: Optional[int] = None,
+    dtype: np.dtype = np.float32,
+    pad_value: float = 0.0,
+) -> np.ndarray:
+    """
+    (N, max_len) advantages, right-padded with pad_value; responses longer than max_len are
+    truncated. max_len defaults to the longest response.
+    """
+    adv = np.asarray(advantages).ravel()
+    lengths = _as_lengths(lengths)
+    if adv.size != lengths.size:
+        raise ValueError("got {} advantages for {} lengths".format(adv.size, lengths.size))
+    if max_len is None:
+        max_len = int(lengths.max()) if lengths.size else 0
+    out = np.full((adv.size, max_len), pad_value, dtype=dtype)
+    mask = np.arange(max_len) < lengths[:, None]
+    out[mask] = np.repeat(adv.astype(dtype, copy=False), np.minimum(lengths, max_len))
+    return out
+
+
+def packed_to_padded(
+    packed: np.ndarray, cu: np.ndarray, max_len: Optional[int] = None, pad_value: float = 0.0
+) -> np.ndarray:
+    """(N, max_len) view of any packed per-token array (e.g. log-probs) with its cu_seqlens."""
+    lengths = np.diff(cu)
+    if max_len is None:
+        max_len = int(lengths.max()) if lengths.size else 0
+    out = np.full((lengths.size, max_len), pad_value, dtype=packed.dtype)
+    mask = np.arange(max_len) < lengths[:, None]
+    if lengths.size and lengths.max() > max_len:
+        position = np.arange(packed.size) - np.repeat(cu[:-1], lengths)
+        packed = packed[position < max_len]
+    out[mask] = packed
+    return out
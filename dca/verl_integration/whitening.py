@@ -0,0 +1,111 @@
+"""
+Global-batch advantage whitening from mergeable per-shard statistics.
+
+Some runs normalize advantages across the whole global batch after the per-group DCA
+computation, but each rank only holds its micro-batches. Instead of gathering every
+advantage, each shard reduces its advantages to (count, mean, M2) (dca.streaming.RunningStats,
+Welford / Chan merge), the shards exchange those three numbers, every shard merges them in
+the same order and normalizes its own advantages in place:
+
+  whitener = GlobalWhitener(gather_fn=all_gather_3)   # (3,) local stats -> (world, 3)
+  advantages = compute_advantage_for_verl(batch, adv_mode="dca", group_size=8, whitener=whitener)
+
+With token_level=True each response counts once per token (weights = response lengths),
+matching whitening over the token-level advantages without expanding them.
+"""
+
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    from ..streaming import RunningStats
+except ImportError:
+    from dca.streaming import RunningStats
+
+
+def shard_stats(advantages: np.ndarray, weights: Optional[np.ndarray] = None) -> RunningStats:
+    """RunningStats of one shard's advantages; weights (e.g. token counts) repeat each value."""
+    x = np.asarray(advantages, dtype=np.float64).ravel()
+    if weights is None:
+        return RunningStats().update(x)
+    w = np.asarray(weights, dtype=np.float64).ravel()
+    if w.size != x.size:
+        raise ValueError("got {} weights for {} advantages".format(w.size, x.size))
+    total = w.sum()
+    if total <= 0:
+        return RunningStats()
+    mean = float(np.dot(w, x) / total)
+    kept = x[w > 0]
+    return RunningStats(int(round(total)), mean, float(np.dot(w, (x - mean) ** 2)), float(kept.min()), float(kept.max()))
+
+
+def stats_to_array(stats: RunningStats) -> np.ndarray:
+    """(count, mean, M2) as a float64 (3,) array, the payload exchanged between shards."""
+    return np.array([stats.count, stats.mean, stats.m2], dtype=np.float64)
+
+
+def merge_stats(rows: Iterable[np.ndarray]) -> RunningStats:
+    """Chan merge of (count, mean, M2) rows, in order (identical on every shard)."""
+    merged = RunningStats()
+    for count, mean, m2 in np.asarray(list(rows), dtype=np.float64).reshape(-1, 3):
+        merged.merge(RunningStats(int(count), mean, m2))
+    return merged
+
+
+def whiten_(advantages: np.ndarray, stats: RunningStats, eps: float = 1e-8, shift_mean: bool = True) -> np.ndarray:
+    """Normalize a float ndarray in place with merged stats: (A - mean) / (std + eps), or A / (std + eps)."""
+    if shift_mean:
+        advantages -= stats.mean
+    advantages /= stats.std + eps
+    return advantages
+
+
+class GlobalWhitener:
+    """
+    Whitens each shard's advantages with statistics merged over all shards.
+
+    gather_fn : local (3,) stats -> (num_shards, 3) stats of every shard, in shard order (an
+        all_gather). None = single shard.
+    shift_mean : subtract the global mean (False only rescales, so zero advantages stay zero).
+    token_level : weight each response by its length.
+    """
+
+    def __init__(
+        self,
+        gather_fn: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        eps: float = 1e-8,
+        shift_mean: bool = True,
+        token_level: bool = False,
+    ):
+        self.gather_fn = gather_fn
+        self.eps = eps
+        self.shift_mean = shift_mean
+        self.token_level = token_level
+        self.last_stats: Optional[RunningStats] = None
+
+    def merged_stats(self, micro_batches: List[np.ndarray], lengths: Optional[List[np.ndarray]] = None) -> RunningStats:
+        """Local stats of this shard's micro-batches, exchanged via gather_fn and merged."""
+        local = RunningStats()
+        for i, adv in enumerate(micro_batches):
+            local.merge(shard_stats(adv, lengths[i] if self.token_level and lengths is not None else None))
+        payload = stats_to_array(local)
+        rows = self.gather_fn(payload) if self.gather_fn is not None else payload[None, :]
+        self.last_stats = merge_stats(rows)
+        return self.last_stats
+
+    def whiten_micro_batches(
+        self, micro_batches: List[np.ndarray], lengths: Optional[List[np.ndarray]] = None
+    ) -> RunningStats:
+        """Whiten every micro-batch of this shard in place (float ndarrays); returns the merged stats."""
+        stats = self.merged_stats(micro_batches, lengths)
+        for adv in micro_batches:
+            whiten_(adv, stats, self.eps, self.shift_mean)
+        return stats
+
+    def __call__(self, advantages: np.ndarray, lengths: Optional[np.ndarray] = None) -> np.ndarray:
+        """Whiten one shard's advantages in place (a float64 copy if not writable float)."""
+        if not (isinstance(advantages, np.ndarray) and advantages.dtype.kind == "f" and advantages.flags.writeable):
+            advantages = np.array(advantages, dtype=np.float64)
+        self.whiten_micro_batches([advantages], None if lengths is None else [np.asarray(lengths)])
+        return advantages
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+CPU benchmark of the advantage code run every training step, with JSON regression baselines.
+
+Cases sweep the function (advantage_dca_grpo, advantage_dca_rloo, compute_advantage in every
+mode, the verl / slime hooks), batch size B, group size G, the pass-rate regime of the
+synthetic groups and the input dtype. compute_advantage:dca+diagnostics is the "dca" case
+with diagnostics=dict: its ratio to compute_advantage:dca is the cost of the summary. Each case reports the best and median time over
+--repeat runs and responses per second. Cases whose estimated cost exceeds --max_cost are
+skipped (e.g. the O(G^2) Python loop of RLOO at large B x G).
+
+Usage:
+  python scripts/benchmark_advantage.py                           # quick sweep, print table
+  python scripts/benchmark_advantage.py --full                    # B in 1..16384, G in 2..256
+  python scripts/benchmark_advantage.py --save benchmarks/baseline_cpu.json
+  python scripts/benchmark_advantage.py --save benchmarks/baseline_cpu.json --merge   # add a run
+  python scripts/benchmark_advantage.py --compare benchmarks/baseline_cpu.json --threshold 0.25
+  python scripts/benchmark_advantage.py --filter compute_advantage:dca --json out.json
+
+--compare matches cases common to both runs by median time and exits with status 1 if any
+is slower than the baseline by more than --threshold plus the run-to-run spread
+(median / best - 1) of either run, so it can gate CI. Cases whose baseline median is under
+--min_runtime, or that are slower by less than --abs_floor seconds, are reported but never
+gated: at tens of microseconds, scheduler noise alone moves them by 2x. Flagged cases are
+timed again, each in a fresh process, up to --confirm times and only count if every
+rerun still regresses. Baselines are machine specific: save one per machine / runner type,
+merging a few runs (--merge) so the spread covers process-to-process variation.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from dca.advantage import advantage_dca_grpo, advantage_dca_rloo
+from dca.slime_integration import compute_advantage_for_slime
+from dca.verl_integration import compute_advantage, compute_advantage_for_verl
+
+QUICK = {"B": [1, 64, 1024], "G": [2, 8, 64], "regime": ["mixed", "degenerate"], "dtype": ["float64"]}
+FULL = {
+    "B": [1, 16, 256, 1024, 4096, 16384],
+    "G": [2, 4, 8, 16, 64, 256],
+    "regime": ["hard", "mixed", "easy", "degenerate"],
+    "dtype": ["float64", "float32"],
+}
+# pass probability per group: hard / mixed / easy; degenerate = half all-wrong, half all-correct
+REGIMES = {"hard": (0.0, 0.15), "mixed": (0.3, 0.7), "easy": (0.85, 1.0)}
+
+
+def make_batch(B: int, G: int, regime: str, dtype: str, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """(rewards, lengths) of shape (B, G): 0/1 rewards at the regime's pass rates, lengths 50..8000."""
+    rng = np.random.default_rng(seed)
+    if regime == "degenerate":
+        correct = np.repeat(rng.random((B, 1)) < 0.5, G, axis=1)
+    else:
+        lo, hi = REGIMES[regime]
+        correct = rng.random((B, G)) < rng.uniform(lo, hi, (B, 1))
+    lengths = rng.integers(50, 8000, (B, G))
+    return correct.astype(dtype), lengths.astype(dtype)
+
+
+def cases(grid: Dict[str, List[Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """(function name, params) of every case of the sweep."""
+    out = []
+    for G, regime, dtype in itertools.product(grid["G"], grid["regime"], grid["dtype"]):
+        # per-group kernels: one group of G
+        for fn in ("advantage_dca_grpo", "advantage_dca_rloo"):
+            out.append((fn, {"B": 1, "G": G, "regime": regime, "dtype": dtype}))
+        for B in grid["B"]:
+            params = {"B": B, "G": G, "regime": regime, "dtype": dtype}
+            for mode in ("vanilla", "grpo_lp", "dca", "dca+diagnostics", "dca_rloo"):
+                out.append(("compute_advantage:" + mode, params))
+            out.append(("verl_hook:dca", params))
+            out.append(("slime_hook:dca", params))
+    return out
+
+
+def estimated_cost(name: str, p: Dict[str, Any]) -> float:
+    """Rough Python-level operation count, used to skip cases that would take minutes."""
+    B, G = p["B"], p["G"]
+    if name == "advantage_dca_rloo" or name.endswith("dca_rloo"):
+        return B * G * G
+    if name.endswith((":dca", ":dca+diagnostics")):
+        return B * G / 64.0  # one vectorized pass
+    return B * 50.0 + B * G / 64.0  # per-group loop
+
+
+def make_call(name: str, p: Dict[str, Any]) -> Callable[[], Any]:
+    rewards, lengths = make_batch(p["B"], p["G"], p["regime"], p["dtype"])
+    if name == "advantage_dca_grpo":
+        mask = rewards[0] > 0.5
+        return lambda: advantage_dca_grpo(mask, lengths[0], beta=0.2)
+    if name == "advantage_dca_rloo":
+        mask = rewards[0] > 0.5
+        return lambda: advantage_dca_rloo(mask, lengths[0], beta=0.2)
+    fn, mode = name.split(":")
+    if mode == "dca+diagnostics":
+        return lambda: compute_advantage(rewards, lengths, mode="dca", beta=0.2, diagnostics={})
+    if fn == "compute_advantage":
+        return lambda: compute_advantage(rewards, lengths, mode=mode, beta=0.2)
+    batch = {"rewards": rewards.ravel(), "response_lengths": lengths.ravel()}
+    hook = compute_advantage_for_verl if fn == "verl_hook" else compute_advantage_for_slime
+    return lambda: hook(batch, adv_mode=mode, group_size=p["G"])
+
+
+def time_call(call: Callable[[], Any], repeat: int, min_time: float) -> Tuple[float, float]:
+    """(best, median) seconds per call; each repeat loops until min_time has passed."""
+    call()  # warm-up
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    runs = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            call()
+        runs.append((time.perf_counter() - t0) / number)
+    return min(runs), float(np.median(runs))
+
+
+def case_key(name: str, p: Dict[str, Any]) -> str:
+    return "{}|B={}|G={}|{}|{}".format(name, p["B"], p["G"], p["regime"], p["dtype"])
+
+
+def run(grid: Dict[str, List[Any]], repeat: int, min_time: float, max_cost: float, pattern: Optional[str]) -> Dict[str, Any]:
+    results = {}
+    skipped = []
+    for name, p in cases(grid):
+        key = case_key(name, p)
+        if key in results or (pattern and pattern not in key):
+            continue
+        if estimated_cost(name, p) > max_cost:
+            skipped.append(key)
+            continue
+        best, median = time_call(make_call(name, p), repeat, min_time)
+        results[key] = {
+            "best_s": best,
+            "median_s": median,
+            "responses_per_s": p["B"] * p["G"] / best if best > 0 else None,
+        }
+        print("{:<62} {:>12.1f} us {:>14,.0f} resp/s".format(key, 1e6 * best, results[key]["responses_per_s"] or 0))
+        sys.stdout.flush()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "min_time": min_time,
+            "runs": 1,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def retime(report: Dict[str, Any], keys: List[str], full: bool, repeat: int, min_time: float) -> None:
+    """
+    Time the given cases again, each in a fresh interpreter (a long sweep leaves a bigger heap
+    and colder caches behind it); a case keeps the run with the lower median.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "retime.json"
+        for key in keys:
+            cmd = [sys.executable, str(Path(__file__).resolve()), "--filter", key, "--json", str(out),
+                   "--repeat", str(repeat), "--min_time", str(min_time), "--max_cost", "inf"]
+            subprocess.run(cmd + (["--full"] if full else []), check=True, stdout=subprocess.DEVNULL)
+            with open(out) as f:
+                new = json.load(f)["results"][key]
+            if new["median_s"] < report["results"][key]["median_s"]:
+                report["results"][key] = new
+
+
+def spread(result: Dict[str, Any]) -> float:
+    """Relative run-to-run noise of one case: median / best - 1."""
+    return result["median_s"] / result["best_s"] - 1.0 if result["best_s"] > 0 else 0.0
+
+
+def merge(baseline: Dict[str, Any], report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fold another run into a baseline: per case the lowest best and the highest median, so the
+    baseline's spread also covers run-to-run (process-to-process) variation.
+    """
+    out = json.loads(json.dumps(baseline))
+    out["meta"]["runs"] = out["meta"].get("runs", 1) + report["meta"].get("runs", 1)
+    for key, cur in report["results"].items():
+        base = out["results"].setdefault(key, dict(cur))
+        base["best_s"] = min(base["best_s"], cur["best_s"])
+        base["median_s"] = max(base["median_s"], cur["median_s"])
+        base["responses_per_s"] = max(base["responses_per_s"] or 0, cur["responses_per_s"] or 0) or None
+    return out
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_runtime: float = 0.0,
+    abs_floor: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    Cases in both runs, sorted slowest first: ratio = current median / baseline median.
+
+    tolerance = threshold + the larger spread of the two runs. A case is gated when its
+    baseline median is at least min_runtime, and a regression when it is gated, its ratio
+    exceeds 1 + tolerance and it got slower by more than abs_floor seconds.
+    """
+    rows = []
+    for key, cur in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] > 0 else float("inf")
+        tolerance = threshold + max(spread(base), spread(cur))
+        gated = base["median_s"] >= min_runtime
+        slower = cur["median_s"] - base["median_s"]
+        rows.append({"case": key, "baseline_s": base["median_s"], "current_s": cur["median_s"], "ratio": ratio,
+                     "tolerance": tolerance, "gated": gated,
+                     "regression": gated and ratio > 1.0 + tolerance and slower > abs_floor})
+    return sorted(rows, key=lambda r: -r["ratio"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU benchmark of advantage kernels and hooks")
+    parser.add_argument("--full", action="store_true", help="Full sweep (B up to 16384, G up to 256, all regimes / dtypes)")
+    parser.add_argument("--filter", default=None, help="Only cases whose key contains this substring")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repeats per case (best and median reported)")
+    parser.add_argument("--min_time", type=float, default=0.02, help="Seconds per repeat (calls are looped)")
+    parser.add_argument("--max_cost", type=float, default=2e7, help="Skip cases above this estimated operation count")
+    parser.add_argument("--json", default=None, help="Write this run's results JSON here")
+    parser.add_argument("--save", default=None, help="Save this run as a baseline JSON")
+    parser.add_argument("--merge", action="store_true", help="With --save: fold this run into the existing baseline")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown (beyond run-to-run spread) counted as a regression")
+    parser.add_argument("--min_runtime", type=float, default=1e-4, help="Only gate cases whose baseline median is at least this (s)")
+    parser.add_argument("--confirm", type=int, default=3, help="Reruns of flagged cases before they count as regressions")
+    parser.add_argument("--abs_floor", type=float, default=2e-5, help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    grid = FULL if args.full else QUICK
+    report = run(grid, args.repeat, args.min_time, args.max_cost, args.filter)
+    if report["skipped"]:
+        print("Skipped {} cases above --max_cost".format(len(report["skipped"])))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for _ in range(args.confirm):
+            flagged = [r["case"] for r in compare(report, baseline, args.threshold, args.min_runtime, args.abs_floor)
+                       if r["regression"]]
+            if not flagged:
+                break
+            print("Re-timing {} flagged case(s)".format(len(flagged)))
+            retime(report, flagged, args.full, args.repeat, args.min_time)
+    for path in (args.json, args.save):
+        if path:
+            out = report
+            if path == args.save and args.merge and Path(path).exists():
+                with open(path) as f:
+                    out = merge(json.load(f), report)
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(out, f, indent=2, sort_keys=True)
+            print("Wrote", path)
+    if baseline is not None:
+        rows = compare(report, baseline, args.threshold, args.min_runtime, args.abs_floor)
+        regressions = [r for r in rows if r["regression"]]
+        gated = [r for r in rows if r["gated"]]
+        print("\nCompared {} cases with {} (threshold +{:.0%} + spread; {} gated, {} under {:.0f} us not gated):".format(
+            len(rows), args.compare, args.threshold, len(gated), len(rows) - len(gated), 1e6 * args.min_runtime))
+        for r in gated[:10]:
+            print("  {:<62} x{:.2f} (tol +{:.0%}){}".format(
+                r["case"], r["ratio"], r["tolerance"], "  REGRESSION" if r["regression"] else ""))
+        if regressions:
+            print("{} regression(s)".format(len(regressions)))
+            return 1
+        print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark of the evaluation pipeline on a synthetic workload.
+
+Generates a results file with demo_inference.py (or reuses --results), then runs
+scripts/evaluate.py on it in a child process with --profile. Reports wall time, problems
+and rollouts per second, the child's peak RSS (from wait4, so the generator does not count)
+and the evaluator's per-stage breakdown. Optionally also times the --cost_report pass.
+
+Usage:
+  python scripts/benchmark_evaluate.py                                   # 10k problems x 16 rollouts
+  python scripts/benchmark_evaluate.py --num_problems 1000000 --compress .gz --keep bench_results.jsonl.gz
+  python scripts/benchmark_evaluate.py --results existing.jsonl --k 8 --json bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from dca.io import iter_jsonl
+
+
+def run_child(cmd: List[str]) -> Dict[str, Any]:
+    """Run cmd; wall seconds, stdout and peak RSS in MiB of that child alone (os.wait4)."""
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=out, stderr=err)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - t0
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        if proc.returncode != 0:
+            raise RuntimeError("{} failed:\n{}".format(" ".join(cmd), err.read().decode(errors="replace")))
+        stdout = out.read().decode(errors="replace")
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak_mib = usage.ru_maxrss / (1 << 20) if sys.platform == "darwin" else usage.ru_maxrss / 1024.0
+    return {"wall_s": wall, "peak_rss_mib": peak_mib, "stdout": stdout}
+
+
+def count_rows(path: str) -> Dict[str, int]:
+    problems = rollouts = 0
+    for row in iter_jsonl(path):
+        problems += 1
+        preds = row.get("predictions", [])
+        rollouts += 1 if isinstance(preds, str) else len(preds)
+    return {"problems": problems, "rollouts": rollouts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end evaluation throughput benchmark")
+    parser.add_argument("--results", default=None, help="Existing results file (skip generation)")
+    parser.add_argument("--num_problems", type=int, default=10000)
+    parser.add_argument("--k_rollouts", type=int, default=16)
+    parser.add_argument("--body", default="mixed", choices=("none", "boxed", "gsm8k", "mixed"))
+    parser.add_argument("--max_len", type=int, default=2048)
+    parser.add_argument("--compress", default="", choices=("", ".gz", ".zst"), help="Compress the generated file")
+    parser.add_argument("--keep", default=None, help="Keep the generated file at this path")
+    parser.add_argument("--k", type=int, default=None, help="pass@k for evaluate.py (default: k_rollouts)")
+    parser.add_argument("--cost_report", action="store_true", help="Also time evaluate.py --cost_report")
+    parser.add_argument("--json", default=None, help="Write the benchmark report JSON here")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"meta": {"python": platform.python_version(), "platform": platform.platform()}}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.results
+        if path is None:
+            path = args.keep or os.path.join(tmp, "results.jsonl" + args.compress)
+            gen = run_child([
+                sys.executable, str(REPO / "scripts" / "demo_inference.py"), "--num_problems", str(args.num_problems),
+                "--k_rollouts", str(args.k_rollouts), "--body", args.body, "--length_dist", "lognormal",
+                "--dataset_spec", "gsm8k:pass=0.8,len=300", "--dataset_spec", "math:pass=0.4,len=900,sigma=0.7",
+                "--pass_concentration", "2", "--max_len", str(args.max_len), "--seed", str(args.seed), "--output", path,
+            ])
+            report["generate"] = {"wall_s": gen["wall_s"], "peak_rss_mib": gen["peak_rss_mib"]}
+            print("generated {} in {:.1f}s ({:.1f} MiB on disk)".format(
+                path, gen["wall_s"], os.path.getsize(path) / (1 << 20)))
+        sizes = count_rows(path)
+        report.update(sizes, file_mib=os.path.getsize(path) / (1 << 20))
+
+        k = args.k or max(1, sizes["rollouts"] // max(sizes["problems"], 1))
+        profile_path = os.path.join(tmp, "profile.json")
+        ev = run_child([sys.executable, str(REPO / "scripts" / "evaluate.py"), "--results", path, "--k", str(k),
+                        "--profile", profile_path])
+        with open(profile_path) as f:
+            stages = json.load(f)["stages"]
+        report["evaluate"] = {
+            "wall_s": ev["wall_s"],
+            "peak_rss_mib": ev["peak_rss_mib"],
+            "problems_per_s": sizes["problems"] / ev["wall_s"],
+            "rollouts_per_s": sizes["rollouts"] / ev["wall_s"],
+            "stages_s": {name: s["total_s"] for name, s in stages.items()},
+        }
+        if args.cost_report:
+            cr = run_child([sys.executable, str(REPO / "scripts" / "evaluate.py"), "--results", path,
+                            "--cost_report", "--max_tokens", str(args.max_len)])
+            report["cost_report"] = {"wall_s": cr["wall_s"], "rollouts_per_s": sizes["rollouts"] / cr["wall_s"]}
+
+    e = report["evaluate"]
+    print("{problems} problems / {rollouts} rollouts ({mib:.1f} MiB)".format(mib=report["file_mib"], **sizes))
+    print("evaluate: {:.2f}s  {:,.0f} problems/s  {:,.0f} rollouts/s  peak RSS {:.0f} MiB".format(
+        e["wall_s"], e["problems_per_s"], e["rollouts_per_s"], e["peak_rss_mib"]))
+    for name, total in sorted(e["stages_s"].items(), key=lambda kv: -kv[1]):
+        print("  {:<24} {:>8.3f}s".format(name, total))
+    if "cost_report" in report:
+        print("cost_report: {:.2f}s  {:,.0f} rollouts/s".format(report["cost_report"]["wall_s"],
+                                                               report["cost_report"]["rollouts_per_s"]))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
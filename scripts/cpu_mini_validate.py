@@ -7,9 +7,14 @@ response length ~ Poisson(λ)) and simulated correctness P(correct|length)
 with an optimal length band. Compares training with DCA vs coupled length
 penalty; expects DCA to reduce length without collapsing accuracy.
 
+--sweep runs a grid of beta / gamma / G / use_dynamic with many seeds per config as one
+vectorized population of toy policies (dca.toy_sim), and prints one row per config.
+
 Usage:
   python scripts/cpu_mini_validate.py
   (runs in ~5–15 seconds on CPU)
+  python scripts/cpu_mini_validate.py --sweep --betas 0.05,0.2,1.0 --gammas 1e-4,1e-3 \
+      --group_sizes 4,16 --seeds 256 --json sweep.json
 """
 
 import sys
@@ -20,18 +25,8 @@ REPO = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(REPO))
 
 from dca.advantage import advantage_dca_grpo, advantage_vanilla_grpo, rewards_coupled_lp
-
-
-# --- Toy world: optimal length band (too short => incomplete, wrong) ---
-L_OPT = 80.0
-SCALE = 600.0
-BASE_CORRECT = 0.2
-
-
-def p_correct_given_length(L: np.ndarray) -> np.ndarray:
-    """P(correct | length). Peak near L_OPT; too short => low acc, too long => wasteful."""
-    L = np.asarray(L, dtype=float)
-    return BASE_CORRECT + 0.75 * np.exp(-((L - L_OPT) ** 2) / SCALE)
+from dca.profiling import add_profile_argument, setup_profiling, timer
+from dca.toy_sim import p_correct_given_length, sweep
 
 
 def sample_rollouts(lam: float, G: int, rng: np.random.Generator) -> tuple:
@@ -86,12 +81,57 @@ def run_trial(
     return lam_hist, acc_hist
 
 
+def run_sweep(args) -> int:
+    """--sweep: one row per config, seed mean ± std of final λ and tail accuracy."""
+    import json
+
+    def floats(text):
+        return [float(v) for v in text.split(",") if v.strip()]
+
+    with timer("cpu_mini_validate.sweep"):
+        rows = sweep(
+            betas=floats(args.betas),
+            gammas=floats(args.gammas),
+            group_sizes=[int(v) for v in floats(args.group_sizes)],
+            use_dynamic=[v.strip().lower() in ("1", "true", "yes") for v in args.dynamic.split(",") if v.strip()],
+            seeds=args.seeds,
+            n_steps=args.n_steps,
+            lr=args.lr,
+            seed=args.seed,
+        )
+    print("  method |  G | config              | final λ (mean ± std) | acc (last 20) | length")
+    for r in rows:
+        config = "beta={:<6g} ddca={:<5}".format(r["beta"], str(r["use_dynamic"])) if r["method"] == "dca" \
+            else "gamma={:<13g}".format(r["gamma"])
+        print("  {:<6} | {:>2} | {:<19} | {:8.1f} ± {:<9.1f} | {:.3f} ± {:.3f} | {:6.1f}".format(
+            r["method"], r["group_size"], config, r["lam_mean"], r["lam_std"], r["acc_mean"], r["acc_std"],
+            r["length_mean"]))
+    print("\n  {} configs x {} seeds, {} steps".format(len(rows), args.seeds, args.n_steps))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+        print("  Wrote", args.json)
+    return 0
+
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description="CPU-only minimal DCA validation")
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--n_steps", type=int, default=100)
+    parser.add_argument("--sweep", action="store_true", help="Sweep the grid below with a vectorized population")
+    parser.add_argument("--betas", default="0.05,0.1,0.2,0.5,1.0", help="Comma-separated DCA beta values")
+    parser.add_argument("--gammas", default="0.0001,0.001,0.003", help="Comma-separated coupled-LP gamma values")
+    parser.add_argument("--group_sizes", default="4,8,16", help="Comma-separated group sizes G")
+    parser.add_argument("--dynamic", default="true,false", help="use_dynamic values for DCA (true / false)")
+    parser.add_argument("--seeds", type=int, default=64, help="Independent policies per config")
+    parser.add_argument("--lr", type=float, default=2.0)
+    parser.add_argument("--json", default=None, help="With --sweep: write the rows as JSON here")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    setup_profiling(args.profile)
+    if args.sweep:
+        return run_sweep(args)
     seed = args.seed
     n_steps = args.n_steps
 
@@ -105,8 +145,10 @@ def main():
     print("  Compare: λ updated with DCA vs coupled length penalty")
     print("  seed={}, n_steps={}\n".format(seed, n_steps))
 
-    lam_dca, acc_dca = run_trial(True, n_steps, G, beta, gamma, lr, seed)
-    lam_lp, acc_lp = run_trial(False, n_steps, G, beta, gamma, lr, seed + 1)
+    with timer("cpu_mini_validate.trial_dca"):
+        lam_dca, acc_dca = run_trial(True, n_steps, G, beta, gamma, lr, seed)
+    with timer("cpu_mini_validate.trial_lp"):
+        lam_lp, acc_lp = run_trial(False, n_steps, G, beta, gamma, lr, seed + 1)
 
     print("  Method        | final λ | final acc (last 20) | λ trend")
     print("  --------------|--------|----------------------|--------")
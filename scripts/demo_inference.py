@@ -1,78 +1,198 @@
 #!/usr/bin/env python3
 """
-Demo inference: from val.jsonl produce a synthetic results.jsonl for evaluate.py.
+Demo inference: produce a synthetic results.jsonl for evaluate.py (and evaluator benchmarks).
 
 Used when VERL is not available, so the full pipeline (prepare → train/demo → evaluate)
 can still be run. Simulates model outputs: some correct, some wrong, with synthetic
 token lengths so that pass@1, avg_tokens, etc. are non-trivial.
 
+Problems come from --input (val.jsonl) or are generated (--num_problems, integer answers).
+Correctness and lengths are drawn with NumPy one chunk of problems at a time and rows are
+streamed to the output, so million-row files with many rollouts stay within a chunk of memory.
+
+  - pass rate: --correct_ratio, or per dataset with --dataset_spec; --pass_concentration c > 0
+    draws a per-problem rate from Beta(c*r, c*(1-r)) (hard and easy problems) instead of a
+    fixed rate for every rollout
+  - lengths: uniform in [min_len, max_len], or --length_dist lognormal around a per-dataset
+    median (clipped to the same range)
+  - text: --body none (bare answer, default) | boxed | gsm8k | mixed writes a reasoning body of
+    about --chars_per_token characters per token ending in \\boxed{...} or "#### ..."
+
 Usage:
   python scripts/demo_inference.py --input data/processed/val.jsonl --output data/processed/results_demo.jsonl
+  python scripts/demo_inference.py --num_problems 1000000 --k_rollouts 16 --body mixed \
+      --dataset_spec gsm8k:pass=0.8,len=250 --dataset_spec math:pass=0.4,len=900,sigma=0.7 \
+      --pass_concentration 2 --length_dist lognormal --max_len 4096 --output big.jsonl.gz
 """
 
 import argparse
-import json
-import random
+import itertools
 import sys
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
 
 REPO = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(REPO))
 
+from dca.io import iter_jsonl, write_jsonl
+from dca.profiling import add_profile_argument, setup_profiling, timer
+
+FILLER = (
+    "We start from the quantities given in the problem and write down what is asked. "
+    "Let x denote the unknown; substituting the known values gives a linear relation. "
+    "Multiplying both sides and collecting terms, the coefficient simplifies further. "
+    "Checking the intermediate result against the constraints confirms the sign. "
+    "Next we combine the partial sums, carrying the remainder to the following step. "
+)
+BODY_STYLES = ("none", "boxed", "gsm8k", "mixed")
+
+
+def parse_dataset_spec(spec: str) -> Dict[str, Any]:
+    """"math:pass=0.4,len=900,sigma=0.7" -> {"dataset": "math", "pass": 0.4, "len": 900.0, "sigma": 0.7}."""
+    name, _, params = spec.partition(":")
+    out: Dict[str, Any] = {"dataset": name.strip()}
+    for part in filter(None, params.split(",")):
+        key, _, value = part.partition("=")
+        key = key.strip()
+        if key not in ("pass", "len", "sigma"):
+            raise ValueError("Unknown key {!r} in --dataset_spec {!r} (pass, len, sigma)".format(key, spec))
+        out[key] = float(value)
+    return out
+
+
+def integer_answer(answer: Any) -> Optional[int]:
+    try:
+        n = float(str(answer).replace(",", "").strip())
+    except (ValueError, TypeError):
+        return None
+    return int(n) if n == int(n) else None
+
+
+def synthetic_problems(num_problems: int, datasets: List[str], seed: int) -> Iterator[Dict[str, Any]]:
+    rng = np.random.default_rng(seed + 1)
+    for i in range(num_problems):
+        a, b = (int(v) for v in rng.integers(2, 1000, 2))
+        yield {"question": "Problem {}: what is {} * {}?".format(i, a, b), "answer": str(a * b),
+               "dataset": datasets[i % len(datasets)]}
+
+
+class RolloutSimulator:
+    """Vectorized draws of correctness, lengths and prediction texts for a chunk of problems."""
+
+    def __init__(self, args: argparse.Namespace, specs: Dict[str, Dict[str, Any]]):
+        self.args = args
+        self.specs = specs
+        self.rng = np.random.default_rng(args.seed)
+        self.filler = FILLER * (args.max_body_chars // len(FILLER) + 1)
+
+    def _param(self, items: List[Dict[str, Any]], key: str, default: float) -> np.ndarray:
+        return np.array([self.specs.get(item.get("dataset", ""), {}).get(key, default) for item in items])
+
+    def draw(self, items: List[Dict[str, Any]]):
+        """(correct (n, k) bool, lengths (n, k) int, offsets (n, k) of wrong integer answers, boxed (n, k) bool)."""
+        args, rng = self.args, self.rng
+        n, k = len(items), args.k_rollouts
+        rate = np.clip(self._param(items, "pass", args.correct_ratio), 0.0, 1.0)
+        if args.pass_concentration > 0:
+            c = args.pass_concentration
+            inner = (rate > 0) & (rate < 1)
+            beta = rng.beta(np.maximum(c * rate, 1e-3), np.maximum(c * (1 - rate), 1e-3))
+            rate = np.where(inner, beta, rate)
+        correct = rng.random((n, k)) < rate[:, None]
+        if args.length_dist == "lognormal":
+            median = self._param(items, "len", (args.min_len + args.max_len) / 2.0)
+            sigma = self._param(items, "sigma", args.length_sigma)
+            raw = median[:, None] * np.exp(sigma[:, None] * rng.standard_normal((n, k)))
+            lengths = np.clip(np.rint(raw), args.min_len, args.max_len).astype(np.int64)
+        else:
+            lengths = rng.integers(args.min_len, args.max_len + 1, (n, k))
+        offsets = rng.choice(np.array([-1, 1]), (n, k))
+        boxed = rng.random((n, k)) < 0.5 if args.body == "mixed" else np.full((n, k), args.body == "boxed")
+        return correct, lengths, offsets, boxed
+
+    def text(self, final: str, length: int, boxed: bool) -> str:
+        if self.args.body == "none":
+            return final
+        chars = min(int(length * self.args.chars_per_token), self.args.max_body_chars)
+        if boxed:
+            return "{}\nTherefore the answer is \\boxed{{{}}}.".format(self.filler[:chars], final)
+        return "{}\n#### {}".format(self.filler[:chars], final)
+
+    def rows(self, items: List[Dict[str, Any]], start: int) -> Iterator[Dict[str, Any]]:
+        correct, lengths, offsets, boxed = self.draw(items)
+        for i, item in enumerate(items):
+            answer = item.get("answer", "")
+            as_int = integer_answer(answer)
+            preds = []
+            for j in range(self.args.k_rollouts):
+                if correct[i, j]:
+                    final = answer
+                else:
+                    final = str(as_int + int(offsets[i, j])) if as_int is not None else "0"
+                preds.append(self.text(final, int(lengths[i, j]), bool(boxed[i, j])))
+            row = {
+                "index": start + i,
+                "question": item.get("question", ""),
+                "ground_truth": answer,
+                "predictions": preds,
+                "lengths": lengths[i].tolist(),
+            }
+            # Carry stratum fields through so triage subsamples can be evaluated
+            for key in ("dataset", "level", "stratum"):
+                if key in item:
+                    row[key] = item[key]
+            yield row
+
+
+def generate(problems: Iterator[Dict[str, Any]], sim: RolloutSimulator, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    start = 0
+    while True:
+        items = list(itertools.islice(problems, chunk_size))
+        if not items:
+            return
+        with timer("demo.chunk"):
+            rows = list(sim.rows(items, start))
+        yield from rows
+        start += len(items)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Generate demo results from val.jsonl for evaluation")
-    parser.add_argument("--input", required=True, help="Input val.jsonl (question, answer, dataset)")
-    parser.add_argument("--output", required=True, help="Output results JSONL for evaluate.py")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Input val.jsonl (question, answer, dataset); .gz / .zst supported")
+    source.add_argument("--num_problems", type=int, help="Generate this many synthetic problems instead of --input")
+    parser.add_argument("--output", required=True, help="Output results JSONL for evaluate.py (.gz / .zst to compress)")
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--correct_ratio", type=float, default=0.6, help="Fraction of samples to mark correct (demo)")
+    parser.add_argument("--pass_concentration", type=float, default=0.0,
+                        help="If > 0, per-problem pass rate ~ Beta(c*r, c*(1-r)); smaller c = more all-or-nothing problems")
+    parser.add_argument("--dataset_spec", action="append", default=[], metavar="NAME:pass=P,len=L,sigma=S",
+                        help="Per-dataset pass rate / length median / lognormal sigma (repeatable)")
     parser.add_argument("--min_len", type=int, default=50, help="Min synthetic token length")
     parser.add_argument("--max_len", type=int, default=400, help="Max synthetic token length")
+    parser.add_argument("--length_dist", choices=("uniform", "lognormal"), default="uniform")
+    parser.add_argument("--length_sigma", type=float, default=0.5, help="Default lognormal sigma")
     parser.add_argument("--k_rollouts", type=int, default=1, help="Number of rollouts per problem (pass@k)")
+    parser.add_argument("--body", choices=BODY_STYLES, default="none", help="Prediction text style")
+    parser.add_argument("--chars_per_token", type=float, default=4.0, help="Body characters per synthetic token")
+    parser.add_argument("--max_body_chars", type=int, default=16000, help="Cap on body characters per rollout")
+    parser.add_argument("--chunk_size", type=int, default=4096, help="Problems drawn per vectorized chunk")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    setup_profiling(args.profile)
 
-    random.seed(args.seed)
-    data = []
-    with open(args.input) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            data.append(json.loads(line))
-
-    out_rows = []
-    for i, item in enumerate(data):
-        question = item.get("question", "")
-        answer = item.get("answer", "")
-        # Build k_rollouts predictions and lengths
-        preds = []
-        lengths = []
-        for _ in range(args.k_rollouts):
-            if random.random() < args.correct_ratio:
-                preds.append(answer)
-            else:
-                try:
-                    n = float(answer.replace(",", "").strip())
-                    wrong = str(int(n) + random.choice([-1, 1])) if n == int(n) else "0"
-                except (ValueError, TypeError):
-                    wrong = "0"
-                preds.append(wrong)
-            lengths.append(random.randint(args.min_len, args.max_len))
-
-        out_rows.append({
-            "index": i,
-            "question": question,
-            "ground_truth": answer,
-            "predictions": preds,
-            "lengths": lengths,
-        })
+    specs = {s["dataset"]: s for s in map(parse_dataset_spec, args.dataset_spec)}
+    if args.input:
+        problems = iter_jsonl(args.input)
+    else:
+        problems = synthetic_problems(args.num_problems, list(specs) or ["synthetic"], args.seed)
+    sim = RolloutSimulator(args, specs)
 
     out_path = Path(args.output)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w") as f:
-        for r in out_rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-    print("Wrote", len(out_rows), "demo results to", out_path)
+    n = write_jsonl(out_path, generate(problems, sim, args.chunk_size))
+    print("Wrote", n, "demo results to", out_path)
     return 0
 
 
@@ -11,6 +11,16 @@ Expects a results JSON/JSONL with per-sample fields, e.g.:
 Usage:
   python scripts/evaluate.py --results results.jsonl --k 3 --base_results base.jsonl
   (base_results optional; if provided, AES is computed using base as Lb, pb.)
+
+Token cost report (streams both files; max_tokens from the config):
+  python scripts/evaluate.py --results dca.jsonl --base_results vanilla.jsonl --cost_report \
+      --tokens_per_sec 2500 --cost_per_gpu_hour 2.0
+
+Triage (results only cover a stratified subsample, see scripts/triage_select.py):
+  python scripts/evaluate.py --results sub_results.jsonl --triage_plan plan.json --target_half_width 0.02
+
+Profiling (per-stage latency breakdown at exit; PATH.json / PATH.prom also exports it):
+  python scripts/evaluate.py --results results.jsonl --profile [PATH]
 """
 
 import argparse
@@ -23,18 +33,67 @@ sys.path.insert(0, str(REPO_ROOT))
 
 from dca.metrics import pass_at_k_multi, aes_score, compute_accuracy, compute_avg_tokens
 from dca.data_utils import is_equivalent_math
+from dca.triage import evaluate_triage, stratum_key
+from dca.cost import TokenUsage, cost_report
+from dca.io import iter_jsonl, load_json
+from dca.profiling import add_profile_argument, count, setup_profiling, timer
+
+
+def iter_results(path: str):
+    """Stream result rows one at a time (for reports over full production dumps); .gz / .zst supported."""
+    return iter_jsonl(path)
 
 
 def load_results(path: str) -> list:
-    path = Path(path)
-    data = []
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            data.append(json.loads(line))
-    return data
+    return list(iter_results(path))
+
+
+def item_lengths(item: dict, num_preds: int) -> list:
+    """Per-rollout token lengths of a result row (scalar length is repeated per prediction)."""
+    lengths = item.get("lengths", item.get("length", [0]))
+    if isinstance(lengths, (int, float)):
+        lengths = [int(lengths)] * num_preds
+    return list(lengths)[:num_preds]
+
+
+def read_max_tokens(config_path: str) -> int:
+    """training.max_tokens from an experiment config (configs/experiment.yaml)."""
+    import yaml
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    return int(cfg["training"]["max_tokens"])
+
+
+def token_usage(path: str, max_tokens: int, cap_fraction: float) -> TokenUsage:
+    usage = TokenUsage(max_tokens=max_tokens, cap_fraction=cap_fraction)
+    for item in iter_results(path):
+        preds = item.get("predictions", item.get("prediction", []))
+        num_preds = 1 if isinstance(preds, str) else len(preds)
+        usage.update(item_lengths(item, num_preds))
+    return usage
+
+
+def score_item(item: dict) -> dict:
+    """Grade one result row: predictions, lengths, per-rollout correctness counts."""
+    gt = item.get("ground_truth", item.get("answer", ""))
+    preds = item.get("predictions", item.get("prediction", []))
+    if isinstance(preds, str):
+        preds = [preds]
+    lengths = item_lengths(item, len(preds))
+
+    correct_count = sum(1 for p in preds if is_equivalent_math(p, gt))
+    count("evaluate.problems")
+    count("evaluate.rollouts", len(preds))
+    count("evaluate.correct", correct_count)
+    return {
+        "stratum": stratum_key(item),
+        "ground_truth": gt,
+        "predictions": preds,
+        "lengths": lengths,
+        "num_correct": correct_count,
+        "num_samples": len(preds),
+        "first_correct": bool(preds) and is_equivalent_math(preds[0], gt),
+    }
 
 
 def evaluate(results: list, k: int = 1) -> dict:
@@ -51,29 +110,22 @@ def evaluate(results: list, k: int = 1) -> dict:
     all_lengths = []
 
     for item in results:
-        gt = item.get("ground_truth", item.get("answer", ""))
-        preds = item.get("predictions", item.get("prediction", []))
-        if isinstance(preds, str):
-            preds = [preds]
-        lengths = item.get("lengths", item.get("length", [0]))
-        if isinstance(lengths, (int, float)):
-            lengths = [int(lengths)] * len(preds)
-        lengths = list(lengths)[: len(preds)]
-
-        correct_count = sum(1 for p in preds if is_equivalent_math(p, gt))
-        num_correct_per_problem.append(correct_count)
+        with timer("evaluate.grade"):
+            row = score_item(item)
+        num_correct_per_problem.append(row["num_correct"])
         # pass@1 style: use first rollout for accuracy
-        all_preds.append(preds[0] if preds else "")
-        all_labels.append(gt)
-        all_lengths.extend(lengths)
+        all_preds.append(row["predictions"][0] if row["predictions"] else "")
+        all_labels.append(row["ground_truth"])
+        all_lengths.extend(row["lengths"])
 
     n_rollouts = 1
     if results:
         preds0 = results[0].get("predictions", [])
         n_rollouts = len(preds0) if isinstance(preds0, list) else 1
-    pass_at_1 = compute_accuracy(all_preds, all_labels, equiv_fn=is_equivalent_math)
-    pass_at_k_val = pass_at_k_multi(n_rollouts, num_correct_per_problem, min(k, n_rollouts))
-    avg_tokens = compute_avg_tokens(all_lengths) if all_lengths else 0.0
+    with timer("evaluate.metrics"):
+        pass_at_1 = compute_accuracy(all_preds, all_labels, equiv_fn=is_equivalent_math)
+        pass_at_k_val = pass_at_k_multi(n_rollouts, num_correct_per_problem, min(k, n_rollouts))
+        avg_tokens = compute_avg_tokens(all_lengths) if all_lengths else 0.0
 
     return {
         "pass@1": pass_at_1,
@@ -85,21 +137,70 @@ def evaluate(results: list, k: int = 1) -> dict:
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--results", required=True, help="Results JSONL path")
+    parser.add_argument("--results", required=True, help="Results JSONL path (.gz / .zst supported)")
     parser.add_argument("--base_results", default=None, help="Baseline results for AES")
     parser.add_argument("--k", type=int, default=1, help="pass@k")
+    parser.add_argument("--triage_plan", default=None, help="Plan JSON from triage_select.py; estimate full-set metrics")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level for triage bounds")
+    parser.add_argument("--target_half_width", type=float, default=None,
+                        help="Triage: report problems needed for this CI half-width")
+    parser.add_argument("--cost_report", action="store_true",
+                        help="Token cost report (total/tail tokens, near-cap share, projected savings vs --base_results)")
+    parser.add_argument("--config", default=str(REPO_ROOT / "configs" / "experiment.yaml"),
+                        help="Experiment config for max_tokens")
+    parser.add_argument("--max_tokens", type=int, default=None, help="Override max_tokens from --config")
+    parser.add_argument("--cap_fraction", type=float, default=0.95,
+                        help="Rollouts with length >= cap_fraction * max_tokens count as near the cap")
+    parser.add_argument("--tokens_per_sec", type=float, default=None, help="Generation throughput for projections")
+    parser.add_argument("--cost_per_million_tokens", type=float, default=None)
+    parser.add_argument("--cost_per_gpu_hour", type=float, default=None,
+                        help="With --tokens_per_sec as per-GPU throughput")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    setup_profiling(args.profile)
+
+    if args.cost_report:
+        max_tokens = args.max_tokens or read_max_tokens(args.config)
+        with timer("evaluate.token_usage"):
+            candidate = token_usage(args.results, max_tokens, args.cap_fraction)
+            baseline = token_usage(args.base_results, max_tokens, args.cap_fraction) if args.base_results else None
+        report = cost_report(
+            candidate,
+            baseline,
+            tokens_per_sec=args.tokens_per_sec,
+            cost_per_million_tokens=args.cost_per_million_tokens,
+            cost_per_gpu_hour=args.cost_per_gpu_hour,
+        )
+        print("Token cost report:", json.dumps(report, indent=2))
+        return 0
 
-    results = load_results(args.results)
+    with timer("evaluate.load"):
+        results = load_results(args.results)
     if not results:
         print("No results loaded.", file=sys.stderr)
         sys.exit(1)
 
+    if args.triage_plan:
+        plan = load_json(args.triage_plan)
+        with timer("evaluate.grade"):
+            scored = [score_item(item) for item in results]
+        with timer("evaluate.triage"):
+            report = evaluate_triage(
+                scored,
+                plan["strata"],
+                k=args.k,
+                confidence=args.confidence,
+                target_half_width=args.target_half_width,
+            )
+        print("Triage estimate (full set):", json.dumps(report, indent=2))
+        return 0
+
     metrics = evaluate(results, args.k)
     print("Metrics:", json.dumps(metrics, indent=2))
 
     if args.base_results:
-        base = load_results(args.base_results)
+        with timer("evaluate.load"):
+            base = load_results(args.base_results)
         base_metrics = evaluate(base, args.k)
         aes = aes_score(
             metrics["pass@1"],
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Sequential early-stopping evaluation: replay a fixed-n results file through dca.sequential.
+
+Each problem's stored rollouts are served in order, batch_size at a time, as if they were
+being generated; sampling stops once more rollouts are unlikely to move pass@1 / pass@k by
+more than --tol. Prints the sequential estimates, the fixed-n estimates on the same file,
+rollouts / tokens saved and the bias / variance bounds. In a live run, pass your own
+generate_fn to dca.sequential.run_sequential instead.
+
+Usage:
+  python scripts/evaluate_sequential.py --results results.jsonl --n_max 16 --batch_size 4 --k 10 --tol 0.1
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from dca.data_utils import is_equivalent_math
+from dca.metrics import pass_at_k
+from dca.io import write_jsonl
+from dca.sequential import run_sequential
+from dca.profiling import add_profile_argument, setup_profiling, timer
+
+sys.path.insert(0, str(REPO / "scripts"))
+from evaluate import load_results, score_item  # noqa: E402
+
+
+def replay_generator(results: list):
+    """generate_fn serving each problem's stored rollouts in order (keyed by position)."""
+    cursors = {}
+
+    def generate(problem, n):
+        pid = problem["_replay_id"]
+        item = results[pid]
+        start = cursors.get(pid, 0)
+        preds = item["predictions"][start : start + n]
+        lengths = item["lengths"][start : start + n]
+        cursors[pid] = start + n
+        return preds, lengths
+
+    return generate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential early-stopping pass@k evaluation (replay)")
+    parser.add_argument("--results", required=True, help="Fixed-n results JSONL (predictions, lengths, ground_truth)")
+    parser.add_argument("--n_max", type=int, default=None, help="Rollout budget (default: rollouts in file)")
+    parser.add_argument("--batch_size", type=int, default=4)
+    parser.add_argument("--min_samples", type=int, default=None)
+    parser.add_argument("--k", type=int, default=1)
+    parser.add_argument("--tol", type=float, default=0.1)
+    parser.add_argument("--delta", type=float, default=0.1)
+    parser.add_argument("--output", default=None, help="Optional JSONL of early-stopped result rows")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    setup_profiling(args.profile)
+
+    with timer("evaluate.grade"):
+        results = [score_item(item) for item in load_results(args.results)]
+    if not results:
+        print("No results loaded.", file=sys.stderr)
+        return 1
+    available = min(r["num_samples"] for r in results)
+    n_max = min(args.n_max, available) if args.n_max else available
+    if args.n_max and args.n_max > available:
+        print("--n_max {} exceeds the {} rollouts available for some problems; using {}".format(
+            args.n_max, available, n_max), file=sys.stderr)
+    problems = [{"_replay_id": i, "ground_truth": r["ground_truth"]} for i, r in enumerate(results)]
+
+    rows, report = run_sequential(
+        problems,
+        replay_generator(results),
+        n_max=n_max,
+        batch_size=args.batch_size,
+        min_samples=args.min_samples,
+        k=args.k,
+        tol=args.tol,
+        delta=args.delta,
+    )
+    # Fixed-n reference on the same rollouts (first n_max per problem)
+    kk = min(args.k, n_max)
+    fixed_correct = [
+        sum(1 for p in r["predictions"][:n_max] if is_equivalent_math(p, r["ground_truth"])) for r in results
+    ]
+    report["fixed_n"] = {
+        "pass@1": sum(c / n_max for c in fixed_correct) / len(results),
+        "pass@{}".format(args.k): sum(pass_at_k(n_max, c, kk) for c in fixed_correct) / len(results),
+    }
+    print("Sequential evaluation:", json.dumps(report, indent=2))
+
+    if args.output:
+        for r in rows:
+            r.pop("_replay_id", None)
+        write_jsonl(args.output, rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
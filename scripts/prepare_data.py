@@ -6,20 +6,37 @@ Outputs:
   - data_dir/train.parquet, val.parquet (verl format: prompt, reward_model.ground_truth, data_source, ability)
   - data_dir/train.jsonl, val.jsonl, test_gsm8k.jsonl (our format: question, answer) for evaluate.py
 Uses HuggingFace datasets if available (openai/gsm8k, lighteval/MATH); else writes minimal built-in samples.
+
+Streaming pipeline: each source (GSM8K, optional MATH, extra --source files) is processed in
+parallel into per-source shards under data_dir/.shards, then merged in a fixed source order in
+--chunk_size chunks (one parquet row group per chunk), so memory stays bounded and the output
+is deterministic. data_dir/manifest.json records a content hash per source and per output;
+re-runs skip unchanged sources, and skip the merge when nothing changed.
 """
 
 import argparse
+import hashlib
 import json
 import os
-import re
+import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 REPO = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(REPO))
 
-# VERL parquet columns
-INSTRUCTION_SUFFIX = " Let's think step by step and output the final answer after \"####\"."
+from dca.data_utils import load_dataset, make_parquet_row
+from dca.decontam import LSHIndex, MinHasher, cached_signatures, find_overlaps
+from dca.io import iter_jsonl, load_json, open_text, write_jsonl
+from dca.profiling import add_profile_argument, setup_profiling, timer
+from dca.record_cache import file_digest
+
+# Bump when row formatting changes so cached shards are rebuilt
+PIPELINE_VERSION = "1"
 
 
 def extract_solution_gsm8k(answer_str):
@@ -46,73 +63,36 @@ def extract_solution_math(solution_str):
     return s
 
 
-def make_parquet_row(question: str, answer: str, data_source: str, ability: str, idx: int, split: str) -> dict:
-    """One row in verl parquet format."""
-    prompt_content = question.strip() + INSTRUCTION_SUFFIX
-    return {
-        "data_source": data_source,
-        "prompt": [{"role": "user", "content": prompt_content}],
-        "ability": ability,
-        "reward_model": {"style": "rule", "ground_truth": answer.strip()},
-        "extra_info": {"split": split, "index": idx},
-    }
-
-
 def make_jsonl_row(question: str, answer: str, dataset: str) -> dict:
     return {"question": question, "answer": answer, "dataset": dataset}
 
 
-def load_gsm8k_hf(train_size: int, val_size: int, seed: int):
-    """Load GSM8K from HuggingFace datasets."""
-    try:
-        import datasets
-        ds = datasets.load_dataset("openai/gsm8k", "main")
-        train = ds["train"].shuffle(seed=seed)
-        test = ds["test"]
-        train_data = []
-        for i, ex in enumerate(train):
-            if i >= train_size:
-                break
-            q = ex["question"]
-            a = extract_solution_gsm8k(ex["answer"])
-            train_data.append((q, a))
-        val_data = []
-        for i, ex in enumerate(test):
-            if i >= val_size:
-                break
-            q = ex["question"]
-            a = extract_solution_gsm8k(ex["answer"])
-            val_data.append((q, a))
-        return train_data, val_data, "gsm8k"
-    except Exception as e:
-        print("HuggingFace GSM8K not available:", e, file=sys.stderr)
-        return None, None, None
-
-
-def load_math_hf(max_train: int, max_val: int, seed: int):
-    """Load MATH subset from HuggingFace (lighteval/MATH)."""
-    try:
-        import datasets
-        ds = datasets.load_dataset("lighteval/MATH", "all", trust_remote_code=True)
-        # MATH has 'problem', 'solution'; extract \boxed{}
-        train = ds.get("train", ds.get("test", []))
-        if hasattr(train, "shuffle"):
-            train = train.shuffle(seed=seed)
-        train_data, val_data = [], []
-        for i, ex in enumerate(train):
-            q = ex.get("problem", ex.get("question", ""))
+def iter_gsm8k_hf(split: str, limit: int, seed: int) -> Iterator[Tuple[str, str]]:
+    """Stream (question, answer) pairs of GSM8K from HuggingFace datasets (train split shuffled)."""
+    import datasets
+    ds = datasets.load_dataset("openai/gsm8k", "main")[split]
+    if split == "train":
+        ds = ds.shuffle(seed=seed)
+    for i, ex in enumerate(ds):
+        if i >= limit:
+            break
+        yield ex["question"], extract_solution_gsm8k(ex["answer"])
+
+
+def iter_math_hf(start: int, stop: int, seed: int) -> Iterator[Tuple[str, str]]:
+    """Stream (problem, boxed answer) pairs [start, stop) of a shuffled MATH split (lighteval/MATH)."""
+    import datasets
+    ds = datasets.load_dataset("lighteval/MATH", "all", trust_remote_code=True)
+    # MATH has 'problem', 'solution'; extract \boxed{}
+    train = ds.get("train", ds.get("test", []))
+    if hasattr(train, "shuffle"):
+        train = train.shuffle(seed=seed)
+    for i, ex in enumerate(train):
+        if i >= stop:
+            break
+        if i >= start:
             sol = ex.get("solution", "")
-            a = extract_solution_math(sol) or str(sol).strip()[:50]
-            if i < max_train:
-                train_data.append((q, a))
-            elif i < max_train + max_val:
-                val_data.append((q, a))
-            else:
-                break
-        return train_data, val_data, "math"
-    except Exception as e:
-        print("HuggingFace MATH not available:", e, file=sys.stderr)
-        return None, None, None
+            yield ex.get("problem", ex.get("question", "")), extract_solution_math(sol) or str(sol).strip()[:50]
 
 
 def builtin_samples_gsm8k():
@@ -126,6 +106,236 @@ def builtin_samples_gsm8k():
     ]
 
 
+# ---------------------------------------------------------------------------
+# Sources: each one is processed independently (in parallel) into train / val shards
+# ---------------------------------------------------------------------------
+
+
+def source_specs(args) -> List[Dict[str, Any]]:
+    """Sources in output order. Paper: AIME-AMC subset from Prime (2470); GSM8K is the small-pipeline proxy."""
+    n_gsm8k_train = args.train_size * 2 // 3 if args.use_math else args.train_size
+    specs = [{"name": "gsm8k", "kind": "builtin" if args.builtin_only else "hf_gsm8k",
+              "train": n_gsm8k_train, "val": args.val_size, "seed": args.seed}]
+    # Optional MATH (1:2 ratio with GSM8K)
+    if args.use_math:
+        specs.append({"name": "math", "kind": "hf_math", "train": args.train_size // 3,
+                      "val": args.val_size // 2, "seed": args.seed})
+    for path in args.source or []:
+        resolved = str(Path(path).resolve())
+        # keyed by the resolved path, so a/train.jsonl and b/train.jsonl get separate shards
+        key = "{}-{}".format(Path(path).name, hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:8])
+        specs.append({"name": Path(path).name, "key": key, "kind": "file", "path": resolved})
+    for spec in specs:
+        spec.setdefault("key", spec["name"])
+    return specs
+
+
+def source_fingerprint(spec: Dict[str, Any]) -> str:
+    """Content hash of everything a source's shards depend on (local file bytes, or loader + params)."""
+    h = hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8"))
+    h.update(PIPELINE_VERSION.encode("utf-8"))
+    if spec["kind"] == "file":
+        h.update(file_digest(spec["path"]))
+    elif spec["kind"] == "builtin":
+        h.update(json.dumps(builtin_samples_gsm8k()).encode("utf-8"))
+    return h.hexdigest()[:20]
+
+
+def iter_source(spec: Dict[str, Any], split: str) -> Iterator[Dict[str, Any]]:
+    """JSONL rows (question, answer, dataset) of one source split, streamed."""
+    kind = spec["kind"]
+    if kind == "builtin":
+        builtin = builtin_samples_gsm8k()
+        pairs = builtin if split == "train" else builtin[: min(2, len(builtin))]
+    elif kind == "hf_gsm8k":
+        pairs = iter_gsm8k_hf("train" if split == "train" else "test", spec[split], spec["seed"])
+    elif kind == "hf_math":
+        lo = 0 if split == "train" else spec["train"]
+        pairs = iter_math_hf(lo, lo + spec[split], spec["seed"])
+    elif split == "train":
+        for item in load_dataset(spec["path"], lazy=True):
+            yield make_jsonl_row(item["question"], item["answer"], item["dataset"])
+        return
+    else:
+        return
+    for q, a in pairs:
+        yield make_jsonl_row(q, a, spec["name"])
+
+
+def process_source(spec: Dict[str, Any], shard_dir: str) -> Dict[str, Any]:
+    """Write one source's train / val shards (streamed); HF sources fall back to built-in samples."""
+    shard_dir = Path(shard_dir)
+    counts = {}
+    fallback = False
+    for split in ("train", "val"):
+        try:
+            counts[split] = write_jsonl(shard_dir / (split + ".jsonl"), iter_source(spec, split))
+        except Exception as e:
+            if spec["kind"] not in ("hf_gsm8k", "hf_math"):
+                raise
+            print("HuggingFace {} not available:".format(spec["name"]), e, file=sys.stderr)
+            fallback = True
+            break
+    if fallback:
+        if spec["kind"] == "hf_math":
+            counts = {"train": write_jsonl(shard_dir / "train.jsonl", []), "val": write_jsonl(shard_dir / "val.jsonl", [])}
+        else:
+            builtin = dict(spec, kind="builtin")
+            counts = {split: write_jsonl(shard_dir / (split + ".jsonl"), iter_source(builtin, split))
+                      for split in ("train", "val")}
+    return {"counts": counts, "fallback": fallback}
+
+
+# ---------------------------------------------------------------------------
+# Output: parquet row groups (verl) + JSONL, written chunk by chunk
+# ---------------------------------------------------------------------------
+
+
+def chunked(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ParquetSink:
+    """One parquet row group per chunk (pyarrow); JSONL with JSON-encoded nested columns as fallback."""
+
+    def __init__(self, path: Path, fallback_path: Path):
+        self.path = path
+        self.writer = None
+        self.fallback = None
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._pa, self._pq = pa, pq
+        except ImportError:
+            self.fallback = open_text(fallback_path, "w")
+            self.path = fallback_path
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if self.fallback is not None:
+            for r in rows:
+                flat = dict(r, prompt=json.dumps(r["prompt"]), reward_model=json.dumps(r["reward_model"]),
+                            extra_info=json.dumps(r["extra_info"]))
+                self.fallback.write(json.dumps(flat) + "\n")
+            return
+        if self.writer is None:
+            table = self._pa.Table.from_pylist(rows)
+            self.writer = self._pq.ParquetWriter(str(self.path), table.schema)
+        else:
+            table = self._pa.Table.from_pylist(rows, schema=self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+
+def find_contamination(specs, shard_dirs, against: List[str], threshold: float) -> List[Dict[int, Dict[str, Any]]]:
+    """
+    Per source: {train row -> overlap} for training questions near-duplicating a test question
+    (this run's val/test rows plus the --decontam_against files). MinHash signatures are cached
+    per shard / test file (dca.decontam.cached_signatures).
+    """
+    hasher = MinHasher()
+    test_texts: List[str] = []
+    test_labels: List[Tuple[str, int]] = []
+    test_sigs = []
+    test_files = [(spec["name"] + "/val", shard_dir / "val.jsonl", iter_jsonl) for spec, shard_dir in zip(specs, shard_dirs)]
+    test_files += [(path, Path(path), load_dataset) for path in against]
+    for label, path, reader in test_files:
+        texts = [r["question"] for r in reader(str(path))]
+        test_sigs.append(cached_signatures(path, lambda: texts, hasher))
+        test_texts.extend(texts)
+        test_labels.extend((label, i) for i in range(len(texts)))
+    index = LSHIndex(np.concatenate(test_sigs) if test_sigs else np.zeros((0, hasher.num_perm), np.uint32))
+    flagged = []
+    for shard_dir in shard_dirs:
+        train_path = shard_dir / "train.jsonl"
+        texts = [r["question"] for r in iter_jsonl(train_path)]
+        sigs = cached_signatures(train_path, lambda: texts, hasher)
+        overlaps = find_overlaps(texts, test_texts, threshold, hasher, train_signatures=sigs, index=index)
+        flagged.append({o["train_index"]: {"test_file": test_labels[o["test_index"]][0],
+                                           "test_index": test_labels[o["test_index"]][1],
+                                           "jaccard": round(o["jaccard"], 4)} for o in overlaps})
+    return flagged
+
+
+def write_outputs(specs, shard_dirs, out: Path, compress: str, chunk_size: int,
+                  flagged: Optional[List[Dict[int, Dict[str, Any]]]] = None, drop: bool = False) -> Dict[str, int]:
+    """
+    Merge source shards in spec order into parquet + JSONL outputs; memory is O(chunk_size).
+    flagged (per source, train row -> overlap) rows are dropped, or marked "contaminated".
+    """
+    jsonl = {name: open_text(out / (name + ".jsonl" + compress), "w") for name in ("train", "val", "test_gsm8k")}
+    sinks = {split: ParquetSink(out / (split + ".parquet"), out / "{}.jsonl.parquet_fallback{}".format(split, compress))
+             for split in ("train", "val")}
+    sizes = {"train": 0, "val": 0}
+    try:
+        for k, shard_dir in enumerate(shard_dirs):
+            for split in ("train", "val"):
+                marks = flagged[k] if flagged is not None and split == "train" else {}
+                rows = iter_jsonl(shard_dir / (split + ".jsonl"))
+                if marks:
+                    rows = mark_rows(rows, marks, drop)
+                for chunk in chunked(rows, chunk_size):
+                    base = sizes[split]
+                    prows = [make_parquet_row(r["question"], r["answer"], r["dataset"], "math", base + i, split)
+                             for i, r in enumerate(chunk)]
+                    for prow, r in zip(prows, chunk):
+                        if "contaminated" in r:
+                            prow["extra_info"]["contaminated"] = True
+                    sinks[split].write(prows)
+                    lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in chunk)
+                    jsonl[split].write(lines)
+                    if split == "val":
+                        jsonl["test_gsm8k"].write(lines)
+                    sizes[split] += len(chunk)
+    finally:
+        for f in jsonl.values():
+            f.close()
+        for sink in sinks.values():
+            sink.close()
+    if sinks["train"].fallback is not None:
+        print("Wrote fallback JSONL (install pyarrow for parquet)")
+    else:
+        print("Wrote", sinks["train"].path, sinks["val"].path)
+    return sizes
+
+
+def mark_rows(rows: Iterable[Dict[str, Any]], marks: Dict[int, Dict[str, Any]], drop: bool):
+    for i, r in enumerate(rows):
+        if i in marks:
+            if drop:
+                continue
+            r = dict(r, contaminated=marks[i])
+        yield r
+
+
+def output_paths(out: Path, compress: str) -> List[Path]:
+    paths = [out / (name + ".jsonl" + compress) for name in ("train", "val", "test_gsm8k")]
+    try:
+        import pyarrow  # noqa: F401
+        paths += [out / "train.parquet", out / "val.parquet"]
+    except ImportError:
+        paths += [out / "{}.jsonl.parquet_fallback{}".format(split, compress) for split in ("train", "val")]
+    return paths
+
+
+def load_manifest(path: Path) -> Dict[str, Any]:
+    try:
+        return load_json(path)
+    except (OSError, ValueError):
+        return {"sources": {}, "outputs": {}}
+
+
 def main():
     parser = argparse.ArgumentParser(description="Prepare small dataset for DCA pipeline")
     parser.add_argument("--output_dir", type=str, default="data/processed", help="Output directory")
@@ -134,90 +344,94 @@ def main():
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--use_math", action="store_true", help="Try to add MATH (1:2 with GSM8K if available)")
     parser.add_argument("--builtin_only", action="store_true", help="Use only built-in samples (no HF download, for fast demo)")
+    parser.add_argument("--source", action="append", default=None,
+                        help="Extra local training file (any dca.data_utils.load_dataset format; repeatable)")
+    parser.add_argument("--compress", choices=["", ".gz", ".zst"], default="",
+                        help="Compress JSONL outputs (suffix appended to file names)")
+    parser.add_argument("--chunk_size", type=int, default=4096, help="Rows per chunk / parquet row group")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel source workers (default: one per source, <= CPUs)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the manifest says inputs are unchanged")
+    parser.add_argument("--decontaminate", choices=["none", "flag", "drop"], default="none",
+                        help="MinHash/LSH train-test overlap check: mark or drop overlapping training prompts")
+    parser.add_argument("--decontam_against", action="append", default=[],
+                        help="Extra test set to check against, besides this run's val/test rows (repeatable)")
+    parser.add_argument("--decontam_threshold", type=float, default=0.7, help="Shingle Jaccard for an overlap")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    setup_profiling(args.profile)
 
     out = Path(args.output_dir)
     out.mkdir(parents=True, exist_ok=True)
+    manifest_path = out / "manifest.json"
+    manifest = {"sources": {}, "outputs": {}} if args.force else load_manifest(manifest_path)
 
-    # Paper: AIME–AMC subset from Prime, 2470. We use GSM8K as proxy for small pipeline; optionally MATH.
-    train_rows_parquet = []
-    train_rows_jsonl = []
-    val_rows_parquet = []
-    val_rows_jsonl = []
-    test_rows_jsonl = []
+    specs = source_specs(args)
+    fingerprints = [source_fingerprint(spec) for spec in specs]
+    shard_dirs = [out / ".shards" / "{}-{}".format(spec["key"], fp) for spec, fp in zip(specs, fingerprints)]
 
-    # 1) GSM8K
-    n_gsm8k_train = args.train_size * 2 // 3 if args.use_math else args.train_size
-    n_gsm8k_val = args.val_size
-    train_gsm8k, val_gsm8k, _ = (None, None, None) if args.builtin_only else load_gsm8k_hf(n_gsm8k_train, n_gsm8k_val, args.seed)
-    if train_gsm8k is not None:
-        for i, (q, a) in enumerate(train_gsm8k):
-            train_rows_parquet.append(make_parquet_row(q, a, "gsm8k", "math", i, "train"))
-            train_rows_jsonl.append(make_jsonl_row(q, a, "gsm8k"))
-        for i, (q, a) in enumerate(val_gsm8k):
-            val_rows_parquet.append(make_parquet_row(q, a, "gsm8k", "math", i, "val"))
-            val_rows_jsonl.append(make_jsonl_row(q, a, "gsm8k"))
-            test_rows_jsonl.append(make_jsonl_row(q, a, "gsm8k"))
-    else:
-        builtin = builtin_samples_gsm8k()
-        for i, (q, a) in enumerate(builtin):
-            train_rows_parquet.append(make_parquet_row(q, a, "gsm8k", "math", i, "train"))
-            train_rows_jsonl.append(make_jsonl_row(q, a, "gsm8k"))
-        for i, (q, a) in enumerate(builtin[: min(2, len(builtin))]):
-            val_rows_parquet.append(make_parquet_row(q, a, "gsm8k", "math", i, "val"))
-            val_rows_jsonl.append(make_jsonl_row(q, a, "gsm8k"))
-            test_rows_jsonl.append(make_jsonl_row(q, a, "gsm8k"))
-
-    # 2) Optional MATH (1:2 ratio with GSM8K)
-    if args.use_math:
-        n_math_train = args.train_size // 3
-        n_math_val = args.val_size // 2
-        train_math, val_math, _ = load_math_hf(n_math_train, n_math_val, args.seed)
-        if train_math is not None:
-            base = len(train_rows_parquet)
-            for i, (q, a) in enumerate(train_math):
-                train_rows_parquet.append(make_parquet_row(q, a, "math", "math", base + i, "train"))
-                train_rows_jsonl.append(make_jsonl_row(q, a, "math"))
-            base = len(val_rows_parquet)
-            for i, (q, a) in enumerate(val_math):
-                val_rows_parquet.append(make_parquet_row(q, a, "math", "math", base + i, "val"))
-                val_rows_jsonl.append(make_jsonl_row(q, a, "math"))
-                test_rows_jsonl.append(make_jsonl_row(q, a, "math"))
-
-    # Write parquet (verl)
-    try:
-        import pandas as pd
-        pd.DataFrame(train_rows_parquet).to_parquet(out / "train.parquet", index=False)
-        pd.DataFrame(val_rows_parquet).to_parquet(out / "val.parquet", index=False)
-        print("Wrote", out / "train.parquet", out / "val.parquet")
-    except ImportError:
-        # Fallback: write as JSONL for parquet-convert later
-        with open(out / "train.jsonl.parquet_fallback", "w") as f:
-            for r in train_rows_parquet:
-                r["prompt"] = json.dumps(r["prompt"])
-                r["reward_model"] = json.dumps(r["reward_model"])
-                r["extra_info"] = json.dumps(r["extra_info"])
-                f.write(json.dumps(r) + "\n")
-        with open(out / "val.jsonl.parquet_fallback", "w") as f:
-            for r in val_rows_parquet:
-                r["prompt"] = json.dumps(r["prompt"])
-                r["reward_model"] = json.dumps(r["reward_model"])
-                r["extra_info"] = json.dumps(r["extra_info"])
-                f.write(json.dumps(r) + "\n")
-        print("Wrote fallback JSONL (install pandas+pyarrow for parquet)")
-
-    # Write jsonl (our eval / data_utils)
-    with open(out / "train.jsonl", "w") as f:
-        for r in train_rows_jsonl:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-    with open(out / "val.jsonl", "w") as f:
-        for r in val_rows_jsonl:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-    with open(out / "test_gsm8k.jsonl", "w") as f:
-        for r in test_rows_jsonl:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-    print("Wrote", out / "train.jsonl", out / "val.jsonl", out / "test_gsm8k.jsonl")
-    print("Train size:", len(train_rows_jsonl), "Val/Test size:", len(test_rows_jsonl))
+    # 1) Per-source shards, in parallel; unchanged sources (same fingerprint, shards present) are skipped
+    todo = [i for i, fp in enumerate(fingerprints)
+            if manifest["sources"].get(specs[i]["key"], {}).get("fingerprint") != fp
+            or not all((shard_dirs[i] / (split + ".jsonl")).exists() for split in ("train", "val"))]
+    results = {}
+    if todo:
+        workers = args.workers or min(len(todo), os.cpu_count() or 1)
+        with timer("prepare_data.sources"):
+            if workers <= 1 or len(todo) == 1:
+                results = {i: process_source(specs[i], str(shard_dirs[i])) for i in todo}
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {i: pool.submit(process_source, specs[i], str(shard_dirs[i])) for i in todo}
+                    results = {i: f.result() for i, f in futures.items()}
+    sources = {}
+    for i, spec in enumerate(specs):
+        if i in results:
+            # a source that fell back to built-in samples is retried on the next run
+            fp = None if results[i]["fallback"] else fingerprints[i]
+            sources[spec["key"]] = {"fingerprint": fp, "shard_dir": str(shard_dirs[i]), "counts": results[i]["counts"]}
+        else:
+            sources[spec["key"]] = manifest["sources"][spec["key"]]
+            print("Unchanged source, skipped:", spec["key"])
+
+    # 2) Merge shards in source order (deterministic regardless of worker completion order)
+    decontam = [args.decontaminate, args.decontam_threshold,
+                [file_digest(p).hex() for p in args.decontam_against]] if args.decontaminate != "none" else None
+    outputs_key = hashlib.sha256(json.dumps(
+        [fingerprints, [str(d) for d in shard_dirs], args.compress, decontam], sort_keys=True
+    ).encode("utf-8")).hexdigest()[:20]
+    paths = output_paths(out, args.compress)
+    outputs = manifest.get("outputs", {})
+    if not todo and outputs.get("key") == outputs_key and all(
+        p.exists() and outputs.get("files", {}).get(p.name) == file_digest(p).hex() for p in paths
+    ):
+        print("Outputs up to date:", out)
+        return 0
+    flagged = None
+    if args.decontaminate != "none":
+        with timer("prepare_data.decontaminate"):
+            flagged = find_contamination(specs, shard_dirs, args.decontam_against, args.decontam_threshold)
+        report = [dict(o, source=spec["name"], train_index=i)
+                  for spec, marks in zip(specs, flagged) for i, o in sorted(marks.items())]
+        with open(out / "decontamination.json", "w") as f:
+            json.dump({"mode": args.decontaminate, "threshold": args.decontam_threshold,
+                       "against": args.decontam_against, "overlaps": report}, f, indent=2)
+        print("Decontamination:", len(report), "overlapping training prompts",
+              "dropped" if args.decontaminate == "drop" else "flagged", "->", out / "decontamination.json")
+    with timer("prepare_data.write"):
+        sizes = write_outputs(specs, shard_dirs, out, args.compress, args.chunk_size,
+                              flagged=flagged, drop=args.decontaminate == "drop")
+    manifest = {
+        "sources": sources,
+        "outputs": {"key": outputs_key, "files": {p.name: file_digest(p).hex() for p in paths if p.exists()}},
+    }
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    for stale in (out / ".shards").iterdir():
+        if stale not in shard_dirs:
+            shutil.rmtree(stale, ignore_errors=True)
+    print("Wrote", out / ("train.jsonl" + args.compress), out / ("val.jsonl" + args.compress),
+          out / ("test_gsm8k.jsonl" + args.compress))
+    print("Train size:", sizes["train"], "Val/Test size:", sizes["val"])
     return 0
 
 
@@ -8,11 +8,23 @@ REPO = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(REPO))
 
 def run():
-    from tests import test_advantage, test_metrics, test_verl_integration, test_slime_integration
+    from tests import (
+        test_advantage, test_metrics, test_verl_integration, test_slime_integration, test_triage,
+        test_sequential, test_online_metrics, test_cost,
+        test_io, test_lazy_data, test_record_cache, test_sampler,
+        test_prefetch, test_decontam, test_prompt_stats, test_length_batching,
+        test_whitening, test_diagnostics, test_profiling, test_toy_sim, test_sweep, test_imports, test_prepare_data,
+        test_benchmark_advantage,
+    )
     import unittest
     load = unittest.defaultTestLoader.loadTestsFromModule
     suite = unittest.TestSuite([
-        load(test_advantage), load(test_metrics), load(test_verl_integration), load(test_slime_integration)
+        load(test_advantage), load(test_metrics), load(test_verl_integration), load(test_slime_integration),
+        load(test_triage), load(test_sequential), load(test_online_metrics),
+        load(test_cost), load(test_io), load(test_lazy_data), load(test_record_cache), load(test_sampler),
+        load(test_prefetch), load(test_decontam), load(test_prompt_stats), load(test_length_batching),
+        load(test_whitening), load(test_diagnostics), load(test_profiling), load(test_toy_sim), load(test_sweep), load(test_imports), load(test_prepare_data),
+        load(test_benchmark_advantage),
     ])
     runner = unittest.runner.TextTestRunner(verbosity=2)
     result = runner.run(suite)
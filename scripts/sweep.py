@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Resumable parallel hyperparameter sweep (dca.sweep) with a per-trial result cache.
+
+The spec (JSON or YAML) gives a grid and / or random search over the trial's parameters; the
+built-in "toy" trial trains the cpu_mini_validate.py toy policies with compute_advantage
+(mode, beta, gamma, use_dynamic, use_rloo) plus simulator params (group_size, lr, n_steps,
+seeds). Finished trials are cached under --out by config hash; rerunning the same command
+after an interruption only runs the missing trials. See configs/sweep_toy.yaml.
+
+Usage:
+  python scripts/sweep.py --spec configs/sweep_toy.yaml --out sweeps/toy --workers 8
+  python scripts/sweep.py --spec configs/sweep_toy.yaml --out sweeps/toy --summary_only --top 10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from dca.profiling import add_profile_argument, setup_profiling, timer
+from dca.sweep import TrialCache, run_sweep, summarize
+
+PARAM_COLUMNS = ("mode", "beta", "gamma", "use_dynamic", "use_rloo", "group_size", "lr")
+
+
+def load_spec(path: str) -> dict:
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def format_value(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return "{:g}".format(value)
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable parallel hyperparameter sweep")
+    parser.add_argument("--spec", required=True, help="Sweep spec (.json / .yaml): trial, fixed, grid, random")
+    parser.add_argument("--out", required=True, help="Sweep directory (trial cache + summary.json)")
+    parser.add_argument("--workers", type=int, default=0, help="Process pool size (0 = all CPUs, 1 = in-process)")
+    parser.add_argument("--summary_only", action="store_true", help="Only summarize trials already cached in --out")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print (Pareto rows are always printed)")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    setup_profiling(args.profile)
+
+    if args.summary_only:
+        records = list(TrialCache(args.out).records())
+        failed = {}
+    else:
+        with timer("sweep.run"):
+            out = run_sweep(load_spec(args.spec), args.out, workers=args.workers, progress=print)
+        records, failed = out["records"], out["failed"]
+        print("ran {}, cached {}, failed {}".format(out["ran"], out["cached"], len(failed)))
+
+    rows = summarize(records)
+    with open(Path(args.out) / "summary.json", "w") as f:
+        json.dump(rows, f, indent=2)
+    columns = [c for c in PARAM_COLUMNS if any(c in r for r in rows)]
+    print("\n" + " | ".join("{:>10}".format(c) for c in columns + ["acc", "length", "final λ"]) + " | pareto")
+    for i, r in enumerate(rows):
+        if i >= args.top and not r["pareto"]:
+            continue
+        cells = [format_value(r.get(c)) for c in columns]
+        cells += ["{:.3f}".format(r["acc_mean"]), "{:.1f}".format(r["length_mean"]), "{:.1f}".format(r.get("lam_mean", float("nan")))]
+        print(" | ".join("{:>10}".format(c) for c in cells) + " | " + ("*" if r["pareto"] else ""))
+    print("\n{} configs; summary written to {}".format(len(rows), Path(args.out) / "summary.json"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
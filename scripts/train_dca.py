@@ -23,6 +23,7 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from dca import advantage_dca_grpo, advantage_dca_rloo
+from dca.profiling import add_profile_argument, setup_profiling
 
 
 def main():
@@ -30,7 +31,9 @@ def main():
     parser.add_argument("--algorithm", choices=["grpo", "rloo"], default="grpo")
     parser.add_argument("--beta", type=float, default=0.2, help="Length penalty coefficient")
     parser.add_argument("--dry_run", action="store_true", help="Only check DCA API (no training)")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    setup_profiling(args.profile)
 
     if args.dry_run:
         import numpy as np
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Select a stratified subsample of evaluation problems for fast checkpoint triage.
+
+Strata are dataset x MATH level (load_math keeps "level"). Writes the selected problems
+as JSONL (question, answer, dataset, level, index, stratum) for generation, and a plan
+JSON with per-stratum population sizes for scripts/evaluate.py --triage_plan.
+
+Usage:
+  python scripts/triage_select.py --data data/gsm8k_test.jsonl --data data/math500_test.json \
+      --fraction 0.1 --seed 0 --output data/triage/problems.jsonl --plan data/triage/plan.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+from dca.data_utils import load_dataset
+from dca.io import open_text, write_jsonl
+from dca.triage import stratified_sample, stratum_key
+from dca.profiling import add_profile_argument, setup_profiling
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stratified subsample for checkpoint triage")
+    parser.add_argument("--data", action="append", required=True, help="Dataset file (repeatable)")
+    parser.add_argument("--fraction", type=float, default=None, help="Fraction of problems to keep")
+    parser.add_argument("--n", type=int, default=None, help="Number of problems to keep (instead of --fraction)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min_per_stratum", type=int, default=2)
+    parser.add_argument("--output", required=True, help="Selected problems JSONL")
+    parser.add_argument("--plan", required=True, help="Plan JSON (strata populations) for evaluate.py")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    setup_profiling(args.profile)
+    if args.fraction is None and args.n is None:
+        args.fraction = 0.1
+
+    items = []
+    for path in args.data:
+        for i, item in enumerate(load_dataset(path)):
+            item = dict(item)
+            item["index"] = i
+            item["stratum"] = stratum_key(item)
+            items.append(item)
+
+    indices, strata = stratified_sample(
+        items, fraction=args.fraction, n=args.n, seed=args.seed, min_per_stratum=args.min_per_stratum
+    )
+
+    out_path = Path(args.output)
+    write_jsonl(out_path, (items[i] for i in indices))
+    plan_path = Path(args.plan)
+    plan_path.parent.mkdir(parents=True, exist_ok=True)
+    with open_text(plan_path, "w") as f:
+        json.dump({"seed": args.seed, "data": args.data, "strata": strata}, f, indent=2)
+    print("Selected", len(indices), "of", len(items), "problems in", len(strata), "strata ->", out_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
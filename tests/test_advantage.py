@@ -11,6 +11,7 @@ from dca.advantage import (
     advantage_dca_grpo,
     advantage_dca_rloo,
     advantage_vanilla_grpo,
+    blend_length_stats,
     rewards_coupled_lp,
     length_score_z_sigmoid,
     is_correct,
@@ -82,3 +83,21 @@ class TestAdvantage(unittest.TestCase):
     def test_is_correct(self):
         self.assertTrue(is_correct("64", "64"))
         self.assertFalse(is_correct("65", "64"))
+
+    def test_length_baseline_blend(self):
+        """A historical baseline gives a lone correct response a length advantage; None is a no-op."""
+        mask = np.array([True, False, False, False])
+        lengths = np.array([100.0, 400.0, 500.0, 600.0])
+        np.testing.assert_allclose(advantage_dca_grpo(mask, lengths, beta=0.2, length_baseline=None),
+                                   advantage_dca_grpo(mask, lengths, beta=0.2))
+        plain = advantage_dca_grpo(mask, lengths, beta=0.2)
+        shorter = advantage_dca_grpo(mask, lengths, beta=0.2, length_baseline=(300.0, 50.0 ** 2, 4.0))
+        longer = advantage_dca_grpo(mask, lengths, beta=0.2, length_baseline=(50.0, 20.0 ** 2, 4.0))
+        self.assertGreater(shorter[0], plain[0])
+        self.assertLess(longer[0], plain[0])
+        np.testing.assert_allclose(shorter[1:], plain[1:])
+        rloo = advantage_dca_rloo(mask, lengths, beta=0.2, length_baseline=(300.0, 50.0 ** 2, 4.0))
+        self.assertGreater(rloo[0], advantage_dca_rloo(mask, lengths, beta=0.2)[0])
+        mu, sd = blend_length_stats(np.array([100.0, 300.0]), (200.0, 100.0 ** 2, 2.0))
+        self.assertAlmostEqual(mu, 200.0)
+        self.assertAlmostEqual(sd, 100.0)
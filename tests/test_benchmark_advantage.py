@@ -0,0 +1,68 @@
+"""Tests for the regression gate of scripts/benchmark_advantage.py (compare / merge, no timing)."""
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+SCRIPT = REPO / "scripts" / "benchmark_advantage.py"
+
+
+def load_script():
+    spec = importlib.util.spec_from_file_location("benchmark_advantage", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def report(**cases):
+    """{case: (best_s, median_s)} -> run report."""
+    return {"meta": {"runs": 1}, "results": {
+        k: {"best_s": b, "median_s": m, "responses_per_s": 1.0 / b} for k, (b, m) in cases.items()}}
+
+
+class TestBenchmarkCompare(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bench = load_script()
+
+    def test_compare(self):
+        baseline = report(slow=(1.0e-3, 1.0e-3), noisy=(1.0e-3, 1.5e-3), tiny=(2e-5, 2e-5), steady=(1e-3, 1e-3),
+                          gone=(1e-3, 1e-3))
+        current = report(slow=(1.9e-3, 2.0e-3), noisy=(2.0e-3, 2.4e-3), tiny=(8e-5, 8e-5), steady=(0.9e-3, 1.1e-3),
+                         new=(1e-3, 1e-3))
+        rows = {r["case"]: r for r in self.bench.compare(current, baseline, 0.25, min_runtime=1e-4, abs_floor=2e-5)}
+        self.assertEqual(set(rows), {"slow", "noisy", "tiny", "steady"})  # only cases in both runs
+        self.assertAlmostEqual(rows["slow"]["ratio"], 2.0)  # medians, not best times
+        self.assertTrue(rows["slow"]["regression"])
+        # x1.6 but the baseline's own spread is 50%: tolerance 75%
+        self.assertAlmostEqual(rows["noisy"]["tolerance"], 0.75)
+        self.assertFalse(rows["noisy"]["regression"])
+        # x4 on a 20 us case: below min_runtime, reported but not gated
+        self.assertFalse(rows["tiny"]["gated"])
+        self.assertFalse(rows["tiny"]["regression"])
+        self.assertFalse(rows["steady"]["regression"])
+        self.assertEqual(self.bench.compare(current, baseline, 0.25)[0]["case"], "tiny")  # sorted slowest first
+        # absolute floor: +1 ms is not enough when the floor is 2 ms
+        self.assertFalse(self.bench.compare(current, baseline, 0.25, abs_floor=2e-3)[0]["regression"])
+        self.assertTrue({r["case"] for r in self.bench.compare(current, baseline, 0.25) if r["regression"]}
+                        >= {"slow", "tiny"})
+
+    def test_merge_widens_spread(self):
+        fast = report(case=(1.0e-3, 1.1e-3))
+        slow = report(case=(1.6e-3, 1.7e-3), other=(1e-3, 1e-3))
+        merged = self.bench.merge(fast, slow)
+        self.assertEqual(merged["meta"]["runs"], 2)
+        self.assertEqual((merged["results"]["case"]["best_s"], merged["results"]["case"]["median_s"]), (1.0e-3, 1.7e-3))
+        self.assertIn("other", merged["results"])
+        self.assertEqual(fast["results"]["case"]["median_s"], 1.1e-3)  # inputs untouched
+        # a run in the slow mode is within the merged baseline
+        row = self.bench.compare(slow, merged, 0.25, min_runtime=1e-4)[0]
+        self.assertFalse(row["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""Unit tests for token cost accounting."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.cost import TokenUsage, cost_report
+
+
+class TestCost(unittest.TestCase):
+    def test_token_usage_summary(self):
+        usage = TokenUsage(max_tokens=1000, cap_fraction=0.9)
+        usage.update([100, 200, 950])
+        usage.update([1000])
+        s = usage.summary()
+        self.assertEqual(s["problems"], 2)
+        self.assertEqual(s["rollouts"], 4)
+        self.assertAlmostEqual(s["total_tokens"], 2250)
+        self.assertAlmostEqual(s["near_cap_frac"], 0.5)
+        self.assertEqual(s["max"], 1000)
+
+    def test_cost_report_savings(self):
+        cand = TokenUsage().update([100] * 10)
+        base = TokenUsage().update([200] * 10)
+        report = cost_report(cand, base, tokens_per_sec=1000, cost_per_million_tokens=2.0)
+        savings = report["savings_at_candidate_volume"]
+        self.assertAlmostEqual(savings["token_reduction_frac"], 0.5)
+        self.assertAlmostEqual(savings["tokens_saved"], 1000)
+        self.assertAlmostEqual(savings["throughput_speedup"], 2.0)
+        self.assertAlmostEqual(savings["cost_tokens_saved"], 1000 / 1e6 * 2.0)
+        self.assertAlmostEqual(report["candidate"]["projection"]["generation_hours"], 1.0 / 3600)
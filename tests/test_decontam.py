@@ -0,0 +1,81 @@
+"""Unit tests for MinHash/LSH decontamination."""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.decontam import LSHIndex, MinHasher, cached_signatures, find_overlaps, jaccard, normalize_tokens
+
+
+def random_questions(n, rng, vocab=2000):
+    return [" ".join("w{}".format(rng.randrange(vocab)) for _ in range(rng.randint(15, 40))) for _ in range(n)]
+
+
+class TestDecontam(unittest.TestCase):
+    def test_normalization(self):
+        self.assertEqual(normalize_tokens("What is $\\frac{1}{2}$, Bob?"), ["what", "is", "frac", "1", "2", "bob"])
+        hasher = MinHasher(ngram=3)
+        self.assertEqual(hasher.shingles("a b"), {"a b"})
+        self.assertEqual(hasher.shingles("a b c d"), {"a b c", "b c d"})
+
+    def test_signature_estimates_jaccard(self):
+        hasher = MinHasher(num_perm=256, ngram=2)
+        a = " ".join("t{}".format(i) for i in range(60))
+        b = " ".join("t{}".format(i) for i in range(20, 80))
+        sigs = hasher.signatures([a, b, ""])
+        exact = jaccard(hasher.shingles(a), hasher.shingles(b))
+        self.assertAlmostEqual(float((sigs[0] == sigs[1]).mean()), exact, delta=0.08)
+        self.assertTrue((sigs[2] == 0xFFFFFFFF).all())
+        # order of texts in a batch does not change a text's signature
+        np.testing.assert_array_equal(hasher.signatures([b])[0], sigs[1])
+
+    def test_find_overlaps_matches_brute_force(self):
+        rng = random.Random(0)
+        test = random_questions(300, rng)
+        train = random_questions(2000, rng)
+        for k in range(20):
+            toks = test[k * 11].split()
+            toks[rng.randrange(len(toks))] = "edited"
+            train[k * 97] = ", ".join(toks).upper()
+        hasher = MinHasher()
+        found = find_overlaps(train, test, threshold=0.6, hasher=hasher)
+        train_sh = [hasher.shingles(t) for t in train]
+        test_sh = [hasher.shingles(t) for t in test]
+        expected = sorted(i for i in range(len(train)) if any(jaccard(train_sh[i], t) >= 0.6 for t in test_sh))
+        self.assertEqual([o["train_index"] for o in found], expected)
+        self.assertGreaterEqual(len(found), 10)
+        for o in found:
+            self.assertEqual(o["test_index"], o["train_index"] // 97 * 11)
+
+    def test_empty_inputs(self):
+        hasher = MinHasher()
+        index = LSHIndex(hasher.signatures([]))
+        self.assertEqual(index.query(hasher.signatures(["a b c d e f"])).shape, (0, 2))
+        self.assertEqual(find_overlaps([], ["x"], hasher=hasher), [])
+
+    def test_signature_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            old = os.environ.get("DCA_CACHE_DIR")
+            os.environ["DCA_CACHE_DIR"] = os.path.join(tmp, "cache")
+            try:
+                path = Path(tmp) / "train.jsonl"
+                path.write_text("x\n")
+                hasher = MinHasher(num_perm=16)
+                first = cached_signatures(path, lambda: ["one two three four five"], hasher)
+                again = cached_signatures(path, lambda: self.fail("cache miss"), hasher)
+                np.testing.assert_array_equal(first, again)
+                path.write_text("y\n")
+                changed = cached_signatures(path, lambda: ["six seven eight nine ten"], hasher)
+                self.assertFalse((changed == first).all())
+            finally:
+                if old is None:
+                    os.environ.pop("DCA_CACHE_DIR", None)
+                else:
+                    os.environ["DCA_CACHE_DIR"] = old
@@ -0,0 +1,115 @@
+"""Unit tests for the vectorized DCA-GRPO pass and the diagnostics ring buffer."""
+
+import io
+import json
+import math
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.advantage import advantage_dca_grpo, advantage_dca_grpo_batch
+from dca.diagnostics import FIELDS, DiagnosticsRing, iter_records, main, read_ring
+from dca.verl_integration import compute_advantage, compute_advantage_for_verl
+from dca.slime_integration import compute_advantage_for_slime
+
+
+class TestDiagnostics(unittest.TestCase):
+    def test_batch_matches_per_group(self):
+        rng = np.random.default_rng(0)
+        for G in (1, 2, 8):
+            mask = rng.random((64, G)) < rng.random((64, 1))
+            lengths = rng.integers(10, 3000, (64, G)).astype(float)
+            lengths[:3] = 700.0  # sigma_len < eps
+            baselines = [None if i % 2 else (rng.uniform(100, 900), rng.uniform(0, 1e5), 4.0) for i in range(64)]
+            for dynamic in (True, False):
+                for base in (None, baselines):
+                    expected = np.stack([
+                        advantage_dca_grpo(mask[i], lengths[i], 0.2, use_dynamic=dynamic,
+                                           length_baseline=None if base is None else base[i])
+                        for i in range(64)
+                    ])
+                    got = advantage_dca_grpo_batch(mask, lengths, 0.2, use_dynamic=dynamic, length_baselines=base)
+                    np.testing.assert_allclose(got, expected, atol=1e-10, rtol=0)
+
+    def test_compute_advantage_dca_accepts_longer_inputs(self):
+        # the per-group path ignored mask / length entries past G; the vectorized one does too
+        rewards = np.array([[1.0, 0.0, 1.0], [1.0, 1.0, 0.0]])
+        lengths = np.array([[100.0, 200, 300, 999], [400, 500, 600, 999]])
+        expected = compute_advantage(rewards, lengths[:, :3], mode="dca")
+        np.testing.assert_allclose(compute_advantage(rewards, lengths, mode="dca"), expected)
+        one = compute_advantage(rewards[0], lengths[0], np.array([True, False, True, False]), mode="dca")
+        np.testing.assert_allclose(one, expected[0])
+
+    def test_summary_fields(self):
+        mask = np.array([[True, True, False, False], [True, True, True, True], [False] * 4, [True, False, False, False]])
+        lengths = np.array([[100.0, 300, 50, 50], [200, 200, 200, 200], [10, 20, 30, 40], [400, 1, 1, 1]])
+        summary = {}
+        adv = advantage_dca_grpo_batch(mask, lengths, 0.2, diagnostics=summary)
+        self.assertEqual(summary["groups"], 4)
+        self.assertAlmostEqual(summary["rho_mean"], (0.5 + 1 + 0 + 0.25) / 4)
+        np.testing.assert_array_equal(summary["rho_hist"], [1, 0, 1, 0, 0, 1, 0, 0, 0, 1])
+        self.assertEqual(summary["degenerate_frac"], 0.5)
+        self.assertEqual(summary["sigma_eps_fires"], 2)  # all-equal group and the single correct one
+        self.assertAlmostEqual(summary["len_std_mean"], (100.0 + 0.0) / 2)
+        # |A_acc|: 1 for each response of the 2-of-4 group; the 1-of-4 group sums to 2 * sqrt(3)
+        self.assertAlmostEqual(summary["acc_abs_mean"], (4 + 2 * np.sqrt(3)) / 16, places=6)
+        self.assertEqual(adv.shape, (4, 4))
+        self.assertAlmostEqual(summary["len_to_acc"], summary["len_abs_mean"] / summary["acc_abs_mean"])
+
+    def test_ring_wraps_and_resumes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "diag.ring"
+            with DiagnosticsRing(path, capacity=4) as ring:
+                for k in range(6):
+                    ring({"groups": k, "rho_hist": np.arange(10)})
+                records, names, written = read_ring(path)
+            self.assertEqual(names, list(FIELDS))
+            self.assertEqual(written, 6)
+            self.assertEqual(records[:, names.index("groups")].tolist(), [2, 3, 4, 5])
+            self.assertEqual(records[:, names.index("step")].tolist(), [2, 3, 4, 5])
+            self.assertEqual(records[0, names.index("rho_hist_9")], 9)
+            self.assertTrue(math.isnan(records[0, names.index("rho_mean")]))
+            with DiagnosticsRing(path, capacity=4) as ring:  # same layout: appended to
+                self.assertEqual(ring.written, 6)
+                ring({"groups": 6})
+            self.assertEqual([r["groups"] for r in iter_records(path, since=5)], [5, 6])
+            with DiagnosticsRing(path, capacity=8) as ring:  # different layout: recreated
+                self.assertEqual(ring.written, 0)
+
+    def test_hook_writes_ring_and_cli_reads(self):
+        batch = {"rewards": np.array([1.0, 0.0, 1.0, 1.0, 1.0, 1.0]),
+                 "response_lengths": np.array([100, 200, 300, 400, 500, 600])}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "diag.ring"
+            with DiagnosticsRing(path, capacity=16) as ring:
+                plain = compute_advantage_for_verl(batch, adv_mode="dca", group_size=3)
+                adv = compute_advantage_for_verl(batch, adv_mode="dca", group_size=3, diagnostics=ring)
+                np.testing.assert_allclose(adv, plain)
+                # paths without a summary fail loudly instead of writing nothing
+                for kwargs in ({"adv_mode": "vanilla", "group_size": 3},
+                               {"adv_mode": "dca", "group_size": 3, "use_rloo": True},
+                               {"adv_mode": "dca", "group_sizes": [2, 4]}):
+                    with self.assertRaises(ValueError):
+                        compute_advantage_for_verl(batch, diagnostics=ring, **kwargs)
+                with self.assertRaises(ValueError):
+                    compute_advantage_for_slime(batch, adv_mode="grpo_lp", group_size=3, diagnostics={})
+                summary = {}
+                compute_advantage_for_verl(batch, adv_mode="dca", group_size=3, diagnostics=summary)
+                self.assertEqual(summary["degenerate_frac"], 0.5)
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(main([str(path), "--last", "5"]), 0)
+            rows = [json.loads(line) for line in out.getvalue().splitlines()]
+            self.assertEqual(len(rows), 1)
+            self.assertEqual(rows[0]["groups"], 2)
+            self.assertEqual(rows[0]["rho_hist_9"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
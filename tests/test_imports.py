@@ -0,0 +1,70 @@
+"""Import-time budget and lazy package attributes (fresh interpreters via subprocess)."""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+# Budget (ms) for the cumulative `python -X importtime` cost of `import dca.data_utils` (best of
+# 3 runs). It measures ~25 ms; the default leaves room for slow shared runners while still
+# failing if NumPy (~100 ms alone) creeps in. DCA_IMPORT_BUDGET_MS can only tighten it.
+DEFAULT_IMPORT_BUDGET_MS = 150.0
+IMPORT_BUDGET_MS = min(DEFAULT_IMPORT_BUDGET_MS, float(os.environ.get("DCA_IMPORT_BUDGET_MS", DEFAULT_IMPORT_BUDGET_MS)))
+
+NUMPY_FREE = ("dca", "dca.data_utils", "dca.io", "dca.profiling", "dca.verl_integration", "dca.slime_integration")
+
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=str(REPO), capture_output=True, text=True, check=True)
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of `module` in a fresh interpreter, from -X importtime (stderr)."""
+    err = run_python("import " + module, "-X", "importtime").stderr
+    for line in err.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000.0
+    raise AssertionError("no importtime line for {}:\n{}".format(module, err))
+
+
+class TestImports(unittest.TestCase):
+    def test_grading_paths_do_not_import_numpy(self):
+        for module in NUMPY_FREE:
+            out = run_python("import sys, {0}; print('numpy' in sys.modules)".format(module)).stdout
+            self.assertEqual(out.strip(), "False", module)
+        code = ("import sys; from dca.data_utils import is_equivalent_math; "
+                "print(is_equivalent_math('so #### 1,000', '1000'), 'numpy' in sys.modules)")
+        self.assertEqual(run_python(code).stdout.split(), ["True", "False"])
+
+    def test_import_time_budget(self):
+        best = min(import_time_ms("dca.data_utils") for _ in range(3))
+        self.assertLess(best, IMPORT_BUDGET_MS, "import dca.data_utils took {:.1f} ms".format(best))
+
+    def test_lazy_attributes(self):
+        import dca
+        import dca.advantage
+        import dca.slime_integration as slime
+        import dca.verl_integration as verl
+        from dca import advantage_dca_grpo
+        from dca.verl_integration.reward_shapers import reward_for_verl
+
+        self.assertIs(advantage_dca_grpo, dca.advantage.advantage_dca_grpo)
+        self.assertIs(slime.reward_for_slime, reward_for_verl)
+        self.assertIs(slime.compute_advantage, verl.compute_advantage)
+        self.assertIs(dca.toy_sim, sys.modules["dca.toy_sim"])  # submodule without an explicit import
+        self.assertIs(verl.whitening.GlobalWhitener, verl.GlobalWhitener)
+        for pkg in (dca, verl, slime):
+            self.assertTrue(set(pkg.__all__) <= set(dir(pkg)))
+            for name in pkg.__all__:
+                getattr(pkg, name)
+            with self.assertRaises(AttributeError):
+                getattr(pkg, "no_such_name")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Unit tests for transparent compressed JSONL I/O."""
+
+import gzip
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.io import detect_codec, iter_jsonl, write_jsonl, strip_compression_suffix, open_text
+from dca.data_utils import load_dataset, load_math
+
+try:
+    import zstandard  # noqa: F401
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+class TestIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.rows = [{"question": "q{}".format(i), "answer": "x #### {}".format(i)} for i in range(50)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_plain_and_gzip(self):
+        for name in ("r.jsonl", "r.jsonl.gz"):
+            write_jsonl(self.dir / name, self.rows)
+            self.assertEqual(list(iter_jsonl(self.dir / name)), self.rows)
+        self.assertEqual(detect_codec(self.dir / "r.jsonl.gz"), "gzip")
+        self.assertIsNone(detect_codec(self.dir / "r.jsonl"))
+
+    @unittest.skipUnless(HAS_ZSTD, "zstandard not installed")
+    def test_roundtrip_zstd(self):
+        write_jsonl(self.dir / "r.jsonl.zst", self.rows)
+        self.assertEqual(detect_codec(self.dir / "r.jsonl.zst"), "zstd")
+        self.assertEqual(list(iter_jsonl(self.dir / "r.jsonl.zst")), self.rows)
+
+    def test_magic_bytes_without_suffix(self):
+        path = self.dir / "results.jsonl"
+        with gzip.open(path, "wt") as f:
+            f.write(json.dumps(self.rows[0]) + "\n")
+        self.assertEqual(detect_codec(path), "gzip")
+        self.assertEqual(list(iter_jsonl(path)), self.rows[:1])
+
+    def test_loaders_read_compressed(self):
+        write_jsonl(self.dir / "gsm8k_test.jsonl.gz", self.rows)
+        data = load_dataset(str(self.dir / "gsm8k_test.jsonl.gz"))
+        self.assertEqual(len(data), 50)
+        self.assertEqual(data[3]["answer"], "3")
+        write_jsonl(self.dir / "amc23.jsonl.gz", self.rows)
+        self.assertEqual(load_dataset(str(self.dir / "amc23.jsonl.gz"))[0]["dataset"], "amc23")
+        with open_text(self.dir / "math500.json.gz", "w") as f:
+            json.dump([{"problem": "p", "solution": "so \\\\boxed{12}", "level": 3}], f)
+        self.assertEqual(load_math(str(self.dir / "math500.json.gz"))[0]["answer"], "12")
+        self.assertEqual(strip_compression_suffix("a/b.jsonl.zst"), Path("a/b.jsonl"))
@@ -0,0 +1,82 @@
+"""Unit tests for lazy, index-backed dataset loading."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.data_utils import load_dataset, load_math
+from dca.io import cache_path, write_jsonl
+from dca.lazy_data import open_dataset
+
+
+class TestLazyData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self._old_cache = os.environ.get("DCA_CACHE_DIR")
+        os.environ["DCA_CACHE_DIR"] = str(self.dir / "cache")
+        self.gsm = [{"question": "q{} é".format(i), "answer": "work #### {}".format(i)} for i in range(101)]
+        write_jsonl(self.dir / "gsm8k_train.jsonl", self.gsm)
+        self.math = [{"problem": "p{}".format(i), "solution": "\\boxed{%d}" % i, "level": "Level %d" % (i % 5)}
+                     for i in range(40)]
+        with open(self.dir / "math_train.json", "w") as f:
+            json.dump(self.math, f, indent=2)
+
+    def tearDown(self):
+        if self._old_cache is None:
+            os.environ.pop("DCA_CACHE_DIR", None)
+        else:
+            os.environ["DCA_CACHE_DIR"] = self._old_cache
+        self.tmp.cleanup()
+
+    def test_lazy_matches_eager(self):
+        for name in ("gsm8k_train.jsonl", "math_train.json"):
+            path = str(self.dir / name)
+            eager = load_dataset(path)
+            lazy = load_dataset(path, lazy=True)
+            self.assertEqual(len(lazy), len(eager))
+            self.assertEqual(list(lazy), eager)
+            self.assertEqual(lazy[len(eager) - 1], eager[-1])
+
+    def test_index_is_cached_and_invalidated(self):
+        path = self.dir / "gsm8k_train.jsonl"
+        open_dataset(path)
+        self.assertTrue(cache_path(path, ".idx").exists())
+        self.assertEqual(open_dataset(path)[7]["answer"], "7")
+        write_jsonl(path, self.gsm[:10])
+        os.utime(path, ns=(0, 12345))
+        self.assertEqual(len(open_dataset(path)), 10)
+
+    def test_slicing_and_sharding(self):
+        ds = open_dataset(self.dir / "gsm8k_train.jsonl")
+        view = ds[10:20:2]
+        self.assertEqual(len(view), 5)
+        self.assertEqual(view[1]["answer"], "12")
+        shards = [ds.shard(r, 4) for r in range(4)]
+        self.assertEqual(sum(len(s) for s in shards), len(ds))
+        self.assertEqual(shards[1][0]["answer"], "1")
+        blocks = [ds.shard(r, 4, contiguous=True) for r in range(4)]
+        self.assertEqual([x["answer"] for b in blocks for x in b], [str(i) for i in range(101)])
+
+    def test_compressed_and_wrapped_sources(self):
+        write_jsonl(self.dir / "gsm8k_c.jsonl.gz", self.gsm)
+        self.assertEqual(open_dataset(self.dir / "gsm8k_c.jsonl.gz")[100]["answer"], "100")
+        with open(self.dir / "math_wrapped.json", "w") as f:
+            json.dump({"data": self.math}, f)
+        ds = open_dataset(self.dir / "math_wrapped.json")
+        self.assertEqual(list(ds), load_math(str(self.dir / "math_train.json")))
+
+    def test_crlf_json_array(self):
+        # byte offsets must not shift when newlines are \r\n (Windows-written dumps)
+        text = json.dumps(self.math[:5], indent=2, ensure_ascii=False).replace("\n", "\r\n")
+        path = self.dir / "math_crlf.json"
+        path.write_bytes(text.encode("utf-8"))
+        ds = open_dataset(path)
+        self.assertEqual(len(ds), 5)
+        self.assertEqual([ds[i] for i in range(5)], load_math(str(path)))
+        self.assertEqual(ds[4]["question"], "p4")
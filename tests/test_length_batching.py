@@ -0,0 +1,104 @@
+"""Unit tests for length-bucketed generation batches."""
+
+import sys
+import unittest
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.length_batching import LengthBucketedComposer
+from dca.prompt_stats import DifficultyAwareSampler
+from dca.sampler import MultiSourceSampler
+
+
+def run(composer, true_len, rng, steps):
+    """Generate `steps` batches with noisy lengths around each prompt's true length."""
+    for _ in range(steps):
+        ids = composer.next_batch()
+        assert len(set(ids)) == len(ids), "prompt repeated within a batch"
+        lengths = [np.minimum(rng.normal(true_len[i], 0.1 * true_len[i], composer.group_size), 16384) for i in ids]
+        composer.observe(ids, lengths)
+    return composer.report()
+
+
+class TestLengthBatching(unittest.TestCase):
+    def test_bucketing_improves_padding_efficiency(self):
+        rng = np.random.default_rng(0)
+        n = 400
+        true_len = np.exp(rng.uniform(np.log(150), np.log(12000), n))
+        ids = iter(rng.integers(0, n, 200_000).tolist())
+        bucketed = LengthBucketedComposer(ids, token_budget=400_000, group_size=4, pool_size=512)
+        rep = run(bucketed, true_len, rng, 250)  # includes warm-up batches of unseen prompts
+        mixed = LengthBucketedComposer(iter(rng.integers(0, n, 200_000).tolist()), token_budget=400_000,
+                                       group_size=4, boundaries=(), pool_size=512)
+        base = run(mixed, true_len, rng, 100)
+        self.assertGreater(rep["padding_efficiency"], 0.5)
+        self.assertGreater(rep["padding_efficiency"], 1.8 * base["padding_efficiency"])
+        self.assertGreater(rep["predicted_padding_efficiency"], 0.6)
+
+    def test_budget_and_every_prompt_emitted(self):
+        composer = LengthBucketedComposer(iter(range(50)), token_budget=4000, group_size=2,
+                                          default_length=300, pool_size=16, max_wait=2)
+        composer.observe(list(range(0, 50, 2)), [[1000.0, 1000.0]] * 25)  # even prompts are long
+        seen = []
+        for batch in composer:
+            longest = max(composer.expected_length(i) for i in batch)
+            self.assertTrue(len(batch) == 1 or len(batch) * 2 * longest <= 4000)
+            seen.extend(batch)
+        self.assertEqual(sorted(seen), list(range(50)))
+        self.assertEqual(composer.next_batch(), [])
+
+    def test_wraps_samplers(self):
+        sampler = MultiSourceSampler([["a"] * 10, ["b"] * 30], weights=[1, 3], seed=0)
+        composer = LengthBucketedComposer(sampler, token_budget=8 * 1024, pool_size=32)
+        ids = composer.next_batch()
+        self.assertEqual(len(ids), 8)
+        self.assertTrue(all(isinstance(s, int) and isinstance(i, int) for s, i in ids))
+        self.assertLessEqual(set(composer.records(ids)), {"a", "b"})
+        batches = [composer.next_batch() for _ in range(20)]
+        for batch in batches:
+            self.assertEqual(len(set(batch)), len(batch))  # 40 prompts, drawn with replacement
+        drawn = Counter(s for batch in batches for s, _ in batch)
+        self.assertGreater(drawn[1], drawn[0])
+
+        difficulty = DifficultyAwareSampler(100, seed=1)
+        composer = LengthBucketedComposer(difficulty, token_budget=4 * 500, default_length=500, pool_size=12)
+        batch = composer.next_batch()
+        self.assertEqual(len(batch), 4)
+        self.assertTrue(all(isinstance(i, int) for i in batch))
+
+    def test_default_pool_fits_small_sampler(self):
+        difficulty = DifficultyAwareSampler(100, seed=0)
+        composer = LengthBucketedComposer(difficulty, token_budget=64_000, group_size=8)
+        self.assertEqual(composer.pool_size, 100)
+        for step in range(1, 6):
+            self.assertTrue(composer.next_batch())
+            self.assertEqual(difficulty.step, step)  # one sampler step per training batch
+
+        # an explicit pool larger than the population holds each prompt at most once
+        composer = LengthBucketedComposer(DifficultyAwareSampler(100, seed=0), token_budget=64_000, pool_size=250)
+        self.assertEqual(composer.pool_size, 100)
+
+    def test_no_prompt_repeated_in_a_batch(self):
+        rng = np.random.default_rng(0)
+        true_len = rng.uniform(100, 2000, 100)
+        difficulty = DifficultyAwareSampler(100, seed=0)
+        composer = LengthBucketedComposer(difficulty, token_budget=640_000, group_size=8)
+        rep = run(composer, true_len, rng, 30)  # asserts distinct ids per batch
+        self.assertEqual(difficulty.step, 30)
+        self.assertGreater(rep["prompts_per_batch"], 20)
+
+        # an iterator repeating a waiting id: the repeat is emitted later, not dropped
+        composer = LengthBucketedComposer(iter([1, 2, 1, 3, 1]), token_budget=10_000, default_length=100, pool_size=8)
+        batches = list(composer)
+        self.assertEqual(batches[0], [1, 2, 3])
+        self.assertEqual(sorted(i for b in batches for i in b), [1, 1, 1, 2, 3])
+        for batch in batches:
+            self.assertEqual(len(set(batch)), len(batch))
+
+
+if __name__ == "__main__":
+    unittest.main()
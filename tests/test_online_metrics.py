@@ -0,0 +1,73 @@
+"""Unit tests for streaming accumulators and the online rollout metrics observer."""
+
+import sys
+import unittest
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.streaming import RunningStats, QuantileSketch
+from dca.online_metrics import RolloutMetrics
+from dca.verl_integration import compute_advantage_for_verl
+from dca.slime_integration import compute_advantage_for_slime
+
+
+class TestStreaming(unittest.TestCase):
+    def test_running_stats_merge_matches_numpy(self):
+        rng = np.random.default_rng(0)
+        x = rng.normal(5.0, 2.0, size=1000)
+        a = RunningStats().update(x[:300])
+        b = RunningStats().update(x[300:])
+        a.merge(b)
+        self.assertEqual(a.count, 1000)
+        self.assertAlmostEqual(a.mean, x.mean(), places=10)
+        self.assertAlmostEqual(a.std, x.std(), places=10)
+
+    def test_quantile_sketch_relative_error_and_merge(self):
+        rng = np.random.default_rng(1)
+        x = rng.lognormal(6.0, 1.0, size=20000)
+        a = QuantileSketch(alpha=0.01).update(x[:5000])
+        b = QuantileSketch(alpha=0.01).update(x[5000:])
+        a.merge(b)
+        for q in (0.5, 0.9, 0.99):
+            exact = np.quantile(x, q)
+            self.assertLess(abs(a.quantile(q) - exact) / exact, 0.03)
+        restored = QuantileSketch.from_dict(a.to_dict())
+        self.assertEqual(restored.quantile(0.9), a.quantile(0.9))
+
+
+class TestRolloutMetrics(unittest.TestCase):
+    def test_observe_and_snapshot(self):
+        obs = RolloutMetrics(rho_bins=4)
+        correct = np.array([[1, 1, 1, 1], [0, 0, 0, 0], [1, 0, 1, 0]], dtype=bool)
+        lengths = np.array([[100, 200, 300, 400], [50, 60, 70, 80], [10, 20, 30, 40]])
+        obs.observe(correct, lengths, data_sources=["gsm8k", "math", "math"])
+        snap = obs.snapshot(step=1)
+        self.assertEqual(snap["groups"], 3)
+        self.assertAlmostEqual(snap["degenerate_frac"], 2 / 3)
+        self.assertAlmostEqual(snap["accuracy"]["gsm8k"]["step"], 1.0)
+        self.assertAlmostEqual(snap["accuracy"]["math"]["step"], 0.25)
+        self.assertEqual(snap["rho"]["hist"], [1, 0, 1, 1])
+        self.assertAlmostEqual(snap["length"]["mean"], lengths.mean())
+        # Next step starts fresh; EMA and cumulative carry over
+        obs.observe(np.zeros((1, 4), dtype=bool), np.full((1, 4), 100), data_sources=["gsm8k"])
+        snap2 = obs.snapshot(step=2)
+        self.assertEqual(snap2["groups"], 1)
+        self.assertAlmostEqual(snap2["accuracy"]["gsm8k"]["ema"], 0.9)
+        self.assertAlmostEqual(snap2["accuracy"]["gsm8k"]["cumulative"], 0.5)
+        self.assertAlmostEqual(snap2["degenerate_frac_cumulative"], 3 / 4)
+
+    def test_hooks_feed_observer_without_changing_advantages(self):
+        batch = {
+            "rewards": np.array([1.0, 0.0, 1.0, 1.0, 0.0, 0.0]),
+            "response_lengths": np.array([100, 200, 300, 400, 500, 600]),
+            "data_source": np.array(["a"] * 3 + ["b"] * 3),
+        }
+        for hook in (compute_advantage_for_verl, compute_advantage_for_slime):
+            obs = RolloutMetrics()
+            adv = hook(batch, adv_mode="dca", group_size=3, observer=obs)
+            np.testing.assert_array_almost_equal(adv, hook(batch, adv_mode="dca", group_size=3))
+            snap = obs.snapshot()
+            self.assertAlmostEqual(snap["accuracy"]["a"]["step"], 2 / 3)
+            self.assertAlmostEqual(snap["accuracy"]["b"]["step"], 1 / 3)
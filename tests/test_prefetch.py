@@ -0,0 +1,65 @@
+"""Unit tests for the background prompt prefetcher."""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.data_utils import INSTRUCTION_SUFFIX, make_parquet_row
+from dca.prefetch import PromptPrefetcher, format_batch
+from dca.sampler import MultiSourceSampler
+
+
+def records(n, dataset="gsm8k"):
+    return [{"question": " q{} ".format(i), "answer": str(i), "dataset": dataset} for i in range(n)]
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_format_matches_parquet_rows(self):
+        batch = format_batch(records(2), [0, 1])
+        row = make_parquet_row(" q1 ", "1", "gsm8k", "math", 1, "train")
+        self.assertEqual(batch["prompt"][1], row["prompt"])
+        self.assertTrue(batch["prompt"][0][0]["content"].endswith(INSTRUCTION_SUFFIX))
+        self.assertEqual(batch["ground_truth"], ["0", "1"])
+        self.assertEqual(batch["data_source"], ["gsm8k", "gsm8k"])
+
+    def test_batches_and_partial_tail(self):
+        with PromptPrefetcher(records(10), batch_size=4, prefetch=2) as it:
+            batches = list(it)
+        self.assertEqual([len(b["index"]) for b in batches], [4, 4, 2])
+        self.assertEqual(sum((b["index"] for b in batches), []), list(range(10)))
+        with PromptPrefetcher(records(10), batch_size=4, drop_last=True) as it:
+            self.assertEqual(len(list(it)), 2)
+
+    def test_sampler_source_bounded(self):
+        sampler = MultiSourceSampler([records(5, "aime"), records(7, "math")], [1, 2], seed=3)
+        with PromptPrefetcher(sampler, batch_size=3, num_batches=4) as it:
+            batches = list(it)
+        self.assertEqual(len(batches), 4)
+        self.assertTrue(set(sum((b["data_source"] for b in batches), [])) <= {"aime", "math"})
+        self.assertEqual(sampler.step, 12)
+
+    def test_queue_fills_ahead_of_slow_consumer(self):
+        it = PromptPrefetcher(records(40), batch_size=2, prefetch=3)
+        next(it)
+        time.sleep(0.2)
+        self.assertEqual(it.stats()["queue_depth"], 3)
+        for _ in it:
+            time.sleep(0.001)
+        stats = it.stats()
+        it.close()
+        self.assertEqual(stats["batches"], 20)
+        self.assertLessEqual(stats["stalls"], 2)
+        self.assertGreater(stats["queue_depth_mean"], 0.0)
+
+    def test_errors_propagate(self):
+        def bad():
+            yield records(1)[0]
+            raise RuntimeError("loader failed")
+
+        with PromptPrefetcher(bad(), batch_size=1) as it:
+            next(it)
+            with self.assertRaises(RuntimeError):
+                next(it)
@@ -0,0 +1,98 @@
+"""Tests for the streaming / manifest pipeline of scripts/prepare_data.py (run as a subprocess)."""
+
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+SCRIPT = REPO / "scripts" / "prepare_data.py"
+OUTPUTS = ("train.jsonl", "val.jsonl", "test_gsm8k.jsonl")
+
+
+def load_script():
+    spec = importlib.util.spec_from_file_location("prepare_data", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_source(path: Path, questions):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for i, q in enumerate(questions):
+            f.write(json.dumps({"question": q, "answer": str(i)}) + "\n")
+
+
+class TestPrepareData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.out = self.root / "out"
+        # same basename in two directories: must not share a manifest entry / shard dir
+        self.src_a = self.root / "a" / "train.jsonl"
+        self.src_b = self.root / "b" / "train.jsonl"
+        write_source(self.src_a, ["What is {} plus one?".format(i) for i in range(5)])
+        write_source(self.src_b, ["How many legs do {} spiders have?".format(i) for i in range(3)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_script(self, *extra):
+        cmd = [sys.executable, str(SCRIPT), "--builtin_only", "--output_dir", str(self.out), "--chunk_size", "2",
+               "--source", str(self.src_a), "--source", str(self.src_b), *extra]
+        return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+
+    def read_outputs(self):
+        return {name: (self.out / name).read_bytes() for name in OUTPUTS}
+
+    def test_rerun_skip_and_rebuild(self):
+        self.run_script()
+        first = self.read_outputs()
+        questions = [json.loads(line)["question"] for line in first["train.jsonl"].decode().splitlines()]
+        self.assertEqual(len(questions), 5 + 5 + 3)  # built-in GSM8K samples, a, b
+        self.assertIn("What is 0 plus one?", questions)
+        self.assertIn("How many legs do 0 spiders have?", questions)
+        manifest = json.loads((self.out / "manifest.json").read_text())
+        self.assertEqual(len(manifest["sources"]), 3)
+
+        # unchanged inputs: every source and the merge are skipped
+        stdout = self.run_script()
+        self.assertIn("Outputs up to date", stdout)
+        self.assertEqual(stdout.count("Unchanged source, skipped"), 3)
+        self.assertEqual(self.read_outputs(), first)
+
+        # forced rebuild is byte-identical
+        self.run_script("--force")
+        self.assertEqual(self.read_outputs(), first)
+
+        # one changed source: only it is rebuilt
+        write_source(self.src_b, ["How many legs do {} ants have?".format(i) for i in range(3)])
+        stdout = self.run_script()
+        self.assertEqual(stdout.count("Unchanged source, skipped"), 2)
+        self.assertNotIn("Outputs up to date", stdout)
+        train = self.read_outputs()["train.jsonl"].decode()
+        self.assertIn("ants", train)
+        self.assertNotIn("spiders", train)
+        self.assertEqual(len(list((self.out / ".shards").iterdir())), 3)  # stale shard removed
+
+    def test_chunked_row_groups(self):
+        module = load_script()
+        self.assertEqual([len(c) for c in module.chunked(range(7), 3)], [3, 3, 1])
+        self.assertEqual(list(module.chunked([], 3)), [])
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow not installed (parquet row groups)")
+        self.run_script("--chunk_size", "4")
+        # train: shards of 5 + 5 + 3 rows, chunked per shard -> 2 + 2 + 1 row groups
+        self.assertEqual(pq.ParquetFile(str(self.out / "train.parquet")).num_row_groups, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
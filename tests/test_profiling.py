@@ -0,0 +1,99 @@
+"""Unit tests for hot-path timing instrumentation."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca import profiling
+from dca.data_utils import is_equivalent_math
+from dca.slime_integration import compute_advantage_for_slime
+from dca.verl_integration import compute_advantage_for_verl, reward_for_verl
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        profiling.reset()
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_disabled_records_nothing(self):
+        self.assertFalse(profiling.is_enabled())
+        with profiling.timer("stage"):
+            pass
+        profiling.count("events")
+        self.assertTrue(is_equivalent_math("42", "42.0"))
+        snap = profiling.snapshot()
+        self.assertEqual(snap["stages"], {})
+        self.assertEqual(snap["counters"], {})
+
+    def test_hot_paths_are_instrumented(self):
+        profiling.enable()
+        batch = {"rewards": reward_for_verl(np.array([1, 0, 1, 1]), np.array([10, 20, 30, 40])),
+                 "response_lengths": np.array([10, 20, 30, 40])}
+        compute_advantage_for_verl(batch, adv_mode="dca", group_size=2)
+        compute_advantage_for_slime(batch, adv_mode="dca", group_sizes=[1, 3])
+        is_equivalent_math("\\boxed{1/2}", "1/2")
+        with profiling.timer("evaluate.grade"):
+            profiling.count("rows", 3)
+        stages = profiling.snapshot()["stages"]
+        for name in ("reward_for_verl", "compute_advantage", "compute_advantage_ragged", "verl_hook",
+                     "slime_hook", "is_equivalent_math", "evaluate.grade"):
+            self.assertEqual(stages[name]["count"], 1, name)
+        self.assertEqual(profiling.snapshot()["counters"], {
+            "rows": 3,
+            "reward.responses": 4,
+            "hook.batches": 2,
+            "advantage.groups": 2 + 2,  # (2, 2) batch + ragged [1, 3]
+            "advantage.responses": 4 + 4,
+        })
+        compute_advantage_for_verl(batch, adv_mode="vanilla", group_size=2, compact=True)
+        counters = profiling.snapshot()["counters"]
+        self.assertEqual(counters["hook.responses_dropped"], 2)  # the all-correct group
+        self.assertEqual(counters["hook.tokens_saved"], 70.0)
+        self.assertLessEqual(stages["compute_advantage"]["total_s"], stages["verl_hook"]["total_s"])
+
+    def test_histogram_quantiles(self):
+        for seconds in [1e-6] * 50 + [1e-3] * 49 + [2.0]:
+            profiling.record("s", seconds)
+        s = profiling.snapshot()["stages"]["s"]
+        self.assertEqual(s["count"], 100)
+        self.assertEqual(sum(s["buckets"]), 100)
+        self.assertEqual(s["p50_s"], 1e-6)
+        self.assertTrue(1e-3 <= s["p90_s"] < 2e-3)
+        self.assertEqual(s["p99_s"], s["p90_s"])
+        self.assertEqual(s["max_s"], 2.0)
+        profiling.record("s", 100.0)  # beyond the last bound: +Inf bucket
+        self.assertEqual(profiling.snapshot()["stages"]["s"]["buckets"][-1], 1)
+
+    def test_exports(self):
+        profiling.enable()
+        profiling.record('odd "stage"', 3e-5)
+        profiling.count("graded")
+        text = profiling.to_prometheus()
+        self.assertIn("# TYPE dca_stage_seconds histogram", text)
+        self.assertIn('dca_stage_seconds_bucket{stage="odd \\"stage\\"",le="+Inf"} 1', text)
+        self.assertIn('dca_stage_seconds_count{stage="odd \\"stage\\""} 1', text)
+        self.assertIn('dca_events_total{name="graded"} 1', text)
+        with tempfile.TemporaryDirectory() as tmp:
+            profiling.export(os.path.join(tmp, "p.json"))
+            with open(os.path.join(tmp, "p.json")) as f:
+                self.assertEqual(json.load(f)["stages"]['odd "stage"']["count"], 1)
+            profiling.export(os.path.join(tmp, "p.prom"))
+            with open(os.path.join(tmp, "p.prom")) as f:
+                self.assertEqual(f.read(), text)
+        report = profiling.format_report()
+        self.assertIn('odd "stage"', report)
+        self.assertIn("counter graded = 1", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""Unit tests for per-prompt pass-rate statistics and rollout budgets."""
+
+import json
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.prompt_stats import (
+    DifficultyAwareSampler,
+    LengthBaselineStore,
+    PassRateStore,
+    RolloutBudgetScheduler,
+    degenerate_probability,
+    expected_signal,
+    group_signal,
+)
+from dca.verl_integration import compute_advantage_for_verl
+
+
+def simulate(scheduler, p_true, steps, rng, adaptive):
+    """Run `steps` rounds over all prompts; returns the scheduler report."""
+    ids = list(range(len(p_true)))
+    G = scheduler.group_size
+    for _ in range(steps):
+        if adaptive:
+            first = scheduler.initial_counts(ids)
+            draws = [rng.random(k) < p for k, p in zip(first, p_true)]
+            extra = scheduler.allocate_extra(ids, [int(d.sum()) for d in draws], first)
+            groups = [np.concatenate([d, rng.random(e) < p]) for d, e, p in zip(draws, extra, p_true)]
+        else:
+            groups = [rng.random(G) < p for p in p_true]
+        lengths = [np.full(g.size, 500.0) for g in groups]
+        scheduler.observe(ids, groups, lengths)
+        sizes = [g.size for g in groups]
+        batch = {"rewards": np.concatenate(groups).astype(float), "response_lengths": np.concatenate(lengths)}
+        adv = compute_advantage_for_verl(batch, adv_mode="dca", group_sizes=sizes)
+        assert adv.shape == (sum(sizes),) and np.all(np.isfinite(adv))
+    return scheduler.report()
+
+
+class TestPromptStats(unittest.TestCase):
+    def test_store_decay_lru_and_state(self):
+        store = PassRateStore(prior=(1, 1), decay=0.5, capacity=2)
+        store.update("a", 4, 4)
+        store.update("a", 0, 4)
+        self.assertEqual(store.posterior("a"), (1 + 2.0, 1 + 4.0))
+        store.update("b", 1, 2)
+        store.update("c", 1, 2)
+        self.assertNotIn("a", store)
+        restored = PassRateStore.from_state_dict(json.loads(json.dumps(store.state_dict())))
+        self.assertEqual(restored.posterior("c"), store.posterior("c"))
+
+    def test_expected_signal(self):
+        self.assertEqual(group_signal(0, 8), 0.0)
+        self.assertAlmostEqual(group_signal(4, 8), 8.0)
+        self.assertAlmostEqual(expected_signal(2, 4, 0, 1, 1), group_signal(2, 4))
+        # a confidently solved prompt gains almost nothing from extra rollouts
+        self.assertLess(expected_signal(4, 4, 4, 200, 1), 0.2)
+        self.assertGreater(expected_signal(0, 4, 4, 1, 1), 1.0)
+
+    def test_extra_rollouts_go_to_signal(self):
+        sched = RolloutBudgetScheduler(group_size=8, initial=4)
+        for _ in range(5):
+            sched.store.update("solved", 8, 8)
+            sched.store.update("hopeless", 0, 8)
+        ids = ["solved", "hopeless", "mixed", "new"]
+        first = sched.initial_counts(ids)
+        self.assertEqual(first, [2, 2, 4, 4])
+        extra = sched.allocate_extra(ids, [2, 0, 2, 0], first)  # solved 2/2, hopeless 0/2
+        self.assertEqual(extra[:2], [0, 0])
+        self.assertGreater(extra[2], extra[3])
+        self.assertLessEqual(sum(extra), 4 * 8 - sum(first))
+
+    def test_fewer_rollouts_per_signal_than_fixed(self):
+        rng = np.random.default_rng(0)
+        p_true = np.concatenate([np.zeros(40), np.ones(30), rng.uniform(0.1, 0.9, 30)])
+        fixed = simulate(RolloutBudgetScheduler(group_size=8), p_true, 6, np.random.default_rng(1), adaptive=False)
+        adaptive = simulate(RolloutBudgetScheduler(group_size=8), p_true, 6, np.random.default_rng(1), adaptive=True)
+        self.assertLess(adaptive["tokens_per_signal"], 0.8 * fixed["tokens_per_signal"])
+        self.assertLessEqual(adaptive["rollouts"], fixed["rollouts"])
+        self.assertTrue(math.isfinite(adaptive["tokens_per_useful_group"]))
+
+    def test_degenerate_probability(self):
+        self.assertAlmostEqual(degenerate_probability(1, 1, 8), 2 / 9)
+        self.assertGreater(degenerate_probability(50, 1, 8), 0.8)
+        store = PassRateStore()
+        store.update("p", 8, 8)
+        store.update("p", 0, 8)
+        self.assertEqual(store.degenerate_streak("p"), 2)
+        store.update("p", 3, 8)
+        self.assertEqual(store.degenerate_streak("p"), 0)
+
+    def test_difficulty_sampler_cuts_zero_signal_compute(self):
+        rng = np.random.default_rng(0)
+        n = 400
+        p_true = np.concatenate([np.zeros(160), np.ones(120), rng.uniform(0.15, 0.85, 120)])
+        sampler = DifficultyAwareSampler(n, group_size=8, window=5, seed=0)
+        for _ in range(80):
+            idx = sampler.sample(32)
+            self.assertEqual(len(set(idx.tolist())), 32)
+            correct = rng.binomial(8, p_true[idx])
+            sampler.observe(idx, correct, [8] * 32, tokens=[8 * 400.0] * 32)
+        report = sampler.report()
+        self.assertGreater(report["zero_signal_share_first"], 0.6)
+        self.assertLess(report["zero_signal_share_recent"], 0.5 * report["zero_signal_share_first"])
+        self.assertGreater(report["retired"], 0)
+        self.assertGreater(report["zero_signal_share_uniform_estimate"], 0.6)
+
+    def test_difficulty_sampler_resume(self):
+        a = DifficultyAwareSampler(50, seed=3, retire_after=1, revisit_after=2)
+        for _ in range(3):
+            idx = a.sample(8)
+            a.observe(idx, [0] * 8, [8] * 8)
+        state = json.loads(json.dumps(a.state_dict()))
+        b = DifficultyAwareSampler(50, seed=99)
+        b.load_state_dict(state)
+        np.testing.assert_array_equal(a.sample(8), b.sample(8))
+        self.assertEqual(a.report(), b.report())
+
+    def test_difficulty_sampler_batch_size_bounds(self):
+        sampler = DifficultyAwareSampler(10, seed=0)
+        self.assertEqual(sorted(sampler.sample(10).tolist()), list(range(10)))
+        for bad in (0, 11):
+            with self.assertRaises(ValueError):
+                sampler.sample(bad)
+        self.assertEqual(sampler.step, 1)
+
+    def test_length_store_ema_lru_and_snapshot(self):
+        store = LengthBaselineStore(decay=0.5, max_weight=3.0, capacity=2)
+        store.update("a", [100.0, 300.0])
+        self.assertEqual(store.baseline("a"), (200.0, 100.0 ** 2, 2.0))
+        store.update("a", [400.0])  # old weight 2 * 0.5 = 1, new 1 -> mean 300
+        mean, var, weight = store.baseline("a")
+        self.assertAlmostEqual(mean, 300.0)
+        self.assertAlmostEqual(var, (100.0 ** 2 + 100.0 ** 2 + 100.0 ** 2) / 2)
+        self.assertEqual(weight, 2.0)
+        store.update("a", [])  # no correct responses: unchanged
+        self.assertAlmostEqual(store.baseline("a")[0], 300.0)
+        store.update("b", [10.0] * 5)
+        self.assertEqual(store.baseline("b")[2], 3.0)  # capped at max_weight
+        store.update(("c", 1), [20.0])
+        self.assertNotIn("a", store)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "lengths.json"
+            live = LengthBaselineStore.load(path, snapshot_every=2)
+            live.observe(["b", ("c", 1)], [[True, False], [True, True]], [[10.0, 99.0], [20.0, 40.0]])
+            self.assertFalse(path.exists())
+            live.observe(["b"], [[True]], [[30.0]])
+            restored = LengthBaselineStore.load(path)
+            self.assertEqual(restored.steps, 2)
+            self.assertEqual(restored.baseline(("c", 1)), live.baseline(("c", 1)))
+            self.assertEqual(restored.baseline("b"), live.baseline("b"))
+
+    def test_length_store_in_hook_small_groups(self):
+        """With history, groups of G=4 with a single correct response still get length advantages."""
+        rng = np.random.default_rng(0)
+        store = LengthBaselineStore()
+        ids = [0, 1, 2]
+        for _ in range(5):
+            correct = np.tile([1.0, 1.0, 0.0, 0.0], 3)
+            batch = {"rewards": correct, "response_lengths": rng.normal(500.0, 50.0, 12), "index": np.repeat(ids, 4)}
+            compute_advantage_for_verl(batch, adv_mode="dca", group_size=4, length_store=store)
+        self.assertEqual(store.steps, 5)
+        batch = {"rewards": np.tile([1.0, 0.0, 0.0, 0.0], 3), "response_lengths": np.tile([300.0, 500, 500, 500], 3),
+                 "index": ids}
+        plain = compute_advantage_for_verl(batch, adv_mode="dca", group_size=4)
+        adv = compute_advantage_for_verl(batch, adv_mode="dca", group_size=4, length_store=store)
+        self.assertTrue(np.all(adv[::4] > plain[::4]))  # short vs. ~500-token history: rewarded
+        ragged = compute_advantage_for_verl(
+            {"rewards": [1.0, 0.0, 1.0, 0.0, 0.0], "response_lengths": [300.0, 500, 700, 500, 500], "index": [0, 1]},
+            adv_mode="dca", group_sizes=[2, 3], length_store=store,
+        )
+        self.assertGreater(ragged[0], 1.0)
+        self.assertLess(ragged[2], compute_advantage_for_verl(
+            {"rewards": [1.0, 0.0, 0.0], "response_lengths": [700.0, 500, 500]}, adv_mode="dca")[0])
+
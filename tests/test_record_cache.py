@@ -0,0 +1,76 @@
+"""Unit tests for the memory-mapped parsed-dataset cache."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca import record_cache
+from dca.data_utils import load_dataset
+from dca.io import write_jsonl
+from dca.record_cache import CachedRecords, level_number
+
+
+class TestRecordCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self._old_cache = os.environ.get("DCA_CACHE_DIR")
+        os.environ["DCA_CACHE_DIR"] = str(self.dir / "cache")
+        self.math_path = self.dir / "math500_test.json"
+        math = [{"problem": "p{} ∑".format(i), "solution": "so \\boxed{\\frac{%d}{2}}" % i,
+                 "level": "Level %d" % (i % 5 + 1)} for i in range(30)]
+        math.append({"problem": "int level", "solution": "\\boxed{7}", "level": 4})
+        with open(self.math_path, "w") as f:
+            json.dump(math, f)
+        self.gsm_path = self.dir / "gsm8k_test.jsonl"
+        write_jsonl(self.gsm_path, [{"question": "q{}".format(i), "answer": "x #### {}".format(i)} for i in range(20)])
+
+    def tearDown(self):
+        if self._old_cache is None:
+            os.environ.pop("DCA_CACHE_DIR", None)
+        else:
+            os.environ["DCA_CACHE_DIR"] = self._old_cache
+        self.tmp.cleanup()
+
+    def test_round_trip_matches_parse(self):
+        for path in (self.math_path, self.gsm_path):
+            eager = load_dataset(str(path))
+            cold = load_dataset(str(path), cache=True)
+            warm = load_dataset(str(path), cache=True)
+            self.assertIsInstance(warm, CachedRecords)
+            self.assertEqual(list(cold), eager)
+            self.assertEqual(list(warm), eager)
+            self.assertEqual(warm[-1], eager[-1])
+            self.assertEqual(warm[2:5], eager[2:5])
+        warm = load_dataset(str(self.math_path), cache=True)
+        self.assertEqual(list(warm.level_num[:3]), [1, 2, 3])
+        self.assertEqual(warm[30]["level"], 4)
+        self.assertNotIn("level", load_dataset(str(self.gsm_path), cache=True)[0])
+
+    def test_warm_load_skips_parse(self):
+        load_dataset(str(self.gsm_path), cache=True)
+        with mock.patch("dca.data_utils.load_gsm8k", side_effect=AssertionError("re-parsed")):
+            self.assertEqual(len(load_dataset(str(self.gsm_path), cache=True)), 20)
+
+    def test_invalidation(self):
+        load_dataset(str(self.gsm_path), cache=True)
+        # touched but unchanged: content digest matches, no re-parse
+        os.utime(self.gsm_path, ns=(0, 10 ** 9))
+        with mock.patch("dca.data_utils.load_gsm8k", side_effect=AssertionError("re-parsed")):
+            load_dataset(str(self.gsm_path), cache=True)
+        write_jsonl(self.gsm_path, [{"question": "new", "answer": "#### 1"}])
+        self.assertEqual(list(load_dataset(str(self.gsm_path), cache=True)),
+                         [{"question": "new", "answer": "1", "dataset": "gsm8k"}])
+
+    def test_level_number(self):
+        self.assertEqual(level_number("Level 5"), 5)
+        self.assertEqual(level_number(2), 2)
+        self.assertEqual(level_number("?"), -1)
+        self.assertEqual(level_number(None), -1)
+        self.assertEqual(len(record_cache.file_digest(self.gsm_path)), 16)
@@ -0,0 +1,78 @@
+"""Unit tests for the weighted multi-source sampler."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.io import write_jsonl
+from dca.sampler import AliasTable, FeistelPermutation, MultiSourceSampler, counter_random, sampler_from_config
+
+
+class TestSampler(unittest.TestCase):
+    def test_alias_table_frequencies(self):
+        table = AliasTable([1, 2, 0, 5])
+        n = 40000
+        counts = Counter(table.draw((counter_random(3, 0, t) >> 11) / float(1 << 53)) for t in range(n))
+        self.assertEqual(counts[2], 0)
+        for i, w in ((0, 1), (1, 2), (3, 5)):
+            self.assertAlmostEqual(counts[i] / n, w / 8.0, delta=0.01)
+        with self.assertRaises(ValueError):
+            AliasTable([0, 0])
+
+    def test_feistel_is_permutation(self):
+        for n in (1, 2, 7, 64, 1000):
+            perm = FeistelPermutation(n, key=11)
+            self.assertEqual(sorted(perm[i] for i in range(n)), list(range(n)))
+        self.assertNotEqual([FeistelPermutation(1000, 1)[i] for i in range(20)],
+                            [FeistelPermutation(1000, 2)[i] for i in range(20)])
+
+    def test_epochs_cover_each_source_once(self):
+        a, b = list(range(5)), list(range(100, 113))
+        sampler = MultiSourceSampler([a, b], weights=[1, 2], seed=5)
+        seen = {0: [], 1: []}
+        while sampler.epochs[0] < 2 or sampler.epochs[1] < 1:
+            s, i = sampler.next_index()
+            seen[s].append(i)
+        self.assertEqual(sorted(seen[0][:5]), list(range(5)))
+        self.assertEqual(sorted(seen[0][5:10]), list(range(5)))
+        self.assertNotEqual(seen[0][:5], seen[0][5:10])
+        self.assertEqual(sorted(seen[1][:13]), list(range(13)))
+
+    def test_mixing_ratio(self):
+        sampler = MultiSourceSampler([["aime"] * 30, ["math"] * 50], weights=[1, 2], seed=0)
+        counts = Counter(sampler.sample(9000))
+        self.assertAlmostEqual(counts["math"] / 9000, 2 / 3, delta=0.02)
+
+    def test_resume_is_exact(self):
+        sources = [list(range(17)), list(range(100, 141))]
+        full = MultiSourceSampler(sources, [1, 3], seed=9)
+        expected = full.sample(200)
+        first = MultiSourceSampler(sources, [1, 3], seed=9)
+        head = first.sample(77)
+        state = json.loads(json.dumps(first.state_dict()))
+        resumed = MultiSourceSampler(sources, [1, 3], seed=0)
+        resumed.load_state_dict(state)
+        self.assertEqual(head + resumed.sample(123), expected)
+        with self.assertRaises(ValueError):
+            MultiSourceSampler([list(range(16)), sources[1]], [1, 3]).load_state_dict(state)
+
+    def test_from_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            old = os.environ.get("DCA_CACHE_DIR")
+            os.environ["DCA_CACHE_DIR"] = os.path.join(tmp, "cache")
+            try:
+                path = os.path.join(tmp, "aime_train.jsonl")
+                write_jsonl(path, [{"question": "q{}".format(i), "answer": str(i)} for i in range(4)])
+                sampler = sampler_from_config({"training": {"dataset": [{"path": path, "weight": 1}]}}, seed=1)
+                self.assertEqual(sorted(r["answer"] for r in sampler.sample(4)), ["0", "1", "2", "3"])
+            finally:
+                if old is None:
+                    os.environ.pop("DCA_CACHE_DIR", None)
+                else:
+                    os.environ["DCA_CACHE_DIR"] = old
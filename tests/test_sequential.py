@@ -0,0 +1,63 @@
+"""Unit tests for sequential early stopping of rollouts."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.sequential import beta_binomial_pmf, exceed_probability, run_sequential
+
+
+def _fixed_generator(outcomes):
+    """generate_fn over a fixed per-problem sequence of correct (True) / wrong rollouts."""
+    cursors = {}
+
+    def generate(problem, n):
+        pid = problem["id"]
+        start = cursors.get(pid, 0)
+        flags = outcomes[pid][start : start + n]
+        cursors[pid] = start + n
+        return [problem["answer"] if ok else "wrong" for ok in flags], [100] * len(flags)
+
+    return generate
+
+
+class TestSequential(unittest.TestCase):
+    def test_beta_binomial_pmf_sums_to_one(self):
+        self.assertAlmostEqual(sum(beta_binomial_pmf(8, 2.5, 1.5)), 1.0, places=10)
+
+    def test_exceed_probability_settled_vs_uncertain(self):
+        self.assertLess(exceed_probability(8, 8, 16, tol=0.125), 0.05)
+        self.assertLess(exceed_probability(8, 0, 16, tol=0.125), 0.05)
+        self.assertGreater(exceed_probability(8, 4, 16, tol=0.125), 0.1)
+        self.assertEqual(exceed_probability(16, 3, 16), 0.0)
+        # pass@k undefined until k samples
+        self.assertEqual(exceed_probability(4, 4, 16, ks=(1, 10)), 1.0)
+
+    def test_run_sequential_stops_early_on_saturated(self):
+        outcomes = {0: [True] * 16, 1: [True, False] * 8}
+        problems = [{"id": 0, "answer": "7"}, {"id": 1, "answer": "7"}]
+        rows, report = run_sequential(
+            problems, _fixed_generator(outcomes), n_max=16, batch_size=4, tol=0.125, delta=0.05
+        )
+        self.assertEqual(rows[0]["num_samples"], 8)
+        self.assertGreater(rows[1]["num_samples"], 8)
+        self.assertEqual(report["rollouts_used"], 8 + rows[1]["num_samples"])
+        self.assertAlmostEqual(report["pass@1"], 0.75)
+        self.assertLessEqual(report["bias_bound"], 0.125 + 0.05)
+        self.assertGreaterEqual(report["pass@1_var_sequential"], report["pass@1_var_fixed"])
+
+    def test_run_sequential_short_or_empty_generator(self):
+        # 3 rollouts available against n_max=16: stops when the generator runs dry
+        outcomes = {0: [True, False, True]}
+        rows, report = run_sequential([{"id": 0, "answer": "7"}], _fixed_generator(outcomes), n_max=16, batch_size=2)
+        self.assertEqual(rows[0]["num_samples"], 3)
+        self.assertEqual(rows[0]["num_correct"], 2)
+        self.assertEqual(report["rollouts_used"], 3)
+        self.assertTrue(rows[0]["exhausted"])
+        # rollouts the generator never had are not savings
+        self.assertEqual((report["rollouts_fixed"], report["rollouts_saved_frac"], report["tokens_saved_est"]), (3, 0.0, 0.0))
+        self.assertEqual((report["early_stopped"], report["exhausted"], report["rollouts_missing"]), (0, 1, 13))
+        with self.assertRaises(ValueError):
+            run_sequential([{"id": 0, "answer": "7"}], lambda problem, n: ([], []), n_max=16)
@@ -78,3 +78,32 @@ class TestSlimeIntegration(unittest.TestCase):
         adv = compute_advantage_for_slime(batch, adv_mode="dca", beta=0.2, group_size=3)
         self.assertEqual(adv.shape, (6,))
         self.assertTrue(np.all(np.isfinite(adv)))
+
+    def test_slime_ragged_groups_with_observer(self):
+        """group_sizes gives per-prompt groups; the observer sees each group with its sources."""
+        from dca.online_metrics import RolloutMetrics
+        batch = {
+            "rewards": np.array([1.0, 0.0, 1.0, 1.0, 1.0, 0.0, 0.0]),
+            "response_lengths": np.array([100, 200, 300, 400, 500, 600, 700]),
+            "data_source": ["gsm8k", "math", "math"],
+        }
+        obs = RolloutMetrics()
+        adv = compute_advantage_for_slime(batch, adv_mode="dca", group_sizes=[2, 3, 2], observer=obs)
+        self.assertEqual(adv.shape, (7,))
+        self.assertTrue(np.all(np.isfinite(adv)))
+        snap = obs.snapshot()
+        self.assertEqual(snap["groups"], 3)
+        self.assertEqual(snap["accuracy"]["gsm8k"]["responses"], 2)
+        self.assertAlmostEqual(snap["accuracy"]["math"]["step"], 3 / 5)
+
+    def test_slime_compact_matches_verl(self):
+        batch = {
+            "rewards": np.array([1.0, 1.0, 1.0, 0.0, 1.0, 0.0]),
+            "response_lengths": np.array([100, 200, 300, 400, 500, 600]),
+        }
+        adv_s, info_s = compute_advantage_for_slime(batch, adv_mode="vanilla", group_size=3, compact=True)
+        adv_v, info_v = compute_advantage_for_verl(batch, adv_mode="vanilla", group_size=3, compact=True)
+        np.testing.assert_allclose(adv_s, adv_v)
+        np.testing.assert_array_equal(info_s["keep_indices"], [3, 4, 5])
+        self.assertEqual(info_s["tokens_saved"], info_v["tokens_saved"])
+        self.assertEqual(info_s["tokens_saved"], 600.0)
@@ -0,0 +1,76 @@
+"""Unit tests for the resumable hyperparameter sweep runner."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.sweep import TrialCache, config_key, expand_spec, normalize_toy_config, run_sweep, summarize
+
+SMALL = {"n_steps": 5, "seeds": 4, "tail": 2}
+
+
+def flaky_trial(config):
+    if config["x"] < 0:
+        raise ValueError("negative x")
+    return {"acc_mean": config["x"], "length_mean": 10.0 * config["x"]}
+
+
+class TestSweep(unittest.TestCase):
+    def test_expand_and_normalize(self):
+        spec = {
+            "fixed": {"seeds": 8},
+            "grid": {"mode": ["dca", "grpo_lp"], "beta": [0.1, 0.2]},
+            "random": {"n": 3, "seed": 1, "params": {"beta": {"log_uniform": [0.01, 1.0]}, "group_size": {"choice": [4, 8]}}},
+        }
+        configs = expand_spec(spec)
+        self.assertEqual(len(configs), 4 + 3)
+        self.assertTrue(all(c["seeds"] == 8 for c in configs))
+        self.assertTrue(all(0.01 <= c["beta"] <= 1.0 for c in configs[4:]))
+        self.assertEqual(configs[4:], expand_spec(spec)[4:])  # seeded draws
+        # grpo_lp ignores beta: both grid points normalize to the same trial
+        lp = [normalize_toy_config(c) for c in configs[:4] if c["mode"] == "grpo_lp"]
+        self.assertEqual(lp[0], lp[1])
+        self.assertNotIn("beta", lp[0])
+        self.assertEqual(config_key("toy", lp[0]), config_key("toy", dict(reversed(list(lp[0].items())))))
+        with self.assertRaises(ValueError):
+            normalize_toy_config({"mode": "ppo"})
+
+    def test_resume_skips_cached_trials(self):
+        spec = {"trial": "toy", "fixed": SMALL, "grid": {"mode": ["dca", "grpo_lp", "vanilla"], "beta": [0.1, 0.5]}}
+        with tempfile.TemporaryDirectory() as tmp:
+            # "interrupted" sweep: only the dca part finished
+            first = run_sweep(dict(spec, grid={"mode": ["dca"], "beta": [0.1, 0.5]}), tmp, workers=1)
+            self.assertEqual((first["ran"], first["cached"]), (2, 0))
+            out = run_sweep(spec, tmp, workers=2)
+            self.assertEqual((out["ran"], out["cached"], out["failed"]), (2, 2, {}))  # grpo_lp, vanilla
+            self.assertEqual(len(out["records"]), 4)
+            again = run_sweep(spec, tmp, workers=2)
+            self.assertEqual((again["ran"], again["cached"]), (0, 4))
+            self.assertEqual(again["records"], out["records"])
+            for record in out["records"]:
+                self.assertTrue(0.0 <= record["result"]["acc_mean"] <= 1.0)
+                self.assertEqual(record["key"], config_key("toy", record["config"]))
+
+    def test_failed_trials_are_retried_and_pareto(self):
+        spec = {"trial": "tests.test_sweep:flaky_trial", "grid": {"x": [-1.0, 0.2, 0.5]}}
+        with tempfile.TemporaryDirectory() as tmp:
+            out = run_sweep(spec, tmp, workers=1)
+            self.assertEqual(out["ran"], 2)
+            self.assertEqual(len(out["failed"]), 1)
+            self.assertEqual(len(list(TrialCache(tmp).records())), 2)
+            self.assertEqual(run_sweep(spec, tmp, workers=1)["cached"], 2)  # failure not cached
+        records = [
+            {"key": "a", "config": {"c": "a"}, "result": {"acc_mean": 0.8, "length_mean": 100.0}},
+            {"key": "b", "config": {"c": "b"}, "result": {"acc_mean": 0.7, "length_mean": 120.0}},  # dominated by a
+            {"key": "c", "config": {"c": "c"}, "result": {"acc_mean": 0.6, "length_mean": 50.0}},
+        ]
+        rows = summarize(records)
+        self.assertEqual([r["key"] for r in rows], ["a", "b", "c"])
+        self.assertEqual([r["pareto"] for r in rows], [True, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Unit tests for the population-vectorized toy RL simulator."""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.advantage import (
+    advantage_dca_grpo,
+    advantage_dca_grpo_batch,
+    advantage_vanilla_grpo,
+    advantage_vanilla_grpo_batch,
+    rewards_coupled_lp,
+)
+from dca.toy_sim import LAM_INIT, p_correct_given_length, simulate_population, sweep
+
+
+def single_policy(method, n_steps, G, beta, gamma, lr, seed):
+    """Reference loop: one policy, one group per step, per-group advantage functions."""
+    rng = np.random.default_rng(seed)
+    lam = LAM_INIT
+    lams = [lam]
+    for _ in range(n_steps):
+        lengths = np.clip(rng.poisson(np.array([[lam]]), (1, G))[0].astype(np.float64), 1.0, 1e4)
+        correct = rng.random((1, G))[0] < p_correct_given_length(lengths)
+        if method == "dca":
+            adv = advantage_dca_grpo(correct, lengths, beta=beta)
+        else:
+            adv = advantage_vanilla_grpo(rewards_coupled_lp(correct, lengths, gamma=gamma))
+        lam = float(np.clip(lam + lr * np.mean(adv * (lengths / (lam + 1e-8) - 1.0)), 5.0, 2000.0))
+        lams.append(lam)
+    return np.array(lams)
+
+
+class TestToySim(unittest.TestCase):
+    def test_single_policy_matches_reference_loop(self):
+        for method in ("dca", "lp"):
+            out = simulate_population(50, 4, method, beta=0.2, gamma=0.001, lr=2.0, seed=3)
+            expected = single_policy(method, 50, 4, 0.2, 0.001, 2.0, seed=3)
+            np.testing.assert_allclose(out["lam"][:, 0], expected, rtol=1e-9)
+            self.assertEqual(out["acc"].shape, (50, 1))
+
+    def test_per_row_beta_and_dynamic(self):
+        rng = np.random.default_rng(0)
+        mask = rng.random((6, 8)) < 0.6
+        lengths = rng.integers(10, 500, (6, 8)).astype(float)
+        beta = np.array([0.0, 0.1, 0.2, 0.5, 1.0, 2.0])
+        dynamic = np.array([True, False, True, False, True, False])
+        got = advantage_dca_grpo_batch(mask, lengths, beta, use_dynamic=dynamic)
+        for i in range(6):
+            np.testing.assert_allclose(
+                got[i], advantage_dca_grpo(mask[i], lengths[i], beta[i], use_dynamic=bool(dynamic[i])), atol=1e-10)
+        rewards = np.where(mask, 1.0 - 0.001 * lengths, 0.0)
+        rewards[0] = 0.5  # zero-variance group
+        got = advantage_vanilla_grpo_batch(rewards)
+        for i in range(6):
+            np.testing.assert_allclose(got[i], advantage_vanilla_grpo(rewards[i]), atol=1e-12)
+
+    def test_population_shapes_and_sweep(self):
+        out = simulate_population(10, 8, "dca", beta=np.linspace(0.0, 1.0, 5), population=5, seed=0)
+        self.assertEqual(out["lam"].shape, (11, 5))
+        self.assertTrue(np.all(out["lam"][0] == LAM_INIT))
+        self.assertTrue(np.all((out["lam"] >= 5.0) & (out["lam"] <= 2000.0)))
+        with self.assertRaises(ValueError):
+            simulate_population(1, 4, "rloo")
+
+        rows = sweep(betas=(0.1, 0.5), gammas=(1e-3,), group_sizes=(4, 16), use_dynamic=(True, False),
+                     seeds=8, n_steps=20, tail=5)
+        self.assertEqual(len(rows), 2 * (2 * 2 + 1))
+        dca = [r for r in rows if r["method"] == "dca"]
+        self.assertEqual({(r["beta"], r["use_dynamic"]) for r in dca}, {(0.1, True), (0.1, False), (0.5, True), (0.5, False)})
+        for r in rows:
+            self.assertEqual(r["seeds"], 8)
+            self.assertTrue(0.0 <= r["acc_mean"] <= 1.0)
+            self.assertGreater(r["lam_std"], 0.0)  # seeds are independent policies
+
+
+if __name__ == "__main__":
+    unittest.main()
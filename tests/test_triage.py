@@ -0,0 +1,64 @@
+"""Unit tests for stratified triage evaluation."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.triage import (
+    stratified_sample,
+    stratified_estimate,
+    required_sample_size,
+    evaluate_triage,
+    stratum_key,
+    z_value,
+)
+
+
+def _items():
+    items = [{"dataset": "gsm8k"} for _ in range(60)]
+    items += [{"dataset": "math", "level": lvl} for lvl in (1, 5) for _ in range(20)]
+    return items
+
+
+class TestTriage(unittest.TestCase):
+    def test_z_value(self):
+        self.assertAlmostEqual(z_value(0.95), 1.959964, places=4)
+
+    def test_stratified_sample_deterministic_and_proportional(self):
+        items = _items()
+        idx1, strata1 = stratified_sample(items, fraction=0.1, seed=3)
+        idx2, strata2 = stratified_sample(items, fraction=0.1, seed=3)
+        self.assertEqual(idx1, idx2)
+        self.assertEqual(strata1, strata2)
+        self.assertEqual(strata1["gsm8k|"], {"population": 60, "sampled": 6})
+        self.assertEqual(strata1["math|5"]["sampled"], 2)
+        self.assertEqual(len(idx1), sum(s["sampled"] for s in strata1.values()))
+        self.assertEqual(stratum_key(items[idx1[-1]]), "math|5")
+
+    def test_full_census_has_zero_stderr(self):
+        vals = {"a": [1.0, 0.0, 1.0, 1.0], "b": [0.0, 0.0]}
+        est = stratified_estimate(vals, {"a": 4, "b": 2})
+        self.assertAlmostEqual(est["estimate"], 0.5)
+        self.assertAlmostEqual(est["stderr"], 0.0)
+
+    def test_required_sample_size_shrinks_with_tolerance(self):
+        vals = {"a": [1.0, 0.0] * 5, "b": [1.0, 1.0, 0.0]}
+        pops = {"a": 500, "b": 300}
+        n_loose = required_sample_size(vals, pops, 0.1)
+        n_tight = required_sample_size(vals, pops, 0.02)
+        self.assertLess(n_loose, n_tight)
+        self.assertLessEqual(n_tight, 800)
+
+    def test_evaluate_triage_report(self):
+        scored = [
+            {"stratum": "a", "first_correct": i % 2 == 0, "num_correct": i % 3, "num_samples": 4, "lengths": [100, 200]}
+            for i in range(10)
+        ]
+        report = evaluate_triage(scored, {"a": {"population": 100}}, k=2, target_half_width=0.05)
+        self.assertAlmostEqual(report["pass@1"]["estimate"], 0.5)
+        self.assertLessEqual(report["pass@1"]["lower"], 0.5)
+        self.assertAlmostEqual(report["avg_tokens"]["estimate"], 150.0)
+        self.assertIn("pass@2", report)
+        self.assertGreater(report["required_problems"]["pass@1"], 10)
@@ -8,8 +8,14 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from dca.verl_integration import (
+    advantage_keep_mask,
     compute_advantage,
+    compute_advantage_for_verl,
+    compute_advantage_ragged,
+    expand_packed,
+    expand_padded,
     infer_correct_mask,
+    packed_to_padded,
     reward_for_verl,
     reward_vanilla,
     reward_coupled_lp,
@@ -95,3 +101,83 @@ class TestVerlIntegration(unittest.TestCase):
         adv = compute_advantage(rewards, lengths, mode="dca", beta=0.2)
         self.assertEqual(adv.shape, (3,))
         self.assertTrue(np.all(np.isfinite(adv)))
+
+    def test_compute_advantage_ragged_matches_per_group(self):
+        rewards = np.array([1.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.0, 1.0])
+        lengths = np.arange(100.0, 1000.0, 100.0)
+        sizes = [3, 2, 4]
+        adv = compute_advantage_ragged(rewards, lengths, sizes, mode="dca", beta=0.2)
+        start = 0
+        for g in sizes:
+            expected = compute_advantage(rewards[start:start + g], lengths[start:start + g], mode="dca", beta=0.2)
+            np.testing.assert_allclose(adv[start:start + g], expected)
+            start += g
+        with self.assertRaises(ValueError):
+            compute_advantage_ragged(rewards, lengths, [3, 3], mode="dca")
+
+    def test_verl_hook_ragged_equals_grouped_when_uniform(self):
+        batch = {"rewards": np.array([1.0, 0.0, 1.0, 0.0, 1.0, 1.0]),
+                 "response_lengths": np.array([100, 200, 300, 400, 500, 600])}
+        grouped = compute_advantage_for_verl(batch, adv_mode="dca", group_size=3)
+        ragged = compute_advantage_for_verl(batch, adv_mode="dca", group_sizes=[3, 3])
+        np.testing.assert_allclose(grouped, ragged)
+
+    def test_advantage_keep_mask_drops_degenerate_groups(self):
+        """Vanilla GRPO: all-correct and all-wrong groups have zero advantage and are dropped."""
+        rewards = np.array([[1.0, 1.0, 1.0], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+        lengths = np.array([[100, 200, 300], [400, 500, 600], [10, 20, 30]])
+        adv = compute_advantage(rewards, lengths, mode="vanilla")
+        info = advantage_keep_mask(adv, lengths)
+        np.testing.assert_array_equal(info["keep_groups"], [2])
+        np.testing.assert_array_equal(info["keep_indices"], [6, 7, 8])
+        self.assertEqual(info["groups_dropped"], 2)
+        self.assertEqual(info["responses_dropped"], 6)
+        self.assertEqual(info["tokens_total"], 2160.0)
+        self.assertEqual(info["tokens_saved"], 2100.0)
+
+    def test_verl_hook_compact(self):
+        """compact=True returns the same advantages plus a mask; DCA keeps all-correct groups."""
+        batch = {"rewards": np.array([0.0, 0.0, 1.0, 1.0, 1.0, 0.0, 1.0]),
+                 "response_lengths": np.array([100, 200, 300, 400, 500, 600, 700])}
+        plain = compute_advantage_for_verl(batch, adv_mode="dca", group_sizes=[2, 3, 2])
+        adv, info = compute_advantage_for_verl(batch, adv_mode="dca", group_sizes=[2, 3, 2], compact=True)
+        np.testing.assert_allclose(adv, plain)
+        np.testing.assert_array_equal(info["keep_groups"], [1, 2])
+        # the mean-length response of the all-correct group has zero length advantage too
+        np.testing.assert_array_equal(info["keep_indices"], [2, 4, 5, 6])
+        self.assertEqual(info["tokens_saved"], 700.0)
+        grouped = {"rewards": batch["rewards"][:6], "response_lengths": batch["response_lengths"][:6]}
+        adv, info = compute_advantage_for_verl(grouped, adv_mode="vanilla", group_size=2, compact=True)
+        self.assertEqual(adv.shape, (6,))
+        np.testing.assert_array_equal(info["keep_mask"], np.abs(adv) > 1e-6)
+
+    def test_expand_packed_and_padded(self):
+        adv = np.array([[0.5, -1.0], [2.0, 0.0]])
+        lengths = np.array([[3, 1], [0, 2]])
+        packed, cu = expand_packed(adv, lengths)
+        np.testing.assert_array_equal(cu, [0, 3, 4, 4, 6])
+        np.testing.assert_array_equal(packed, [0.5, 0.5, 0.5, -1.0, 0.0, 0.0])
+        self.assertEqual(packed.dtype, np.float32)
+        padded = expand_padded(adv, lengths)
+        np.testing.assert_array_equal(padded, [[0.5, 0.5, 0.5], [-1.0, 0, 0], [0, 0, 0], [0, 0, 0]])
+        np.testing.assert_array_equal(packed_to_padded(packed, cu), padded)
+        np.testing.assert_array_equal(expand_padded(adv, lengths, max_len=2), padded[:, :2])
+        np.testing.assert_array_equal(packed_to_padded(packed, cu, max_len=2), padded[:, :2])
+        with self.assertRaises(ValueError):
+            expand_packed(adv, [1, 2, 3])
+        with self.assertRaises(ValueError):
+            expand_packed([1.0], [2.5])
+
+    def test_expand_packed_allocates_only_real_tokens(self):
+        import tracemalloc
+        rng = np.random.default_rng(0)
+        lengths = np.where(rng.random(512) < 0.05, 16384, rng.integers(50, 500, 512))
+        adv = rng.normal(size=512)
+        tracemalloc.start()
+        packed, cu = expand_packed(adv, lengths)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(packed.size, lengths.sum())
+        # output plus per-response temporaries; padded would be 512 * 16384 * 4 bytes
+        self.assertLess(peak, packed.nbytes + 64 * lengths.size + 4096)
+        self.assertLess(peak, 512 * 16384 * 4 / 4)
@@ -0,0 +1,108 @@
+"""Unit tests for global-batch advantage whitening from merged shard statistics."""
+
+import multiprocessing as mp
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dca.verl_integration import (
+    GlobalWhitener,
+    compute_advantage,
+    compute_advantage_for_verl,
+    merge_stats,
+    shard_stats,
+)
+from dca.verl_integration.whitening import stats_to_array
+
+
+def _rank_worker(rank, advantages, lengths, to_parent, from_parent, results, token_level):
+    """One 'rank': exchanges only its (count, mean, M2) through the parent, whitens in place."""
+
+    def all_gather(local):
+        to_parent.put((rank, local))
+        return from_parent.get()
+
+    whitener = GlobalWhitener(gather_fn=all_gather, token_level=token_level)
+    micro = [np.array(a) for a in advantages]
+    whitener.whiten_micro_batches(micro, lengths)
+    results.put((rank, np.concatenate(micro)))
+
+
+def run_ranks(shards, lengths, token_level=False):
+    """Run one process per shard; the parent plays all_gather. Returns (whitened, payload sizes)."""
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    to_parent, results = ctx.Queue(), ctx.Queue()
+    inboxes = [ctx.Queue() for _ in shards]
+    procs = [
+        ctx.Process(target=_rank_worker, args=(r, shards[r], lengths[r], to_parent, inboxes[r], results, token_level))
+        for r in range(len(shards))
+    ]
+    for p in procs:
+        p.start()
+    gathered = dict(to_parent.get(timeout=30) for _ in shards)
+    rows = np.stack([gathered[r] for r in range(len(shards))])
+    for inbox in inboxes:
+        inbox.put(rows)
+    out = dict(results.get(timeout=30) for _ in shards)
+    for p in procs:
+        p.join(timeout=30)
+    return [out[r] for r in range(len(shards))], [gathered[r].size for r in range(len(shards))]
+
+
+class TestWhitening(unittest.TestCase):
+    def test_merged_stats_match_global(self):
+        rng = np.random.default_rng(0)
+        chunks = [rng.normal(3.0, 2.0, n) for n in (5, 0, 40, 1)]
+        merged = merge_stats(stats_to_array(shard_stats(c)) for c in chunks)
+        full = np.concatenate(chunks)
+        self.assertEqual(merged.count, full.size)
+        self.assertAlmostEqual(merged.mean, full.mean())
+        self.assertAlmostEqual(merged.std, full.std())
+        w = rng.integers(0, 50, full.size)
+        weighted = shard_stats(full, w)
+        expanded = np.repeat(full, w)
+        self.assertEqual(weighted.count, expanded.size)
+        self.assertAlmostEqual(weighted.mean, expanded.mean())
+        self.assertAlmostEqual(weighted.std, expanded.std())
+
+    def test_multiprocess_ranks_match_global_whitening(self):
+        rng = np.random.default_rng(1)
+        rewards = (rng.random((24, 8)) < 0.4).astype(float)
+        lengths = rng.integers(100, 2000, (24, 8)).astype(float)
+        adv = compute_advantage(rewards, lengths, mode="dca").ravel()
+        flat_len = lengths.ravel()
+        # 3 ranks x 2 micro-batches of uneven sizes
+        cuts = [0, 10, 40, 64, 100, 150, 192]
+        pieces = [adv[cuts[i]:cuts[i + 1]] for i in range(6)]
+        piece_len = [flat_len[cuts[i]:cuts[i + 1]] for i in range(6)]
+        shards = [pieces[0:2], pieces[2:4], pieces[4:6]]
+        shard_len = [piece_len[0:2], piece_len[2:4], piece_len[4:6]]
+        whitened, sizes = run_ranks(shards, shard_len)
+        np.testing.assert_allclose(np.concatenate(whitened), (adv - adv.mean()) / (adv.std() + 1e-8), atol=1e-9)
+        self.assertEqual(sizes, [3, 3, 3])  # only (count, mean, M2) leaves a rank
+        whitened, _ = run_ranks(shards, shard_len, token_level=True)
+        tokens = np.repeat(adv, flat_len.astype(int))
+        np.testing.assert_allclose(np.concatenate(whitened), (adv - tokens.mean()) / (tokens.std() + 1e-8), atol=1e-9)
+
+    def test_hook_whitener_in_place_and_compact(self):
+        batch = {"rewards": np.array([1.0, 0.0, 1.0, 0.0, 0.0, 0.0]),
+                 "response_lengths": np.array([100, 200, 300, 400, 500, 600])}
+        plain = compute_advantage_for_verl(batch, adv_mode="dca", group_size=3)
+        adv, info = compute_advantage_for_verl(batch, adv_mode="dca", group_size=3, compact=True,
+                                               whitener=GlobalWhitener())
+        np.testing.assert_allclose(adv, (plain - plain.mean()) / (plain.std() + 1e-8))
+        np.testing.assert_array_equal(info["keep_indices"], [0, 1, 2])  # from unwhitened advantages
+        scaled = compute_advantage_for_verl(batch, adv_mode="dca", group_size=3,
+                                            whitener=GlobalWhitener(shift_mean=False))
+        np.testing.assert_array_equal(scaled[3:], 0.0)
+        buf = np.array([1.0, 3.0])
+        self.assertIs(GlobalWhitener()(buf), buf)
+        np.testing.assert_allclose(buf, [-1.0, 1.0], atol=1e-7)
+
+
+if __name__ == "__main__":
+    unittest.main()